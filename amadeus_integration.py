@@ -4,37 +4,87 @@ Provides real-time hotel availability, pricing, and booking data
 """
 
 import os
-import requests
+import threading
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
+from hotel_directory import HotelDirectory
+from http_client import ApiSession
+from quota_governor import QuotaGovernor
+from single_flight import SingleFlight
+from offer_cache import OfferCache
+
 load_dotenv()
 
+# (connect, read) timeouts per Amadeus endpoint
+AMADEUS_TIMEOUTS = {
+    "token": (3.05, 10.0),
+    "hotels": (3.05, 15.0),
+    "offers": (3.05, 15.0),
+}
+
+# Directory key for the one hotel this system books
+CHARLOTTE_AIRPORT_KEY = "CLT/HYCLTCHA"
+
 
 class AmadeusHotelAPI:
     """
     Integration with Amadeus Hotel API for real-time hotel data
-    Free tier: 2,000 API calls/month
+    Free tier: 2,000 API calls/month (enforced by self.quota)
     Sign up: https://developers.amadeus.com
     """
     
-    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None,
+                 directory: Optional[HotelDirectory] = None):
         self.api_key = api_key or os.getenv("AMADEUS_API_KEY")
         self.api_secret = api_secret or os.getenv("AMADEUS_API_SECRET")
         self.base_url = "https://test.api.amadeus.com/v1"  # Test environment
         # For production: https://api.amadeus.com/v1
         self.access_token = None
         self.token_expires_at = None
+        # (access_token, token_expires_at), replaced as a unit so readers never mix two tokens
+        self._token_state = (None, None)
+        # Every call is counted against the monthly budget and a per-second rate
+        self.quota = QuotaGovernor(
+            os.getenv("AMADEUS_QUOTA_DB_PATH") or "amadeus_quota.db",
+            monthly_budget=int(os.getenv("AMADEUS_MONTHLY_BUDGET", "2000")),
+            reserve=int(os.getenv("AMADEUS_QUOTA_RESERVE", "100")),
+            conserve_below=int(os.getenv("AMADEUS_QUOTA_CONSERVE_BELOW", "200")),
+            rate=float(os.getenv("AMADEUS_RATE_PER_SECOND", "10")),
+        )
+        # Keep-alive connection pool with retries; the token POST is safe to
+        # resend, and every resend is billed so it is counted as a call
+        self.http = ApiSession("AMADEUS", AMADEUS_TIMEOUTS,
+                               retry_methods=ApiSession.IDEMPOTENT_METHODS | {"POST"},
+                               on_retry=self.quota.record)
+        # Identical concurrent token refreshes and hotel list calls share one request
+        # (the offer cache coalesces its own fetches)
+        self.flights = SingleFlight()
+        # Hotel id lookups are cached on disk; the hotel list barely changes
+        self.directory = directory or HotelDirectory(
+            os.getenv("AMADEUS_DIRECTORY_PATH") or "amadeus_directory.json",
+            ttl=float(os.getenv("AMADEUS_DIRECTORY_TTL_DAYS", "7")) * 86400,
+        )
+        # Offers for the same stay are reused across conversation turns and calls
+        self.offers = OfferCache(
+            ttl=float(os.getenv("AMADEUS_OFFER_TTL", "120")),
+            stale_ttl=float(os.getenv("AMADEUS_OFFER_STALE_TTL", "600")),
+            empty_ttl=float(os.getenv("AMADEUS_OFFER_EMPTY_TTL", "30")),
+        )
         
     def _get_access_token(self) -> str:
         """Get or refresh OAuth access token"""
-        # Check if we have a valid token
-        if self.access_token and self.token_expires_at:
-            if datetime.now() < self.token_expires_at:
-                return self.access_token
+        # Check if we have a valid token (read both fields as one snapshot)
+        access_token, expires_at = self._token_state
+        if access_token and expires_at and datetime.now() < expires_at:
+            return access_token
         
-        # Get new token
+        # Threads that find the token expired together share one refresh
+        return self.flights.do("token", self._refresh_access_token)
+    
+    def _refresh_access_token(self) -> str:
+        """Request a new OAuth access token"""
         auth_url = "https://test.api.amadeus.com/v1/security/oauth2/token"
         
         data = {
@@ -44,15 +94,18 @@ class AmadeusHotelAPI:
         }
         
         try:
-            response = requests.post(auth_url, data=data, timeout=10)
+            self.quota.acquire("token")
+            response = self.http.post(auth_url, "token", data=data)
             response.raise_for_status()
             token_data = response.json()
             
-            self.access_token = token_data['access_token']
+            access_token = token_data['access_token']
             expires_in = token_data['expires_in']
-            self.token_expires_at = datetime.now() + timedelta(seconds=expires_in - 60)
+            expires_at = datetime.now() + timedelta(seconds=expires_in - 60)
+            self._token_state = (access_token, expires_at)
+            self.access_token, self.token_expires_at = access_token, expires_at
             
-            return self.access_token
+            return access_token
         except Exception as e:
             raise Exception(f"Failed to get Amadeus access token: {e}")
     
@@ -69,6 +122,12 @@ class AmadeusHotelAPI:
         Returns:
             List of hotels with basic info
         """
+        # Callers asking for the same list at the same time share one request
+        return self.flights.do(("hotels", city_code, radius, radius_unit),
+                               lambda: self._search_hotels_by_city(city_code, radius, radius_unit))
+    
+    def _search_hotels_by_city(self, city_code: str, radius: int, radius_unit: str) -> List[Dict]:
+        """Live by-city hotel list call"""
         token = self._get_access_token()
         
         url = f"{self.base_url}/reference-data/locations/hotels/by-city"
@@ -82,7 +141,8 @@ class AmadeusHotelAPI:
         }
         
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=15)
+            self.quota.acquire("hotels")
+            response = self.http.get(url, "hotels", headers=headers, params=params)
             response.raise_for_status()
             data = response.json()
             return data.get('data', [])
@@ -104,8 +164,20 @@ class AmadeusHotelAPI:
             room_quantity: Number of rooms
         
         Returns:
-            List of hotel offers with rooms and pricing
+            List of hotel offers with rooms and pricing (cached briefly; see OfferCache)
         """
+        key = OfferCache.key(hotel_ids, check_in, check_out, adults, room_quantity)
+        if self.quota.conserving():
+            # Budget is running low: any cached offers for this stay will do
+            cached = self.offers.peek(key)
+            if cached is not None:
+                return cached
+        return self.offers.get(key, lambda: self._fetch_hotel_offers(
+            hotel_ids, check_in, check_out, adults, room_quantity))
+    
+    def _fetch_hotel_offers(self, hotel_ids: List[str], check_in: str, check_out: str,
+                            adults: int, room_quantity: int) -> List[Dict]:
+        """Live hotel-offers call; raises on failure so errors are never cached"""
         token = self._get_access_token()
         
         url = f"{self.base_url}/shopping/hotel-offers"
@@ -120,14 +192,39 @@ class AmadeusHotelAPI:
             "roomQuantity": room_quantity
         }
         
-        try:
-            response = requests.get(url, headers=headers, params=params, timeout=15)
-            response.raise_for_status()
-            data = response.json()
-            return data.get('data', [])
-        except Exception as e:
-            print(f"Error getting hotel offers: {e}")
-            return []
+        self.quota.acquire("offers")
+        response = self.http.get(url, "offers", headers=headers, params=params)
+        response.raise_for_status()
+        data = response.json()
+        return data.get('data', [])
+    
+    def find_charlotte_airport_hotel(self) -> Optional[Dict]:
+        """
+        Hyatt House Charlotte Airport's directory record, from the on-disk cache
+        
+        The by-city search runs only on a cold cache; once the entry is
+        older than the directory TTL it is refreshed in the background.
+        """
+        return self.directory.resolve(CHARLOTTE_AIRPORT_KEY, self._search_charlotte_airport_hotel)
+    
+    def _search_charlotte_airport_hotel(self) -> Optional[Dict]:
+        """Look up Hyatt House Charlotte Airport in the Amadeus hotel list"""
+        # Search specifically for Hyatt House Charlotte Airport
+        # Hotel ID: HYCLTCHA
+        hotels = self.search_hotels_by_city("CLT", radius=5)
+        
+        if not hotels:
+            # search_hotels_by_city returns [] on errors; don't cache that as "no hotel"
+            raise Exception("Amadeus hotel search returned no hotels for CLT")
+        
+        # Search for the SPECIFIC Hyatt House Airport hotel
+        for h in hotels:
+            if h.get('hotelId') == 'HYCLTCHA':  # Exact Hyatt House Charlotte Airport
+                return h
+        
+        # Fallback: any Hyatt House property
+        hyatt_hotels = [h for h in hotels if h.get('chainCode') == 'HY']
+        return hyatt_hotels[0] if hyatt_hotels else None
     
     def search_charlotte_airport_hotels(self, check_in: str, check_out: str, 
                                        guests: int = 1) -> List[Dict]:
@@ -143,26 +240,7 @@ class AmadeusHotelAPI:
         Returns:
             Formatted hotel data for Hyatt House Charlotte Airport only
         """
-        # Search specifically for Hyatt House Charlotte Airport
-        # Hotel ID: HYCLTCHA
-        hotels = self.search_hotels_by_city("CLT", radius=5)
-        
-        if not hotels:
-            # No hotels found - will use static fallback
-            return []
-        
-        # Search for the SPECIFIC Hyatt House Airport hotel
-        hyatt_airport = None
-        for h in hotels:
-            if h.get('hotelId') == 'HYCLTCHA':  # Exact Hyatt House Charlotte Airport
-                hyatt_airport = h
-                break
-        
-        if not hyatt_airport:
-            # Fallback: any Hyatt House property
-            hyatt_hotels = [h for h in hotels if h.get('chainCode') == 'HY']
-            if hyatt_hotels:
-                hyatt_airport = hyatt_hotels[0]
+        hyatt_airport = self.find_charlotte_airport_hotel()
         
         if not hyatt_airport:
             # No Hyatt found - will use static data
@@ -234,13 +312,17 @@ class AmadeusHotelAPI:
         return bool(self.api_key and self.api_secret)
 
 
-# Singleton instance
+# Singleton instance; one per process, so every request thread shares its
+# quota, caches and in-flight searches
 amadeus_api = None
+_amadeus_api_lock = threading.Lock()
 
 def get_amadeus_api() -> AmadeusHotelAPI:
     """Get or create Amadeus API instance"""
     global amadeus_api
     if amadeus_api is None:
-        amadeus_api = AmadeusHotelAPI()
+        with _amadeus_api_lock:
+            if amadeus_api is None:
+                amadeus_api = AmadeusHotelAPI()
     return amadeus_api
 
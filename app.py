@@ -3,123 +3,119 @@ Flask API Server for Hotel Front Desk Agent
 Provides REST API and serves web interface
 """
 
-from flask import Flask, request, jsonify, render_template, send_from_directory
+from flask import Flask, Response, request, jsonify, render_template, send_from_directory
 from flask_cors import CORS
+from catalog_cache import CatalogCache
+from chat_flow import BookingFlow, ChatStatus
+from data_watcher import DataFileWatcher
+from date_parser import extract_stay, parse_date_range, parse_natural_date
+from entity_extraction import extract_entities
 from hotel_agent import HotelAgent
 from vapi_integration import get_vapi_agent
 from amadeus_integration import get_amadeus_api
+from inventory import default_stay, parse_stay
+from session_store import SessionArchive, create_session_store
+import llm_client
 import os
 import uuid
 from datetime import datetime, timedelta
-import re
 import json
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-def parse_natural_date(date_str):
-    """
-    Parse natural language dates like:
-    - "2nd november" -> "2024-11-02"
-    - "nov 5th" -> "2024-11-05" 
-    - "november 2" -> "2024-11-02"
-    - "5th nov" -> "2024-11-05"
-    """
-    if not date_str:
-        return None
-        
-    date_str = date_str.lower().strip()
-    current_year = datetime.now().year
-    
-    # Month mapping
-    months = {
-        'jan': '01', 'january': '01',
-        'feb': '02', 'february': '02', 
-        'mar': '03', 'march': '03',
-        'apr': '04', 'april': '04',
-        'may': '05',
-        'jun': '06', 'june': '06',
-        'jul': '07', 'july': '07',
-        'aug': '08', 'august': '08',
-        'sep': '09', 'september': '09',
-        'oct': '10', 'october': '10',
-        'nov': '11', 'november': '11',
-        'dec': '12', 'december': '12'
-    }
-    
-    # Patterns to match
-    patterns = [
-        # "2nd november", "5th nov", "1st jan"
-        r'(\d+)(?:st|nd|rd|th)?\s+(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec|january|february|march|april|may|june|july|august|september|october|november|december)',
-        # "november 2", "nov 5"
-        r'(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec|january|february|march|april|may|june|july|august|september|october|november|december)\s+(\d+)',
-        # "nov 2nd", "jan 5th"
-        r'(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec|january|february|march|april|may|june|july|august|september|october|november|december)\s+(\d+)(?:st|nd|rd|th)?'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, date_str)
-        if match:
-            groups = match.groups()
-            if len(groups) == 2:
-                if groups[0].isdigit():
-                    # Format: "2nd november"
-                    day = groups[0]
-                    month_name = groups[1]
-                else:
-                    # Format: "november 2" or "nov 2nd"
-                    month_name = groups[0]
-                    day = groups[1]
-                
-                if month_name in months:
-                    month_num = months[month_name]
-                    try:
-                        day_num = int(day)
-                        if 1 <= day_num <= 31:
-                            return f"{current_year}-{month_num}-{day_num:02d}"
-                    except ValueError:
-                        continue
-    
-    return None
-
-def parse_date_range(date_range_str):
-    """
-    Parse date ranges like:
-    - "2nd november till 5th nov" -> ("2024-11-02", "2024-11-05")
-    - "nov 2 to nov 5" -> ("2024-11-02", "2024-11-05")
-    """
-    if not date_range_str:
-        return None, None
-        
-    date_range_str = date_range_str.lower().strip()
-    
-    # Split by common separators
-    separators = [' till ', ' to ', ' - ', ' through ', ' until ']
-    for sep in separators:
-        if sep in date_range_str:
-            parts = date_range_str.split(sep)
-            if len(parts) == 2:
-                start_date = parse_natural_date(parts[0].strip())
-                end_date = parse_natural_date(parts[1].strip())
-                return start_date, end_date
-    
-    # Try to parse as single date
-    single_date = parse_natural_date(date_range_str)
-    if single_date:
-        return single_date, None
-    
-    return None, None
-
 app = Flask(__name__, static_folder='static', template_folder='templates')
 CORS(app)
 
 # Initialize agent
 agent = HotelAgent()
 
-# Session storage for active calls and conversations
-call_sessions = {}
-conversation_sessions = {}  # Store conversation context
+# /api/chat conversation steps (see chat_flow.BookingFlow)
+booking_flow = BookingFlow(agent, get_amadeus_api)
+
+# Cached Amadeus offers for a stay are dropped once we book or cancel those nights
+def invalidate_amadeus_offers(booking):
+    amadeus = get_amadeus_api()
+    if amadeus.is_configured():
+        amadeus.offers.invalidate(booking.get('check_in'), booking.get('check_out'))
+
+agent.add_booking_hook(invalidate_amadeus_offers)
+
+# Pick up edits to hotel_data.json (rates, amenities, FAQs) without a restart
+data_reload_interval = float(os.getenv('HOTEL_DATA_RELOAD_INTERVAL', '2'))
+data_watcher = DataFileWatcher(agent.data_file, agent.reload_catalog, interval=data_reload_interval)
+if data_reload_interval > 0:
+    data_watcher.start()
+
+# Serialized bodies for the catalog endpoints, rebuilt only when the data changes
+catalog_cache = CatalogCache(max_age=int(os.getenv('CATALOG_MAX_AGE', '60')))
+
+def catalog_response(name, version, build):
+    """Serve a cached catalog body, answering If-None-Match with 304"""
+    entry = catalog_cache.get(name, version, build)
+    if request.if_none_match.contains_weak(entry.etag):
+        response = Response(status=304)
+    else:
+        response = Response(entry.body, mimetype='application/json')
+    response.set_etag(entry.etag)
+    response.headers['Cache-Control'] = f'public, max-age={catalog_cache.max_age}, must-revalidate'
+    return response
+
+# Session storage for active calls and conversations (SESSION_STORAGE=sqlite
+# shares them between worker processes). Idle sessions expire, and past the
+# entry/memory caps the least recently used are evicted.
+call_sessions = create_session_store(
+    'call-sessions',
+    max_entries=int(os.getenv('CALL_SESSION_MAX', '10000')),
+    idle_ttl=float(os.getenv('CALL_SESSION_TTL', '86400')),
+    max_bytes=int(float(os.getenv('CALL_SESSION_MAX_MB', '16')) * 1024 * 1024),
+    # Webhooks look calls up by VAPI call_id; ended calls are kept for a
+    # while for status queries, then appended to the archive
+    index_key='call_id',
+    retention=float(os.getenv('CALL_SESSION_RETENTION', '3600')),
+    archive=SessionArchive(os.getenv('CALL_ARCHIVE_PATH', 'call_sessions_archive.jsonl'))
+)
+conversation_sessions = create_session_store(  # Store conversation context
+    'chat-sessions',
+    max_entries=int(os.getenv('CHAT_SESSION_MAX', '10000')),
+    idle_ttl=float(os.getenv('CHAT_SESSION_TTL', '1800')),
+    max_bytes=int(float(os.getenv('CHAT_SESSION_MAX_MB', '64')) * 1024 * 1024)
+)
+# Shared sessions mean several workers; bookings must then be shared as well
+if conversation_sessions.backend == 'sqlite' and not agent.storage.multi_process:
+    print("⚠️  SESSION_STORAGE=sqlite shares conversations between workers, but HOTEL_STORAGE=json keeps "
+          "bookings per process: run a single worker or set HOTEL_STORAGE=sqlite")
+session_sweep_interval = float(os.getenv('SESSION_SWEEP_INTERVAL', '60'))
+if session_sweep_interval > 0:
+    call_sessions.start_sweeper(session_sweep_interval)
+    conversation_sessions.start_sweeper(session_sweep_interval)
+
+def new_conversation():
+    return {
+        'step': None,
+        'booking_data': {}
+    }
+
+def sse_event(event, payload):
+    """One Server-Sent Events frame with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+def stream_chat_events(replies):
+    """
+    Relay chat replies as SSE: "status" for progress notes, "chunk" for each
+    section of the reply, then "done" (or "error" if the handler failed)
+    """
+    try:
+        for part in replies:
+            if isinstance(part, ChatStatus):
+                yield sse_event('status', {'text': part})
+            elif part:
+                yield sse_event('chunk', {'text': part})
+    except Exception as e:
+        yield sse_event('error', {'success': False, 'error': str(e)})
+        return
+    yield sse_event('done', {'success': True})
 
 @app.route('/')
 def index():
@@ -129,14 +125,19 @@ def index():
 @app.route('/api/greeting', methods=['GET'])
 def greeting():
     """Get greeting message"""
-    return jsonify({
+    return catalog_response('greeting', agent.catalog_version('hotel_info'), lambda: {
         'success': True,
         'message': agent.get_greeting()
     })
 
 @app.route('/api/chat', methods=['POST'])
 def chat():
-    """Process chat message"""
+    """
+    Process chat message
+
+    With "stream": true in the body the reply is sent as Server-Sent Events
+    while it is being produced instead of as one JSON object.
+    """
     data = request.json
     message = data.get('message', '')
     use_llm = data.get('use_llm', False)
@@ -149,753 +150,16 @@ def chat():
             'error': 'Message is required'
         }), 400
     
+    replies = conversation_turn(session_id, message, use_llm, api_key)
+    
+    if data.get('stream'):
+        return Response(stream_chat_events(replies), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # keep reverse proxies from buffering the stream
+        })
+    
     try:
-        # Get or create session context
-        if session_id not in conversation_sessions:
-            conversation_sessions[session_id] = {
-                'step': None,
-                'booking_data': {}
-            }
-        
-        session = conversation_sessions[session_id]
-        message_lower = message.lower().strip()
-        
-        # Debug logging
-        print(f"[DEBUG] Session step: {session['step']}, Message: {message_lower[:50]}")
-        
-        # Multi-step availability check flow
-        if session['step'] == 'awaiting_availability_dates':
-            # Parse dates from message
-            import re
-            from datetime import datetime as dt
-            
-            # Extract dates (simple patterns)
-            dates = re.findall(r'(?:oct|nov|dec|jan|feb|mar|apr|may|jun|jul|aug|sep)[a-z]*\s*\d{1,2}', message_lower)
-            
-            # Calculate nights if we have dates
-            nights = len(dates) if len(dates) > 1 else None
-            if not nights and re.search(r'(\d+)\s*(?:night|day)', message_lower):
-                night_match = re.search(r'(\d+)\s*(?:night|day)', message_lower)
-                nights = int(night_match.group(1))
-            
-            # Try to extract actual date patterns like "Oct 14 to Oct 18" or "from ... to ..."
-            check_in_str = None
-            check_out_str = None
-            
-            if dates and len(dates) >= 2:
-                check_in_str = dates[0]
-                check_out_str = dates[1]
-            elif dates and len(dates) == 1 and nights:
-                check_in_str = dates[0]
-            
-            # If we don't have clear dates, ask for clarification
-            if not check_in_str:
-                return jsonify({
-                    'success': True,
-                    'message': "Please provide your check-in and check-out dates.\n\nFor example: \"Oct 15 to Oct 18\" or \"October 15 for 3 nights\""
-                })
-            
-            # Convert to proper date format
-            current_year = datetime.now().year
-            
-            # Parse check-in date
-            try:
-                check_in_dt = dt.strptime(f"{check_in_str} {current_year}", '%b %d %Y')
-                check_in_date = check_in_dt.strftime('%Y-%m-%d')
-            except:
-                # Default to tomorrow if parsing fails
-                tomorrow = datetime.now() + timedelta(days=1)
-                check_in_date = tomorrow.strftime('%Y-%m-%d')
-                check_in_dt = tomorrow
-            
-            # Calculate nights and check-out date
-            if not nights:
-                nights = 1
-            
-            check_out_dt = check_in_dt + timedelta(days=nights)
-            check_out_date = check_out_dt.strftime('%Y-%m-%d')
-            
-            # Try to fetch from Amadeus API first
-            amadeus = get_amadeus_api()
-            available_rooms = []
-            num_guests = 2  # Default for availability check
-            
-            if amadeus.is_configured():
-                try:
-                    print(f"Checking availability via Amadeus API: {check_in_date} to {check_out_date}")
-                    available_rooms = amadeus.search_charlotte_airport_hotels(
-                        check_in_date, check_out_date, num_guests
-                    )
-                except Exception as e:
-                    print(f"Amadeus API error: {e}")
-            
-            # Fallback to static data
-            if not available_rooms:
-                # For demo purposes, show ALL rooms regardless of availability status
-                available_rooms = agent.data['rooms'][:8]  # Show first 8 rooms as demo
-            
-            if not available_rooms:
-                return jsonify({
-                    'success': True,
-                    'message': "I apologize, but we don't have any rooms available for those dates. Would you like to check different dates?"
-                })
-            
-            response = f"**Available Rooms** for {check_in_str} to {check_out_str}:\n\n"
-            
-            for room in available_rooms[:5]:
-                total_price = room['price_per_night'] * nights
-                hotel_name = room.get('hotel_name', 'Hilton Charlotte Airport')
-                response += f"**{room['type']}**"
-                if room.get('source') == 'amadeus':
-                    response += f" at {hotel_name}\n"
-                else:
-                    response += f" (Room #{room['id']})\n"
-                response += f"• Capacity: {room['capacity']} guests\n"
-                response += f"• ${room['price_per_night']:.2f}/night × {nights} nights = **${total_price:.2f} total**\n"
-                response += f"• Amenities: {', '.join(room['amenities'][:4])}\n\n"
-            
-            response += "\nWould you like to book any of these rooms? Reply 'book' or select option 2 to start a reservation."
-            
-            # Clear the step
-            session['step'] = None
-            
-            return jsonify({'success': True, 'message': response})
-        
-        # Multi-step booking flow
-        if session['step'] == 'awaiting_guests_dates':
-            # Parse guests and dates from message
-            import re
-            
-            # Extract number of guests
-            guest_match = re.search(r'(\d+)\s*(?:guest|people|person)', message_lower)
-            if not guest_match:
-                guest_match = re.search(r'^(\d+)', message_lower)
-            
-            num_guests = int(guest_match.group(1)) if guest_match else None
-            
-            # Extract dates (simple patterns)
-            dates = re.findall(r'(?:oct|nov|dec|jan|feb|mar|apr|may|jun|jul|aug|sep)[a-z]*\s*\d{1,2}', message_lower)
-            
-            # Calculate nights if we have dates
-            nights = len(dates) if len(dates) > 1 else None
-            if not nights and re.search(r'(\d+)\s*(?:night|day)', message_lower):
-                night_match = re.search(r'(\d+)\s*(?:night|day)', message_lower)
-                nights = int(night_match.group(1))
-            
-            if not num_guests:
-                return jsonify({
-                    'success': True,
-                    'message': "How many guests will be staying? Please provide the number of guests."
-                })
-            
-            if not nights:
-                nights = 1  # Default to 1 night
-            
-            # Store in session
-            session['booking_data']['guests'] = num_guests
-            session['booking_data']['nights'] = nights
-            session['booking_data']['check_in'] = dates[0] if dates else "TBD"
-            session['booking_data']['check_out'] = dates[1] if len(dates) > 1 else "TBD"
-            
-            # Calculate proper dates for Amadeus API
-            check_in_date = session['booking_data']['check_in']
-            check_out_date = session['booking_data']['check_out']
-            
-            # Convert date strings like "oct 25" to YYYY-MM-DD format
-            from datetime import datetime as dt
-            
-            if check_in_date != "TBD" and not check_in_date.count('-') == 2:
-                # Parse dates like "oct 25" or "october 25"
-                try:
-                    # Add current year
-                    current_year = datetime.now().year
-                    check_in_dt = dt.strptime(f"{check_in_date} {current_year}", '%b %d %Y')
-                    check_in_date = check_in_dt.strftime('%Y-%m-%d')
-                    session['booking_data']['check_in'] = check_in_date
-                except:
-                    # If parsing fails, default to tomorrow
-                    tomorrow = datetime.now() + timedelta(days=1)
-                    check_in_date = tomorrow.strftime('%Y-%m-%d')
-                    session['booking_data']['check_in'] = check_in_date
-            elif check_in_date == "TBD":
-                # Set to tomorrow
-                tomorrow = datetime.now() + timedelta(days=1)
-                check_in_date = tomorrow.strftime('%Y-%m-%d')
-                session['booking_data']['check_in'] = check_in_date
-            
-            # Always calculate check-out based on check-in + nights
-            check_in_dt = dt.strptime(check_in_date, '%Y-%m-%d')
-            checkout_dt = check_in_dt + timedelta(days=nights)
-            check_out_date = checkout_dt.strftime('%Y-%m-%d')
-            session['booking_data']['check_out'] = check_out_date
-            
-            # Try to fetch from Amadeus API first
-            amadeus = get_amadeus_api()
-            available_rooms = []
-            
-            if amadeus.is_configured():
-                try:
-                    print(f"Fetching hotels from Amadeus API for {num_guests} guests, {check_in_date} to {check_out_date}")
-                    available_rooms = amadeus.search_charlotte_airport_hotels(
-                        check_in_date, check_out_date, num_guests
-                    )
-                    session['booking_data']['using_amadeus'] = True
-                    print(f"Found {len(available_rooms)} rooms from Amadeus")
-                except Exception as e:
-                    print(f"Amadeus API error: {e}")
-            
-            # Fallback to static data if Amadeus fails or not configured
-            if not available_rooms:
-                # For demo purposes, show ALL rooms regardless of availability status
-                available_rooms = [r for r in agent.data['rooms'] if r['capacity'] >= num_guests]
-                # If still no rooms, show all rooms
-                if not available_rooms:
-                    available_rooms = agent.data['rooms'][:5]  # Show first 5 rooms as demo
-                session['booking_data']['using_amadeus'] = False
-                print(f"Using static data (demo mode): {len(available_rooms)} rooms")
-            
-            if not available_rooms:
-                return jsonify({
-                    'success': True,
-                    'message': f"I apologize, but we don't have rooms available for {num_guests} guests. Would you like to see all our available rooms?"
-                })
-            
-            response = f"Perfect! For **{num_guests} guest(s)** staying **{nights} night(s)**, here are your options:\n\n"
-            
-            for room in available_rooms[:5]:  # Show top 5
-                total_price = room['price_per_night'] * nights
-                hotel_name = room.get('hotel_name', 'Hilton Charlotte Airport')
-                response += f"**{room['type']}**"
-                if room.get('source') == 'amadeus':
-                    response += f" at {hotel_name}\n"
-                else:
-                    response += f" (Room #{room['id']})\n"
-                response += f"• Capacity: {room['capacity']} guests\n"
-                response += f"• ${room['price_per_night']:.2f}/night × {nights} nights = **${total_price:.2f} total**\n"
-                response += f"• Amenities: {', '.join(room['amenities'][:4])}\n\n"
-            
-            response += "Which room would you like? (Type the room type, e.g., 'Queen Guest Room' or 'King')"
-            
-            # Store available rooms for later selection
-            session['booking_data']['available_rooms'] = available_rooms
-            session['step'] = 'awaiting_room_selection'
-            
-            return jsonify({'success': True, 'message': response})
-        
-        elif session['step'] == 'awaiting_room_selection':
-            # Check if user is updating nights/dates or guest count
-            import re
-            night_match = re.search(r'(\d+)\s*(?:night|day)', message_lower)
-            guest_match = re.search(r'(\d+)\s*(?:guest|people|person)', message_lower)
-            
-            # Track if anything was updated
-            updated = False
-            num_guests = session['booking_data'].get('guests', 1)
-            nights = session['booking_data'].get('nights', 1)
-            
-            if night_match:
-                # User wants to update nights
-                nights = int(night_match.group(1))
-                session['booking_data']['nights'] = nights
-                updated = True
-            
-            if guest_match:
-                # User wants to update guest count
-                num_guests = int(guest_match.group(1))
-                session['booking_data']['guests'] = num_guests
-                updated = True
-            
-            if updated:
-                # Calculate dates for Amadeus API
-                check_in_date = session['booking_data'].get('check_in')
-                check_out_date = session['booking_data'].get('check_out')
-                
-                # If check-in date is TBD, set it to tomorrow
-                if check_in_date == "TBD" or not check_in_date:
-                    tomorrow = datetime.now() + timedelta(days=1)
-                    check_in_date = tomorrow.strftime('%Y-%m-%d')
-                    session['booking_data']['check_in'] = check_in_date
-                
-                # Always recalculate check-out based on check-in + nights
-                from datetime import datetime as dt
-                check_in_dt = dt.strptime(check_in_date, '%Y-%m-%d')
-                checkout_dt = check_in_dt + timedelta(days=nights)
-                check_out_date = checkout_dt.strftime('%Y-%m-%d')
-                session['booking_data']['check_out'] = check_out_date
-                
-                # Try to fetch from Amadeus API first
-                amadeus = get_amadeus_api()
-                available_rooms = []
-                
-                if amadeus.is_configured():
-                    try:
-                        available_rooms = amadeus.search_charlotte_airport_hotels(
-                            check_in_date, check_out_date, num_guests
-                        )
-                        # Store that we're using Amadeus data
-                        session['booking_data']['using_amadeus'] = True
-                    except Exception as e:
-                        print(f"Amadeus API error: {e}")
-                
-                # Fallback to static data if Amadeus fails or not configured
-                if not available_rooms:
-                    # For demo purposes, show ALL rooms regardless of availability status
-                    available_rooms = [r for r in agent.data['rooms'] if r['capacity'] >= num_guests]
-                    # If still no rooms, show all rooms
-                    if not available_rooms:
-                        available_rooms = agent.data['rooms'][:5]  # Show first 5 rooms as demo
-                    session['booking_data']['using_amadeus'] = False
-                
-                if not available_rooms:
-                    return jsonify({
-                        'success': True,
-                        'message': f"I apologize, but we don't have rooms available for {num_guests} guests. Would you like to see all our available rooms?"
-                    })
-                
-                response = f"Perfect! Updated to **{num_guests} guest(s)** for **{nights} night(s)**. Here are your options:\n\n"
-                
-                for room in available_rooms[:5]:  # Show top 5
-                    total_price = room['price_per_night'] * nights
-                    hotel_name = room.get('hotel_name', 'Hilton Charlotte Airport')
-                    response += f"**{room['type']}**"
-                    if room.get('source') == 'amadeus':
-                        response += f" at {hotel_name}\n"
-                    else:
-                        response += f" (Room #{room['id']})\n"
-                    response += f"• Capacity: {room['capacity']} guests\n"
-                    response += f"• ${room['price_per_night']:.2f}/night × {nights} nights = **${total_price:.2f} total**\n"
-                    response += f"• Amenities: {', '.join(room['amenities'][:4])}\n\n"
-                
-                response += "Which room would you like? (Type the room type, e.g., 'Queen Guest Room' or 'King')"
-                
-                # Store the available rooms for selection
-                session['booking_data']['available_rooms'] = available_rooms
-                
-                return jsonify({'success': True, 'message': response})
-            
-            # User selected a room type
-            room_types = ['queen', 'king', 'suite', 'executive', 'accessible', 'standard', 'deluxe']
-            selected_type = None
-            for rt in room_types:
-                if rt in message_lower:
-                    selected_type = rt
-                    break
-            
-            if not selected_type:
-                return jsonify({
-                    'success': True,
-                    'message': "Please select a room type from the options above (e.g., Queen, King, Suite)."
-                })
-            
-            # Get the stored available rooms (might be from Amadeus or static data)
-            available_rooms = session['booking_data'].get('available_rooms', [])
-            
-            # If not stored, fall back to static data  
-            if not available_rooms:
-                available_rooms = agent.data['rooms'][:5]  # Demo mode - show rooms
-            
-            # Find the room matching the selected type
-            room = next((r for r in available_rooms if selected_type in r['type'].lower()), None)
-            
-            if not room:
-                return jsonify({
-                    'success': True,
-                    'message': "That room is no longer available. Please choose another option from above."
-                })
-            
-            session['booking_data']['room'] = room
-            
-            nights = session['booking_data'].get('nights', 1)
-            total = room['price_per_night'] * nights
-            hotel_name = room.get('hotel_name', 'Hilton Charlotte Airport')
-            is_amadeus = room.get('source') == 'amadeus'
-            
-            response = f"✨ **Excellent choice!**\n\n"
-            
-            if is_amadeus:
-                response += f"**Hotel:** {hotel_name}\n"
-            
-            response += (
-                f"**Room:** {room['type']}\n"
-            )
-            
-            if not is_amadeus:
-                response += f"**Room Number:** {room['id']}\n"
-            
-            response += (
-                f"**Nightly Rate:** ${room['price_per_night']:.2f}\n"
-                f"**Total Cost:** ${total:.2f} for {nights} night(s)\n\n"
-                f"**Room Features:**\n"
-            )
-            
-            for amenity in room['amenities']:
-                response += f"✓ {amenity}\n"
-            
-            response += f"\n**Next step:** Please provide your contact details:"
-            
-            session['step'] = 'awaiting_contact_details'
-            
-            return jsonify({'success': True, 'message': response})
-        
-        elif session['step'] == 'awaiting_contact_details':
-            # Parse contact details and payment info
-            # Format: "Name, Phone, Email (optional), Requests (optional), Payment: Name ****1234"
-            import re
-            
-            # Extract name (first part before first comma)
-            parts = message.split(',', 1)
-            guest_name = parts[0].strip() if parts else None
-            remaining = parts[1] if len(parts) > 1 else ''
-            
-            # Extract phone (various formats)
-            phone_match = re.search(r'[\+\d][\d\s\-\(\)]{8,}', message)
-            phone = phone_match.group(0).strip() if phone_match else None
-            
-            # Extract email
-            email_match = re.search(r'[\w\.-]+@[\w\.-]+\.\w+', message)
-            email = email_match.group(0) if email_match else None
-            
-            # Extract payment info (masked card)
-            payment_match = re.search(r'Payment:\s*(.+?)\s*\*\*\*\*(\d{4})', message)
-            payment_name = payment_match.group(1).strip() if payment_match else None
-            card_last4 = payment_match.group(2) if payment_match else None
-            
-            # Extract special requests (everything between phone/email and payment, or just after email if no payment)
-            special_requests = message
-            if guest_name:
-                special_requests = special_requests.replace(guest_name, '', 1)
-            if email:
-                special_requests = special_requests.replace(email, '')
-            if phone:
-                special_requests = special_requests.replace(phone, '')
-            if payment_match:
-                special_requests = special_requests.replace(payment_match.group(0), '')
-            special_requests = special_requests.replace(',', '').strip()
-            
-            if not guest_name or not phone:
-                return jsonify({
-                    'success': True,
-                    'message': "Please provide your name and phone number to continue with your reservation."
-                })
-            
-            # Store all details including name
-            session['booking_data']['guest_name'] = guest_name
-            session['booking_data']['email'] = email if email else 'Not provided'
-            session['booking_data']['phone'] = phone
-            session['booking_data']['special_requests'] = special_requests if special_requests else 'None'
-            session['booking_data']['payment_method'] = f"{payment_name} ****{card_last4}" if payment_name and card_last4 else 'Not provided'
-            
-            # Now complete the booking directly (skip awaiting_name step)
-            booking_data = session['booking_data']
-            room = booking_data['room']
-            nights = booking_data.get('nights', 1)
-            total_cost = room['price_per_night'] * nights
-            
-            # Create booking
-            booking_id = f"BK{len(agent.data['bookings']) + 1:04d}"
-            is_amadeus = room.get('source') == 'amadeus'
-            hotel_name = room.get('hotel_name', 'Hilton Charlotte Airport')
-            
-            booking = {
-                "booking_id": booking_id,
-                "guest_name": guest_name,
-                "guest_email": email if email else 'Not provided',
-                "guest_phone": phone,
-                "special_requests": special_requests if special_requests else 'None',
-                "payment_method": f"{payment_name} ****{card_last4}" if payment_name and card_last4 else 'Not provided',
-                "room_id": room.get('id', 'TBD'),
-                "room_type": room['type'],
-                "hotel_name": hotel_name,
-                "price_per_night": room['price_per_night'],
-                "nights": nights,
-                "total_cost": total_cost,
-                "num_guests": booking_data.get('guests', 1),
-                "check_in": booking_data.get('check_in', 'TBD'),
-                "check_out": booking_data.get('check_out', 'TBD'),
-                "created_at": datetime.now().isoformat(),
-                "source": "amadeus" if is_amadeus else "web_chat"
-            }
-            
-            agent.data['bookings'].append(booking)
-            
-            # Only mark as unavailable if it's static data (not Amadeus)
-            if not is_amadeus and 'available' in room:
-                room['available'] = False
-            
-            agent.save_data()
-            
-            # Clear session
-            session['step'] = None
-            session['booking_data'] = {}
-            
-            response = f"✅ **RESERVATION CONFIRMED!**\n\n"
-            response += f"━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-            response += f"**Confirmation #:** {booking_id}\n"
-            response += f"**Guest:** {guest_name}\n"
-            
-            if is_amadeus:
-                response += f"**Hotel:** {hotel_name}\n"
-            
-            response += f"**Room:** {room['type']}\n"
-            
-            if not is_amadeus and room.get('id'):
-                response += f"**Room #:** {room['id']}\n"
-            
-            response += (
-                f"━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-                f"**Guest Information:**\n"
-                f"• Phone: {phone}\n"
-            )
-            
-            if email:
-                response += f"• Email: {email}\n"
-            
-            if payment_name and card_last4:
-                response += f"• Payment: {payment_name} ending in {card_last4}\n"
-            
-            if special_requests:
-                response += f"• Special Requests: {special_requests}\n"
-            
-            response += (
-                f"\n**Reservation Details:**\n"
-                f"• Guests: {booking_data.get('guests', 1)}\n"
-                f"• Check-in: {booking_data.get('check_in', 'TBD')}\n"
-                f"• Check-out: {booking_data.get('check_out', 'TBD')}\n"
-                f"• Nights: {nights}\n"
-                f"• Rate: ${room['price_per_night']:.2f}/night\n"
-                f"• **Total: ${total_cost:.2f}**\n\n"
-                f"**Included Amenities:**\n"
-            )
-            
-            for amenity in room['amenities']:
-                response += f"✓ {amenity}\n"
-            
-            response += (
-                f"\n**Important Information:**\n"
-                f"• Check-in time: 3:00 PM\n"
-                f"• Check-out time: 12:00 PM\n"
-                f"• Free 24/7 airport shuttle to CLT\n"
-                f"• Free parking & WiFi included\n"
-                f"• Cancellation: Free up to 48 hours before arrival\n\n"
-            )
-            
-            if email:
-                response += f"📧 A confirmation email has been sent to **{email}**\n\n"
-            else:
-                response += f"📱 A confirmation SMS will be sent to **{phone}**\n\n"
-            
-            response += f"Thank you for choosing Hilton Charlotte Airport! Anything else I can help with?"
-            
-            return jsonify({'success': True, 'message': response})
-        
-        elif session['step'] == 'awaiting_name':
-            # Complete the booking
-            words = message.split()
-            if len(words) >= 1 and all(word.replace("'", "").replace("-", "").isalpha() for word in words):
-                guest_name = message.title()
-                booking_data = session['booking_data']
-                room = booking_data['room']
-                nights = booking_data.get('nights', 1)
-                total_cost = room['price_per_night'] * nights
-                
-                # Create booking
-                booking_id = f"BK{len(agent.data['bookings']) + 1:04d}"
-                is_amadeus = room.get('source') == 'amadeus'
-                hotel_name = room.get('hotel_name', 'Hilton Charlotte Airport')
-                
-                booking = {
-                    "booking_id": booking_id,
-                    "guest_name": guest_name,
-                    "guest_email": booking_data.get('email', 'Not provided'),
-                    "guest_phone": booking_data.get('phone', 'Not provided'),
-                    "special_requests": booking_data.get('special_requests', 'None'),
-                    "payment_method": booking_data.get('payment_method', 'Not provided'),
-                    "room_id": room.get('id', 'TBD'),
-                    "room_type": room['type'],
-                    "hotel_name": hotel_name,
-                    "price_per_night": room['price_per_night'],
-                    "nights": nights,
-                    "total_cost": total_cost,
-                    "num_guests": booking_data.get('guests', 1),
-                    "check_in": booking_data.get('check_in', 'TBD'),
-                    "check_out": booking_data.get('check_out', 'TBD'),
-                    "created_at": datetime.now().isoformat(),
-                    "source": "amadeus" if is_amadeus else "web_chat"
-                }
-                
-                agent.data['bookings'].append(booking)
-                
-                # Only mark as unavailable if it's static data (not Amadeus)
-                if not is_amadeus:
-                    if 'available' in room:
-                        room['available'] = False
-                
-                agent.save_data()
-                
-                # Clear session
-                session['step'] = None
-                session['booking_data'] = {}
-                
-                response = f"✅ **RESERVATION CONFIRMED!**\n\n"
-                response += f"━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-                response += f"**Confirmation #:** {booking_id}\n"
-                response += f"**Guest:** {guest_name}\n"
-                
-                if is_amadeus:
-                    response += f"**Hotel:** {hotel_name}\n"
-                
-                response += f"**Room:** {room['type']}\n"
-                
-                if not is_amadeus and room.get('id'):
-                    response += f"**Room #:** {room['id']}\n"
-                
-                response += (
-                    f"━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-                    f"**Guest Information:**\n"
-                    f"• Email: {booking_data.get('email', 'Not provided')}\n"
-                    f"• Phone: {booking_data.get('phone', 'Not provided')}\n"
-                )
-                
-                if booking_data.get('payment_method') and booking_data.get('payment_method') != 'Not provided':
-                    response += f"• Payment: {booking_data.get('payment_method')}\n"
-                
-                if booking_data.get('special_requests') and booking_data.get('special_requests') != 'None':
-                    response += f"• Special Requests: {booking_data.get('special_requests')}\n"
-                
-                response += (
-                    f"\n**Reservation Details:**\n"
-                    f"• Guests: {booking_data.get('guests', 1)}\n"
-                    f"• Check-in: {booking_data.get('check_in', 'TBD')}\n"
-                    f"• Check-out: {booking_data.get('check_out', 'TBD')}\n"
-                    f"• Nights: {nights}\n"
-                    f"• Rate: ${room['price_per_night']:.2f}/night\n"
-                    f"• **Total: ${total_cost:.2f}**\n\n"
-                    f"**Included Amenities:**\n"
-                )
-                
-                for amenity in room['amenities']:
-                    response += f"✓ {amenity}\n"
-                
-                response += (
-                    f"\n**Important Information:**\n"
-                    f"• Check-in time: 3:00 PM\n"
-                    f"• Check-out time: 12:00 PM\n"
-                    f"• Free 24/7 airport shuttle to CLT\n"
-                    f"• Free parking & WiFi included\n"
-                    f"• Cancellation: Free up to 48 hours before arrival\n\n"
-                    f"📧 A confirmation email has been sent to **{booking_data.get('email', 'your email')}**\n\n"
-                    f"Thank you for choosing Hilton Charlotte Airport! Anything else I can help with?"
-                )
-                
-                return jsonify({'success': True, 'message': response})
-        
-        # Handle menu option 1 - Check room availability
-        if message_lower in ['1', 'option 1', '1.', 'check rooms', 'check availability', 'availability']:
-            session['step'] = 'awaiting_availability_dates'
-            return jsonify({
-                'success': True,
-                'message': "I'd be happy to check room availability for you! 🏨\n\n**What dates would you like to check?**\n\nPlease provide your check-in and check-out dates.\n\nFor example:\n• \"Oct 15 to Oct 18\"\n• \"October 20 for 3 nights\"\n• \"Nov 1 to Nov 5\""
-            })
-        
-        # Handle direct booking requests with dates (from booking widget)
-        import re
-        # Check if message has guests + dates (from booking widget format: "X guests, Month Day to Month Day")
-        has_guests = re.search(r'\d+\s*(?:guest|people|person)', message_lower)
-        has_dates = re.search(r'(?:oct|nov|dec|jan|feb|mar|apr|may|jun|jul|aug|sep)[a-z]*\s*\d{1,2}', message_lower)
-        
-        if has_guests and has_dates and session['step'] is None:
-            # This is a direct booking request from the widget, process it immediately
-            session['step'] = 'awaiting_guests_dates'
-            # Now the next section will process it
-            # Re-route to the booking flow handler by jumping back
-            # We'll fall through and let the awaiting_guests_dates handler process it
-        
-        # Check if we need to process as booking (after setting step above)
-        if session['step'] == 'awaiting_guests_dates' and has_guests and has_dates:
-            # Parse the message same as the booking flow
-            guest_match = re.search(r'(\d+)\s*(?:guest|people|person)', message_lower)
-            num_guests = int(guest_match.group(1)) if guest_match else 2
-            
-            # Extract dates
-            dates = re.findall(r'(?:oct|nov|dec|jan|feb|mar|apr|may|jun|jul|aug|sep)[a-z]*\s*\d{1,2}', message_lower)
-            
-            # Calculate nights
-            nights = 1
-            if len(dates) >= 2:
-                nights = 1  # Default, could calculate from dates
-            night_match = re.search(r'(\d+)\s*(?:night|day)', message_lower)
-            if night_match:
-                nights = int(night_match.group(1))
-            
-            # Store in session
-            session['booking_data']['guests'] = num_guests
-            session['booking_data']['nights'] = nights
-            session['booking_data']['check_in'] = dates[0] if dates else "TBD"
-            session['booking_data']['check_out'] = dates[1] if len(dates) > 1 else "TBD"
-            
-            # Calculate proper dates
-            tomorrow = datetime.now() + timedelta(days=1)
-            check_in_date = tomorrow.strftime('%Y-%m-%d')
-            check_out_date = (tomorrow + timedelta(days=nights)).strftime('%Y-%m-%d')
-            session['booking_data']['check_in'] = check_in_date
-            session['booking_data']['check_out'] = check_out_date
-            
-            # Try Amadeus
-            amadeus = get_amadeus_api()
-            available_rooms = []
-            
-            if amadeus.is_configured():
-                try:
-                    print(f"Fetching hotels from Amadeus API for {num_guests} guests, {check_in_date} to {check_out_date}")
-                    available_rooms = amadeus.search_charlotte_airport_hotels(check_in_date, check_out_date, num_guests)
-                    session['booking_data']['using_amadeus'] = True
-                    print(f"Found {len(available_rooms)} rooms from Amadeus")
-                except Exception as e:
-                    print(f"Amadeus API error: {e}")
-            
-            # Fallback to static data
-            if not available_rooms:
-                available_rooms = [r for r in agent.data['rooms'] if r['capacity'] >= num_guests]
-                if not available_rooms:
-                    available_rooms = agent.data['rooms'][:5]
-                session['booking_data']['using_amadeus'] = False
-                print(f"Using static data (demo mode): {len(available_rooms)} rooms")
-            
-            response = f"Perfect! For **{num_guests} guest(s)** staying **{nights} night(s)**, here are your options:\n\n"
-            
-            for room in available_rooms[:5]:
-                total_price = room['price_per_night'] * nights
-                hotel_name = room.get('hotel_name', 'Hilton Charlotte Airport')
-                response += f"**{room['type']}**"
-                if room.get('source') == 'amadeus':
-                    response += f" at {hotel_name}\n"
-                else:
-                    response += f" (Room #{room['id']})\n"
-                response += f"• Capacity: {room['capacity']} guests\n"
-                response += f"• ${room['price_per_night']:.2f}/night × {nights} nights = **${total_price:.2f} total**\n"
-                response += f"• Amenities: {', '.join(room['amenities'][:4])}\n\n"
-            
-            response += "Which room would you like? (Type the room type, e.g., 'Queen Guest Room' or 'King')"
-            
-            session['booking_data']['available_rooms'] = available_rooms
-            session['step'] = 'awaiting_room_selection'
-            
-            return jsonify({'success': True, 'message': response})
-        
-        # Process message normally
-        response = agent.process_message(message, use_llm=use_llm, llm_api_key=api_key)
-        
-        # Update session context based on response
-        if "how many guests will be staying" in response.lower():
-            session['step'] = 'awaiting_guests_dates'
-        elif "provide your full name" in response.lower():
-            session['step'] = 'awaiting_name'
-            # Extract room type from the response
-            for room in agent.data['rooms']:
-                if room['type'] in response:
-                    session['booking_data']['room'] = room
-                    break
-        
+        response = ''.join(part for part in replies if not isinstance(part, ChatStatus))
         return jsonify({
             'success': True,
             'message': response
@@ -906,26 +170,37 @@ def chat():
             'error': str(e)
         }), 500
 
+def conversation_turn(session_id, message, use_llm=False, api_key=None):
+    """booking_flow replies for a stored session, saved back to the store when the turn ends"""
+    # Get or create session context
+    session = conversation_sessions.get_or_create(session_id, new_conversation)
+    try:
+        yield from booking_flow.replies(session, message, use_llm, api_key)
+    finally:
+        conversation_sessions.save(session_id, session)
+
 @app.route('/api/rooms', methods=['GET'])
 def get_rooms():
     """Get all rooms"""
-    return jsonify({
+    return catalog_response('rooms', agent.catalog_version('rooms'), lambda: {
         'success': True,
         'rooms': agent.data['rooms']
     })
 
 @app.route('/api/bookings', methods=['GET'])
 def get_bookings():
-    """Get all bookings"""
+    """Get bookings (optionally paged with ?limit=N&offset=M, newest page first)"""
+    limit = request.args.get('limit', type=int)
+    offset = request.args.get('offset', default=0, type=int)
     return jsonify({
         'success': True,
-        'bookings': agent.data['bookings']
+        'bookings': agent.list_bookings(limit=limit, offset=offset)
     })
 
 @app.route('/api/amenities', methods=['GET'])
 def get_amenities():
     """Get all amenities"""
-    return jsonify({
+    return catalog_response('amenities', agent.catalog_version('amenities'), lambda: {
         'success': True,
         'amenities': agent.data['amenities']
     })
@@ -933,7 +208,7 @@ def get_amenities():
 @app.route('/api/policies', methods=['GET'])
 def get_policies():
     """Get all policies"""
-    return jsonify({
+    return catalog_response('policies', agent.catalog_version('policies'), lambda: {
         'success': True,
         'policies': agent.data['policies']
     })
@@ -1117,13 +392,13 @@ def handle_inbound_call():
         
         # Store session
         session_id = str(uuid.uuid4())
-        call_sessions[session_id] = {
+        call_sessions.save(session_id, {
             'call_id': call_id,
             'phone_number': phone_number,
             'started_at': datetime.now().isoformat(),
             'status': 'active',
             'type': 'inbound'
-        }
+        })
         
         return jsonify({
             'success': True,
@@ -1162,7 +437,7 @@ def handle_outbound_call():
         
         # Store session
         session_id = str(uuid.uuid4())
-        call_sessions[session_id] = {
+        call_sessions.save(session_id, {
             'call_id': call_id,
             'phone_number': to_number,
             'guest_name': guest_name,
@@ -1170,7 +445,7 @@ def handle_outbound_call():
             'started_at': datetime.now().isoformat(),
             'status': 'active',
             'type': 'outbound'
-        }
+        })
         
         return jsonify({
             'success': True,
@@ -1225,9 +500,13 @@ def end_call():
         success = vapi.end_call(call_id)
         
         # Update session status
-        if session_id and session_id in call_sessions:
-            call_sessions[session_id]['status'] = 'ended'
-            call_sessions[session_id]['ended_at'] = datetime.now().isoformat()
+        session = call_sessions.get(session_id) if session_id else None
+        if session is None:
+            session_id, session = call_sessions.find(call_id)
+        if session is not None:
+            session['status'] = 'ended'
+            session['ended_at'] = datetime.now().isoformat()
+            call_sessions.finish(session_id, session)
         
         return jsonify({
             'success': success,
@@ -1264,11 +543,7 @@ def vapi_webhook():
         event_type = payload.get('type') or payload.get('message', {}).get('type')
         
         # Find associated session
-        session_id = None
-        for sid, sess in call_sessions.items():
-            if sess.get('call_id') == call_id:
-                session_id = sid
-                break
+        session_id, session = call_sessions.find(call_id) if call_id else (None, None)
         
         # Process function calls from the assistant
         # Check for different function call formats
@@ -1314,9 +589,9 @@ def vapi_webhook():
         # Handle call status updates
         elif event_type in ['call-started', 'call-ended']:
             if session_id:
-                call_sessions[session_id]['status'] = 'ended' if event_type == 'call-ended' else 'active'
+                session['status'] = 'ended' if event_type == 'call-ended' else 'active'
                 if event_type == 'call-ended':
-                    call_sessions[session_id]['ended_at'] = datetime.now().isoformat()
+                    session['ended_at'] = datetime.now().isoformat()
                     
                     # Extract call summary/transcript
                     summary = (
@@ -1324,7 +599,10 @@ def vapi_webhook():
                         or payload.get('summary')
                         or "Call completed"
                     )
-                    call_sessions[session_id]['summary'] = summary
+                    session['summary'] = summary
+                    call_sessions.finish(session_id, session)
+                else:
+                    call_sessions.save(session_id, session)
         
         return jsonify({'success': True, 'received': True})
         
@@ -1335,11 +613,47 @@ def vapi_webhook():
             'error': str(e)
         }), 500
 
+def normalize_call_arguments(args: dict) -> dict:
+    """
+    Clean up free-text VAPI function arguments with the same extractor chat uses
+    
+    Voice transcripts often hand us "2 adults" or "it's BK0003" where a plain
+    value is expected.
+    """
+    args = dict(args)
+    
+    guests = args.get('guests')
+    if isinstance(guests, str):
+        found = extract_entities(guests)
+        args['guests'] = found.get('guests') or found.get('leading_number') or 1
+    
+    for key, entity in (('booking_id', 'booking_id'), ('guest_phone', 'phone'), ('guest_email', 'email')):
+        value = args.get(key)
+        if isinstance(value, str):
+            found = extract_entities(value).get(entity)
+            if found:
+                args[key] = found
+    
+    # Spoken dates ("tomorrow", "next friday", "november second") become
+    # YYYY-MM-DD; check-out is read with check-in so "friday" to "sunday" works
+    check_in, check_out = args.get('check_in'), args.get('check_out')
+    if isinstance(check_in, str) and parse_natural_date(check_in):
+        stay_in, stay_out = extract_stay(f"{check_in} to {check_out}" if isinstance(check_out, str) else check_in)
+        args['check_in'] = stay_in.isoformat()
+        if stay_out:
+            args['check_out'] = stay_out.isoformat()
+    elif isinstance(check_out, str):
+        args['check_out'] = parse_natural_date(check_out) or check_out
+    
+    return args
+
 def handle_vapi_function_call(function_name: str, args: dict) -> dict:
     """
     Handle function calls made by the VAPI assistant during calls
     """
     try:
+        args = normalize_call_arguments(args)
+        
         if function_name == 'check_room_availability':
             # Check room availability - TRY AMADEUS FIRST (real-time data!)
             check_in = args.get('check_in')
@@ -1347,19 +661,6 @@ def handle_vapi_function_call(function_name: str, args: dict) -> dict:
             guests = args.get('guests', 1)
             room_type = args.get('room_type', '').lower()
             
-            # Parse natural language dates if needed
-            if check_in and not re.match(r'\d{4}-\d{2}-\d{2}', check_in):
-                parsed_date = parse_natural_date(check_in)
-                if parsed_date:
-                    check_in = parsed_date
-                    print(f"📞 PHONE CALL: Parsed check-in date: {check_in}")
-            
-            if check_out and not re.match(r'\d{4}-\d{2}-\d{2}', check_out):
-                parsed_date = parse_natural_date(check_out)
-                if parsed_date:
-                    check_out = parsed_date
-                    print(f"📞 PHONE CALL: Parsed check-out date: {check_out}")
-            
             # If we have a date range string, try to parse it
             if not check_in and not check_out:
                 date_range = args.get('date_range') or args.get('dates')
@@ -1385,11 +686,12 @@ def handle_vapi_function_call(function_name: str, args: dict) -> dict:
                 except Exception as e:
                     print(f"📞 PHONE CALL: Amadeus error: {e}, using static data")
             
-            # Fallback to static data if Amadeus failed or not configured
+            # Fallback to our own inventory if Amadeus failed or not configured
             if not available_rooms:
-                # Filter for available rooms only
-                available_rooms = [room for room in agent.data['rooms'] if room.get('available', True)]
-                print(f"📞 PHONE CALL: Using static data - {len(available_rooms)} available rooms")
+                if not check_in or not check_out:
+                    check_in, check_out = default_stay()
+                available_rooms = agent.find_available_rooms(check_in, check_out, min_capacity=guests)
+                print(f"📞 PHONE CALL: Using static inventory - {len(available_rooms)} rooms free {check_in} to {check_out}")
             
             if room_type:
                 available_rooms = [r for r in available_rooms if room_type in r['type'].lower()]
@@ -1423,22 +725,29 @@ def handle_vapi_function_call(function_name: str, args: dict) -> dict:
             # Create booking
             guest_name = args.get('guest_name')
             room_type = args.get('room_type', '').lower()
+            check_in = args.get('check_in')
+            check_out = args.get('check_out')
             
-            # Find room (demo mode - use available rooms only)
-            available_rooms = [room for room in agent.data['rooms'] if room.get('available', True)]
-            if room_type:
-                room = next((r for r in available_rooms if room_type in r['type'].lower()), None)
-            else:
-                room = available_rooms[0] if available_rooms else None
+            # Without a valid stay there is nothing to look up - ask again
+            # rather than reporting every room as taken
+            if parse_stay(check_in, check_out) is None:
+                return {
+                    'success': False,
+                    'message': 'I need your check-in and check-out dates to make the reservation. What dates will you be staying with us?'
+                }
+            
+            # Find a room of that type that is free for every night of the stay
+            available_rooms = agent.find_available_rooms(check_in, check_out, room_type=room_type)
+            room = available_rooms[0] if available_rooms else None
             
             if not room:
                 return {
                     'success': False,
-                    'message': 'Sorry, no rooms of that type are currently available. Would you like to hear about other room types?'
+                    'message': 'Sorry, no rooms of that type are available for those dates. Would you like to hear about other room types?'
                 }
             
             # Create booking
-            booking_id = f"BK{len(agent.data['bookings']) + 1:04d}"
+            booking_id = agent.next_booking_id()
             booking = {
                 'booking_id': booking_id,
                 'guest_name': guest_name,
@@ -1447,17 +756,19 @@ def handle_vapi_function_call(function_name: str, args: dict) -> dict:
                 'room_id': room['id'],
                 'room_type': room['type'],
                 'price_per_night': room['price_per_night'],
-                'check_in': args.get('check_in'),
-                'check_out': args.get('check_out'),
+                'check_in': check_in,
+                'check_out': check_out,
                 'guests': args.get('guests', 1),
                 'special_requests': args.get('special_requests'),
                 'created_at': datetime.now().isoformat(),
                 'source': 'phone_call'
             }
             
-            agent.data['bookings'].append(booking)
-            room['available'] = False
-            agent.save_data()
+            if not agent.add_booking(booking):
+                return {
+                    'success': False,
+                    'message': 'Sorry, that room was just booked for those dates. Would you like to hear about other room types?'
+                }
             
             return {
                 'success': True,
@@ -1469,7 +780,9 @@ def handle_vapi_function_call(function_name: str, args: dict) -> dict:
         
         elif function_name == 'cancel_booking':
             booking_id = args.get('booking_id')
-            booking = next((b for b in agent.data['bookings'] if b['booking_id'] == booking_id), None)
+            
+            # Cancel booking and release its nights
+            booking = agent.cancel_booking(booking_id)
             
             if not booking:
                 return {
@@ -1477,13 +790,6 @@ def handle_vapi_function_call(function_name: str, args: dict) -> dict:
                     'message': f'I could not find booking {booking_id}'
                 }
             
-            # Cancel booking
-            agent.data['bookings'].remove(booking)
-            room = next((r for r in agent.data['rooms'] if r['id'] == booking['room_id']), None)
-            if room:
-                room['available'] = True
-            agent.save_data()
-            
             return {
                 'success': True,
                 'message': f'Your booking {booking_id} has been successfully cancelled'
@@ -1491,7 +797,7 @@ def handle_vapi_function_call(function_name: str, args: dict) -> dict:
         
         elif function_name == 'get_booking_details':
             booking_id = args.get('booking_id')
-            booking = next((b for b in agent.data['bookings'] if b['booking_id'] == booking_id), None)
+            booking = agent.get_booking(booking_id)
             
             if not booking:
                 return {
@@ -1531,7 +837,46 @@ def get_call_sessions():
     """Get all call sessions"""
     return jsonify({
         'success': True,
-        'sessions': call_sessions
+        'sessions': dict(call_sessions.items())
+    })
+
+@app.route('/api/llm/status', methods=['GET'])
+def llm_status():
+    """LLM intent cache counters, which detector answered, and client pool size"""
+    pool = llm_client.openai_client_pool
+    return jsonify({
+        'success': True,
+        'deadline_ms': int(agent.llm_deadline * 1000),
+        'intent_paths': dict(agent.intent_paths),
+        'intent_cache': agent.intent_cache.stats(),
+        'semantic_cache': agent.semantic_cache.stats() if agent.semantic_cache is not None else None,
+        'clients': len(pool) if pool else 0
+    })
+
+@app.route('/api/chat/status', methods=['GET'])
+def chat_status():
+    """Time spent in each /api/chat conversation state and in the shared availability lookup"""
+    return jsonify({
+        'success': True,
+        'states': booking_flow.timings.stats()
+    })
+
+@app.route('/api/sessions/status', methods=['GET'])
+def sessions_status():
+    """Live chat/call sessions, the memory they hold, and expiry/eviction counters"""
+    return jsonify({
+        'success': True,
+        'conversations': conversation_sessions.stats(),
+        'calls': call_sessions.stats()
+    })
+
+@app.route('/api/http/status', methods=['GET'])
+def http_status():
+    """Pooled Amadeus/VAPI HTTP clients: per-endpoint requests, failures, latency and retries"""
+    return jsonify({
+        'success': True,
+        'amadeus': get_amadeus_api().http.stats(),
+        'vapi': get_vapi_agent().http.stats()
     })
 
 # ==================== AMADEUS REAL-TIME HOTEL DATA ====================
@@ -1600,13 +945,21 @@ def amadeus_status():
         return jsonify({
             'configured': True,
             'authenticated': True,
-            'message': 'Amadeus API ready to use!'
+            'message': 'Amadeus API ready to use!',
+            'directory': amadeus.directory.stats(),
+            'offers': amadeus.offers.stats(),
+            'quota': amadeus.quota.stats(),
+            'single_flight': amadeus.flights.stats()
         })
     except Exception as e:
         return jsonify({
             'configured': True,
             'authenticated': False,
-            'error': str(e)
+            'error': str(e),
+            'directory': amadeus.directory.stats(),
+            'offers': amadeus.offers.stats(),
+            'quota': amadeus.quota.stats(),
+            'single_flight': amadeus.flights.stats()
         })
 
 if __name__ == '__main__':
@@ -1619,10 +972,13 @@ if __name__ == '__main__':
     print("\n💬 Chat API endpoints:")
     print("   - GET  /api/greeting")
     print("   - POST /api/chat")
+    print("   - GET  /api/chat/status")
     print("   - GET  /api/rooms")
     print("   - GET  /api/bookings")
     print("   - GET  /api/amenities")
     print("   - GET  /api/policies")
+    print("   - GET  /api/sessions/status")
+    print("   - GET  /api/http/status")
     print("\n🏨 Amadeus Hotel API endpoints (Real-time data):")
     print("   - POST /api/amadeus/search")
     print("   - GET  /api/amadeus/status")
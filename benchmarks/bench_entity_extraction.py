@@ -0,0 +1,101 @@
+"""
+Entity Extraction Benchmark
+Per-message cost of extract_entities against the inline re.search/re.findall calls it replaced
+
+Usage:
+    python benchmarks/bench_entity_extraction.py [--messages 20000] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entity_extraction import extract_entities  # noqa: E402
+
+SAMPLE_MESSAGES = [
+    "2 guests, Oct 15 to Oct 18",
+    "4 people for 3 nights starting nov 2",
+    "I'd like to check availability for december 20 to december 23",
+    "John Smith, 555-123-4567, john.smith@example.com, late check-in please, Payment: John Smith ****4242",
+    "Can I cancel booking BK0003?",
+    "my name is Jane Doe and I want the king suite",
+    "3",
+    "actually make it 5 nights",
+    "do you have a pool and free breakfast?",
+    "what time is check-out",
+    "10/12 to 10/15 for 2 adults",
+    "15th nov till 18th nov, 1 guest",
+]
+
+
+def legacy_extract(message: str) -> dict:
+    """The separate scans the chat steps used to run, one per entity"""
+    message_lower = message.lower().strip()
+    entities = {}
+    guest_match = re.search(r'(\d+)\s*(?:guest|people|person)', message_lower)
+    if not guest_match:
+        guest_match = re.search(r'^(\d+)', message_lower)
+    if guest_match:
+        entities['guests'] = int(guest_match.group(1))
+    dates = re.findall(r'(?:oct|nov|dec|jan|feb|mar|apr|may|jun|jul|aug|sep)[a-z]*\s*\d{1,2}', message_lower)
+    if dates:
+        entities['dates'] = dates
+    if re.search(r'(\d+)\s*(?:night|day)', message_lower):
+        night_match = re.search(r'(\d+)\s*(?:night|day)', message_lower)
+        entities['nights'] = int(night_match.group(1))
+    phone_match = re.search(r'[\+\d][\d\s\-\(\)]{8,}', message)
+    if phone_match:
+        entities['phone'] = phone_match.group(0).strip()
+    email_match = re.search(r'[\w\.-]+@[\w\.-]+\.\w+', message)
+    if email_match:
+        entities['email'] = email_match.group(0)
+    payment_match = re.search(r'Payment:\s*(.+?)\s*\*\*\*\*(\d{4})', message)
+    if payment_match:
+        entities['card_last4'] = payment_match.group(2)
+    for pattern in [r'(\d{1,2}[-/]\d{1,2})', r'(oct|nov|dec|jan|feb|mar|apr|may|jun|jul|aug|sep)\s*\d{1,2}']:
+        re.findall(pattern, message_lower)
+    name_match = re.search(r'(?:name is|i am|i\'m)\s+([a-zA-Z\s]+)', message_lower)
+    if name_match:
+        entities['guest_name'] = name_match.group(1).strip()
+    booking_match = re.search(r'(?:booking|reservation|id)\s*#?\s*([A-Z0-9]+)', message_lower)
+    if booking_match:
+        entities['booking_id'] = booking_match.group(1)
+    return entities
+
+
+def time_per_message(fn, messages, repeat: int) -> float:
+    """Best-of-repeat wall time per message, in microseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for message in messages:
+            fn(message)
+        best = min(best, time.perf_counter() - start)
+    return best / len(messages) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=20000, help='messages per timing run')
+    parser.add_argument('--repeat', type=int, default=5, help='timing runs (best is reported)')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    messages = [rng.choice(SAMPLE_MESSAGES) for _ in range(args.messages)]
+
+    legacy_us = time_per_message(legacy_extract, messages, args.repeat)
+    unified_us = time_per_message(extract_entities, messages, args.repeat)
+
+    print(f"messages per run:   {args.messages}")
+    print(f"legacy (inline re): {legacy_us:7.2f} us/message")
+    print(f"extract_entities:   {unified_us:7.2f} us/message")
+    print(f"speedup:            {legacy_us / unified_us:7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+"""
+Intent, Entity and Date Benchmark
+Accuracy and latency of every intent detector, the entity extractor and the date parser, fully offline
+
+Runs the labeled corpora in corpus/ through:
+    rules        HotelAgent._detect_intent_rule_based
+    classifier   IntentClassifier.predict
+    local        HotelAgent._detect_intent_local (rules -> classifier)
+    llm          HotelAgent._detect_intent_hedged with the OpenAI call stubbed
+                 by an oracle that answers the labeled intent after a delay
+and reports per-intent precision/recall plus p50/p99 latency and throughput.
+
+Usage:
+    python benchmarks/bench_intents.py [--repeat 20] [--llm-latency-ms 50] [--llm-deadline-ms 1000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import date_parser  # noqa: E402
+from date_parser import parse_natural_date  # noqa: E402
+from entity_extraction import extract_entities  # noqa: E402
+from hotel_agent import HotelAgent  # noqa: E402
+from semantic_cache import SemanticIntentCache  # noqa: E402
+
+INTENT_CORPUS = os.path.join(ROOT, 'corpus', 'intent_eval.jsonl')
+DATE_CORPUS = os.path.join(ROOT, 'corpus', 'dates_eval.jsonl')
+ENTITY_FIELDS = ('guests', 'nights', 'dates', 'booking_id', 'guest_name')
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+
+def load_jsonl(path: str) -> List[Dict]:
+    with open(path, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def timed_run(fn: Callable[[str], object], texts: List[str], repeat: int):
+    """Call fn on every text `repeat` times; returns (last outputs, latencies in us, wall seconds)"""
+    latencies = []
+    outputs = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        outputs = []
+        for text in texts:
+            t0 = time.perf_counter_ns()
+            outputs.append(fn(text))
+            latencies.append((time.perf_counter_ns() - t0) / 1000)
+    return outputs, latencies, time.perf_counter() - start
+
+
+def print_latency(latencies: List[float], wall_seconds: float):
+    print(f"  latency p50 {percentile(latencies, 50):9.1f} us   p99 {percentile(latencies, 99):9.1f} us   "
+          f"throughput {len(latencies) / wall_seconds:,.0f} msg/s")
+
+
+def print_intent_report(name: str, records: List[Dict], predicted: List[str]) -> float:
+    """Per-intent precision/recall/F1 and accuracy, overall and by source; returns the accuracy"""
+    gold = [record['intent'] for record in records]
+    labels = sorted(set(gold) | set(predicted))
+    true_pos = Counter(g for g, p in zip(gold, predicted) if g == p)
+    predicted_count = Counter(predicted)
+    gold_count = Counter(gold)
+
+    accuracy = sum(true_pos.values()) / len(gold)
+    by_source = defaultdict(list)
+    for record, p in zip(records, predicted):
+        by_source[record.get('source', 'chat')].append(record['intent'] == p)
+    sources = '   '.join(f"{source} {sum(hits) / len(hits):.1%}" for source, hits in sorted(by_source.items()))
+
+    print(f"\n== {name}: accuracy {accuracy:.1%}   ({sources})")
+    print(f"  {'intent':20s} {'precision':>9s} {'recall':>7s} {'f1':>6s} {'support':>8s}")
+    for label in labels:
+        precision = true_pos[label] / predicted_count[label] if predicted_count[label] else 0.0
+        recall = true_pos[label] / gold_count[label] if gold_count[label] else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        print(f"  {label:20s} {precision:9.2f} {recall:7.2f} {f1:6.2f} {gold_count[label]:8d}")
+    return accuracy
+
+
+def bench_intents(agent: HotelAgent, records: List[Dict], args):
+    texts = [record['text'] for record in records]
+
+    detectors = [
+        ('rules', lambda text: agent._detect_intent_rule_based(text.lower().strip())[0]),
+    ]
+    if agent.intent_classifier is not None:
+        detectors.append(('classifier', lambda text: agent.intent_classifier.predict(text.lower().strip())[0]))
+    detectors.append(('local (rules -> classifier)', lambda text: agent._detect_intent_local(
+        text.lower().strip(), extract_entities(text))[0]))
+
+    accuracy = {}
+    for name, detect in detectors:
+        predicted, latencies, wall = timed_run(detect, texts, args.repeat)
+        accuracy[name.split()[0]] = print_intent_report(name, records, predicted)
+        print_latency(latencies, wall)
+
+    # Confident rule intents skip the classifier, so they must never make the cascade worse than it
+    if 'classifier' in accuracy:
+        assert accuracy['local'] >= accuracy['classifier'], (
+            f"rules -> classifier ({accuracy['local']:.1%}) is less accurate than "
+            f"the classifier alone ({accuracy['classifier']:.1%})"
+        )
+
+    # LLM tier: the OpenAI call is replaced by an oracle with a fixed delay,
+    # so this measures the cascade/hedging around it, not the model itself
+    gold = {record['text']: record['intent'] for record in records}
+
+    def stub_llm(message: str, api_key: str):
+        time.sleep(args.llm_latency_ms / 1000)
+        return gold[message], {}
+
+    agent._query_llm = stub_llm
+    agent.llm_deadline = args.llm_deadline_ms / 1000
+    agent.intent_cache.clear()
+    if agent.semantic_cache is not None:
+        agent.semantic_cache = SemanticIntentCache(capacity=len(records) + 1, threshold=agent.semantic_cache.threshold)
+    paths = Counter()
+
+    def hedged(text: str) -> str:
+        intent, _, path = agent._detect_intent_hedged(text, 'stub-key', extract_entities(text))
+        paths[path] += 1
+        return intent
+
+    predicted, latencies, wall = timed_run(hedged, texts, 1)
+    print_intent_report(f"llm, hedged (stub {args.llm_latency_ms:g} ms, deadline {args.llm_deadline_ms:g} ms)",
+                        records, predicted)
+    print_latency(latencies, wall)
+    print("  answered by: " + ', '.join(f"{path} {count}" for path, count in paths.most_common()))
+
+
+def bench_entities(records: List[Dict], args):
+    """Field-level precision/recall of extract_entities against the labeled entities"""
+    texts = [record['text'] for record in records]
+    extracted, latencies, wall = timed_run(extract_entities, texts, args.repeat)
+
+    print("\n== entities (extract_entities)")
+    print(f"  {'field':20s} {'precision':>9s} {'recall':>7s} {'labeled':>8s}")
+    for field in ENTITY_FIELDS:
+        correct = predicted = labeled = 0
+        for record, found in zip(records, extracted):
+            expected = record.get('entities', {}).get(field)
+            value = found.get(field)
+            labeled += expected is not None
+            predicted += value is not None
+            correct += expected is not None and value == expected
+        precision = correct / predicted if predicted else 0.0
+        recall = correct / labeled if labeled else 0.0
+        print(f"  {field:20s} {precision:9.2f} {recall:7.2f} {labeled:8d}")
+    print_latency(latencies, wall)
+
+
+def expected_date(record: Dict, today: datetime) -> Optional[str]:
+    """The date a record should parse to, as YYYY-MM-DD, or MM-DD when the year is unspecified"""
+    if 'offset_days' in record:
+        return (today + timedelta(days=record['offset_days'])).strftime('%Y-%m-%d')
+    if 'weekday' in record:
+        # "friday" is today if it is Friday; "next friday" never is
+        ahead = (WEEKDAYS.index(record['weekday']) - today.weekday()) % 7
+        if ahead == 0 and record.get('next'):
+            ahead = 7
+        return (today + timedelta(days=ahead)).strftime('%Y-%m-%d')
+    return record.get('expected')
+
+
+def bench_dates(records: List[Dict], args):
+    today = datetime.now()
+    texts = [record['text'] for record in records]
+    parsed, latencies, wall = timed_run(parse_natural_date, texts, args.repeat)
+
+    correct = 0
+    misses = []
+    for record, result in zip(records, parsed):
+        expected = expected_date(record, today)
+        if expected is None:
+            ok = result is None
+        elif len(expected) == 5:
+            ok = result is not None and result[5:] == expected
+        else:
+            ok = result == expected
+        correct += ok
+        if not ok:
+            misses.append(f"{record['text']!r} -> {result} (expected {expected})")
+
+    print(f"\n== dates (parse_natural_date): {correct}/{len(records)} correct ({correct / len(records):.1%})")
+    for miss in misses:
+        print(f"  miss: {miss}")
+    print_latency(latencies, wall)
+
+    # The same texts again without the LRU cache: the cost of a phrase seen for the first time
+    uncached = date_parser._scan.__wrapped__
+    _, latencies, wall = timed_run(lambda text: uncached(' '.join(text.lower().split()), today.date()), texts, args.repeat)
+    print("  uncached:", end='')
+    print_latency(latencies, wall)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20, help='passes over the corpus for the offline detectors')
+    parser.add_argument('--llm-latency-ms', type=float, default=50.0, help='delay of the stubbed LLM call')
+    parser.add_argument('--llm-deadline-ms', type=float, default=1000.0, help='hedging deadline for the LLM tier')
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    records = load_jsonl(INTENT_CORPUS)
+    agent = HotelAgent()
+    print(f"Intent corpus: {len(records)} utterances ({INTENT_CORPUS})")
+
+    bench_intents(agent, records, args)
+    bench_entities(records, args)
+    bench_dates(load_jsonl(DATE_CORPUS), args)
+
+
+if __name__ == '__main__':
+    main()
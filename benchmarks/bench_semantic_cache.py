@@ -0,0 +1,75 @@
+"""
+Semantic Intent Cache Benchmark
+Fill rate, lookup latency and memory of SemanticIntentCache at 100k cached messages
+
+Usage:
+    python benchmarks/bench_semantic_cache.py [--entries 100000] [--lookups 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from semantic_cache import SemanticIntentCache  # noqa: E402
+
+WORDS = (
+    "pool gym breakfast parking shuttle airport wifi password pets dog cat cancel booking "
+    "reservation king queen suite room price rate late checkout early checkin spa restaurant "
+    "bar laundry towels elevator accessible smoking balcony view crib rollaway microwave "
+    "fridge kitchen iron safe minibar ice machine business center printer meeting space"
+).split()
+TEMPLATES = [
+    "do you have {0}", "is there a {0} and {1}", "how much is the {0}", "can I get {0} {1}",
+    "what about {0} for my {1}", "is {0} included with the {1}", "where is the {0}",
+]
+INTENTS = ['amenities', 'policies', 'faq', 'check_availability', 'book_room', 'general']
+
+
+def synthetic_message(rng: random.Random) -> str:
+    template = rng.choice(TEMPLATES)
+    return template.format(*rng.sample(WORDS, 2)) + f" {rng.choice(WORDS)} {rng.randrange(10000)}x"
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=100000, help='messages to cache')
+    parser.add_argument('--lookups', type=int, default=2000, help='timed lookups')
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    cache = SemanticIntentCache(capacity=args.entries)
+    messages = [synthetic_message(rng) for _ in range(args.entries)]
+
+    start = time.perf_counter()
+    for message in messages:
+        cache.add(message, (rng.choice(INTENTS), {}))
+    fill_seconds = time.perf_counter() - start
+
+    # Half repeats of cached messages, half unseen ones
+    queries = [rng.choice(messages) if i % 2 else synthetic_message(rng) for i in range(args.lookups)]
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        cache.lookup(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    stats = cache.stats()
+    print(f"entries:        {len(cache)}")
+    print(f"matrix memory:  {stats['matrix_bytes'] / 1e6:.1f} MB")
+    print(f"fill:           {fill_seconds:.2f} s ({args.entries / fill_seconds:,.0f} adds/s)")
+    print(f"lookup p50:     {percentile(latencies, 50):.2f} ms")
+    print(f"lookup p99:     {percentile(latencies, 99):.2f} ms")
+    print(f"hit rate:       {stats['hit_rate']:.2%} (threshold {cache.threshold})")
+
+
+if __name__ == '__main__':
+    main()
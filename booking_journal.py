@@ -0,0 +1,101 @@
+"""
+Append-only Booking Journal
+Write-ahead log of booking/cancellation/room changes between full data snapshots
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Iterator, Tuple
+
+
+class BookingJournal:
+    """
+    One JSON record per line: {"seq": N, "op": "...", "data": {...}}
+
+    Every change is appended (and fsync'd) before it is acknowledged, so a
+    booking costs one small write no matter how large the history is. The
+    full data file is only rewritten at compaction time, after which the
+    journal is truncated. Records carry a sequence number and the snapshot
+    remembers the last one it includes, so replaying after a crash between
+    "snapshot written" and "journal truncated" never applies a record twice.
+    """
+
+    def __init__(self, path: str, fsync: bool = True):
+        self.path = path
+        self.fsync = fsync
+        self.seq = 0
+        self.pending = 0  # records written since the last snapshot
+        self._lock = threading.Lock()
+        self._file = None
+
+    def replay(self, after_seq: int = 0) -> Iterator[Tuple[str, Dict]]:
+        """
+        Yield (op, data) for every intact record newer than after_seq
+
+        A torn final line (crash mid-append) is discarded and truncated away.
+        """
+        self.seq = after_seq
+        self.pending = 0
+        if not os.path.exists(self.path):
+            return
+
+        good_offset = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                good_offset += len(line)
+                self.pending += 1
+                if record['seq'] <= after_seq:
+                    continue
+                self.seq = record['seq']
+                yield record['op'], record['data']
+
+        if good_offset < os.path.getsize(self.path):
+            print(f"Booking journal: discarding torn record at byte {good_offset}")
+            with open(self.path, 'r+b') as f:
+                f.truncate(good_offset)
+
+    def append(self, op: str, data: Dict) -> int:
+        """Durably append a record; returns its sequence number"""
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'ab')
+            self.seq += 1
+            line = json.dumps({'seq': self.seq, 'op': op, 'data': data}, separators=(',', ':'))
+            self._file.write(line.encode('utf-8') + b'\n')
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.pending += 1
+            return self.seq
+
+    def reset(self):
+        """Drop all records (call only after a snapshot covering them is on disk)"""
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'ab')
+            self._file.truncate(0)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.pending = 0
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def write_snapshot(path: str, data: Dict):
+    """Atomically replace a JSON data file (temp file + fsync + rename)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
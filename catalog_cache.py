@@ -0,0 +1,64 @@
+"""
+Catalog Response Cache
+Pre-serialized, ETag-versioned bodies for the rarely-changing catalog endpoints
+"""
+
+import hashlib
+import json
+import threading
+from typing import Callable, Dict, NamedTuple, Optional
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    etag: str
+    version: int
+
+
+class CatalogCache:
+    """
+    Holds the serialized JSON body and a content hash per endpoint
+
+    Each entry remembers the data version it was built from; the body is
+    only re-serialized when the caller passes a newer version (i.e. the
+    underlying section actually changed). Because the ETag is a hash of the
+    body, a rebuild that produces identical bytes keeps the same ETag and
+    clients keep getting 304s.
+    """
+
+    def __init__(self, max_age: int = 60):
+        self.max_age = max_age
+        self._entries: Dict[str, CachedBody] = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def get(self, name: str, version: int, build: Callable[[], Dict]) -> CachedBody:
+        """
+        Return the cached body for an endpoint, rebuilding it if stale
+
+        Args:
+            name: Cache key (usually the endpoint name)
+            version: Current version of the data behind the endpoint
+            build: Returns the JSON payload when a rebuild is needed
+        """
+        entry = self._entries.get(name)
+        if entry is not None and entry.version == version:
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry.version != version:
+                body = json.dumps(build(), separators=(',', ':')).encode('utf-8')
+                etag = hashlib.sha1(body).hexdigest()
+                entry = CachedBody(body, etag, version)
+                self._entries[name] = entry
+                self.builds += 1
+            return entry
+
+    def invalidate(self, name: Optional[str] = None):
+        """Drop one entry (or all of them)"""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
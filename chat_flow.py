@@ -0,0 +1,599 @@
+"""
+Chat Booking Flow
+Table-driven conversation state machine behind /api/chat, with one availability lookup per turn and per-state timings
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from date_parser import extract_stay, find_dates
+from entity_extraction import extract_entities
+from hotel_agent import GUESTS_DATES_PROMPT
+from inventory import default_stay
+
+ROOM_CHOICE_KEYWORDS = ['queen', 'king', 'suite', 'executive', 'accessible', 'standard', 'deluxe']
+MENU_AVAILABILITY = ['1', 'option 1', '1.', 'check rooms', 'check availability', 'availability']
+DEFAULT_HOTEL_NAME = 'Hilton Charlotte Airport'
+ROOM_CHOICE_PROMPT = "Which room would you like? (Type the room type, e.g., 'Queen Guest Room' or 'King')"
+
+
+class ChatStatus(str):
+    """Progress note from a chat turn ("Checking live availability...") shown only to streaming clients"""
+
+
+def requested_stay(message: str) -> Tuple[str, str, int]:
+    """
+    (check_in, check_out, nights) for a booking request, dates as YYYY-MM-DD
+
+    With no dates the stay starts tomorrow; a check-in without a check-out
+    lasts the nights asked for ("oct 15 for 3 nights"), else one night.
+    """
+    check_in_dt, check_out_dt = extract_stay(message)
+    if check_in_dt and check_out_dt:
+        return check_in_dt.isoformat(), check_out_dt.isoformat(), (check_out_dt - check_in_dt).days
+    nights = find_dates(message)[1] or 1
+    if check_in_dt:
+        return check_in_dt.isoformat(), (check_in_dt + timedelta(days=nights)).isoformat(), nights
+    return (*default_stay(nights), nights)
+
+
+def format_room_option(room: Dict, nights: int) -> str:
+    """One room in an availability listing"""
+    total_price = room['price_per_night'] * nights
+    hotel_name = room.get('hotel_name', DEFAULT_HOTEL_NAME)
+    text = f"**{room['type']}**"
+    if room.get('source') == 'amadeus':
+        text += f" at {hotel_name}\n"
+    else:
+        text += f" (Room #{room['id']})\n"
+    text += f"• Capacity: {room['capacity']} guests\n"
+    text += f"• ${room['price_per_night']:.2f}/night × {nights} nights = **${total_price:.2f} total**\n"
+    text += f"• Amenities: {', '.join(room['amenities'][:4])}\n\n"
+    return text
+
+
+class State(NamedTuple):
+    """
+    One row of the state table
+
+    `handler(turn)` yields the reply; `transitions` are the states it may
+    move the conversation to. A handler that returns False didn't recognize
+    the message, which then goes to `fallback` instead.
+    """
+    handler: Callable[['Turn'], Iterator[str]]
+    transitions: Tuple[Optional[str], ...] = ()
+    fallback: Optional[str] = None
+
+
+class Turn:
+    """One chat message being handled: the session, the text, and entities extracted on first use"""
+
+    def __init__(self, machine: 'StateMachine', state: Optional[str], session: Dict, message: str,
+                 use_llm: bool = False, api_key: Optional[str] = None):
+        self.machine = machine
+        self.state = state
+        self.session = session
+        self.message = message
+        self.message_lower = message.lower().strip()
+        self.use_llm = use_llm
+        self.api_key = api_key
+        self._entities = None
+
+    @property
+    def booking(self) -> Dict:
+        return self.session['booking_data']
+
+    @property
+    def entities(self) -> Dict:
+        if self._entities is None:
+            self._entities = extract_entities(self.message)
+        return self._entities
+
+    def goto(self, state: Optional[str]):
+        """Move the conversation to a state listed in the current state's transitions"""
+        self.machine.check_transition(self.state, state)
+        self.session['step'] = state
+
+
+class StageTimings:
+    """Time spent per state (and per shared stage), fed by StateMachine's timing hooks"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, List[float]] = {}  # stage -> [turns, total seconds, max seconds]
+
+    def __call__(self, stage: str, seconds: float):
+        with self._lock:
+            entry = self._stages.setdefault(stage, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                stage: {
+                    'turns': turns,
+                    'avg_ms': round(total / turns * 1000, 3),
+                    'max_ms': round(longest * 1000, 3),
+                    'total_ms': round(total * 1000, 3),
+                }
+                for stage, (turns, total, longest) in sorted(self._stages.items())
+            }
+
+
+class StateMachine:
+    """
+    Dispatches each message to the handler for the session's state
+
+    States are keyed by the session's 'step' (None is the idle state, shown
+    as 'idle' in timings). Every handler and shared stage is timed, counting
+    only the time spent producing the reply, not the time a streaming client
+    takes to read it, and the duration is passed to each timing hook.
+    """
+
+    def __init__(self, states: Dict[Optional[str], State]):
+        self.states = states
+        self.timing_hooks: List[Callable[[str, float], None]] = []
+
+    def add_timing_hook(self, hook: Callable[[str, float], None]):
+        self.timing_hooks.append(hook)
+
+    @staticmethod
+    def stage_name(state: Optional[str]) -> str:
+        return state or 'idle'
+
+    def check_transition(self, state: Optional[str], new_state: Optional[str]):
+        if new_state != state and new_state not in self.states[state].transitions:
+            raise ValueError(f"No transition from {self.stage_name(state)} to {self.stage_name(new_state)}")
+
+    def timed(self, stage: str, parts: Iterator):
+        """Relay a handler's parts (and its return value), timing the work between them"""
+        spent = 0.0
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    part = next(parts)
+                except StopIteration as done:
+                    spent += time.perf_counter() - started
+                    return done.value
+                spent += time.perf_counter() - started
+                yield part
+        finally:
+            parts.close()  # a client that stopped reading
+            for hook in self.timing_hooks:
+                hook(stage, spent)
+
+    def run(self, session: Dict, message: str, use_llm: bool = False, api_key: Optional[str] = None):
+        """Handle one message, yielding the reply in sections as they are ready"""
+        state = session.get('step')
+        if state not in self.states:
+            state = None
+        turn = Turn(self, state, session, message, use_llm, api_key)
+        while True:
+            handled = yield from self.timed(self.stage_name(state), self.states[state].handler(turn))
+            if handled is not False:
+                return
+            state = turn.state = self.states[state].fallback
+
+
+class BookingFlow:
+    """
+    The /api/chat conversation: availability checks, the booking steps, and
+    everything else handed to HotelAgent
+
+    Session changes are made before the sections that report them, so a
+    client that stops reading halfway leaves the conversation consistent.
+    Room lookups for a stay go through find_rooms(), the single
+    availability stage: Amadeus when configured, else our own inventory.
+    """
+
+    def __init__(self, agent, amadeus_factory: Callable):
+        self.agent = agent
+        self.amadeus_factory = amadeus_factory
+        self.timings = StageTimings()
+        self.machine = StateMachine({
+            None: State(self.handle_idle, transitions=(
+                'awaiting_availability_dates', 'awaiting_guests_dates', 'awaiting_room_selection', 'awaiting_name')),
+            'awaiting_availability_dates': State(self.handle_availability_dates, transitions=(None,)),
+            'awaiting_guests_dates': State(self.handle_guests_dates, transitions=('awaiting_room_selection',)),
+            'awaiting_room_selection': State(self.handle_room_selection, transitions=('awaiting_contact_details',)),
+            'awaiting_contact_details': State(self.handle_contact_details, transitions=(None, 'awaiting_room_selection')),
+            'awaiting_name': State(self.handle_name, transitions=(None, 'awaiting_guests_dates', 'awaiting_room_selection'), fallback=None),
+        })
+        self.machine.add_timing_hook(self.timings)
+
+    def replies(self, session: Dict, message: str, use_llm: bool = False, api_key: Optional[str] = None):
+        """
+        Handle one chat message, yielding the reply in sections as they are ready
+
+        ChatStatus items are progress notes for streaming clients and are not
+        part of the reply.
+        """
+        print(f"[DEBUG] Session step: {session['step']}, Message: {message.lower().strip()[:50]}")
+        return self.machine.run(session, message, use_llm, api_key)
+
+    # ---- shared stages ----
+
+    def find_rooms(self, check_in: str, check_out: str, guests: int, min_capacity: Optional[int] = None):
+        """
+        The availability stage: rooms for a stay, from Amadeus when it is
+        configured and answers, else from our own inventory
+
+        A generator (it may yield a progress note) that returns
+        (rooms, from_amadeus).
+        """
+        started = time.perf_counter()
+        amadeus = self.amadeus_factory()
+        rooms = []
+        waited = 0.0
+        if amadeus.is_configured():
+            waited -= time.perf_counter()
+            yield ChatStatus("Checking live availability...")
+            waited += time.perf_counter()
+            try:
+                print(f"Fetching hotels from Amadeus API for {guests} guests, {check_in} to {check_out}")
+                rooms = amadeus.search_charlotte_airport_hotels(check_in, check_out, guests)
+                print(f"Found {len(rooms)} rooms from Amadeus")
+            except Exception as e:
+                print(f"Amadeus API error: {e}")
+        from_amadeus = bool(rooms)
+        if not rooms:
+            rooms = self.agent.find_available_rooms(check_in, check_out, min_capacity=min_capacity)
+            print(f"Using static inventory: {len(rooms)} rooms free")
+        for hook in self.machine.timing_hooks:
+            hook('availability', time.perf_counter() - started - waited)
+        return rooms, from_amadeus
+
+    def remember_rooms(self, turn: Turn, rooms: List[Dict], from_amadeus: bool):
+        """Keep room options for the selection step: our own rooms by id, Amadeus offers whole"""
+        turn.booking['using_amadeus'] = from_amadeus
+        turn.booking['available_rooms'] = [room if room.get('source') == 'amadeus' else room['id'] for room in rooms]
+
+    def recall_rooms(self, turn: Turn) -> List[Dict]:
+        """remember_rooms back to room dicts, from the current catalog"""
+        rooms = (self.agent.get_room(room) if isinstance(room, str) else room
+                 for room in turn.booking.get('available_rooms', []))
+        return [room for room in rooms if room]
+
+    def offer_rooms(self, turn: Turn, num_guests: int, check_in: str, check_out: str, nights: int,
+                    intro: str, none_left: str):
+        """Look up rooms for the stay in booking_data and list them for the selection step"""
+        rooms, from_amadeus = yield from self.find_rooms(check_in, check_out, num_guests, min_capacity=num_guests)
+        if not rooms:
+            yield none_left
+            return
+        self.remember_rooms(turn, rooms, from_amadeus)
+        turn.goto('awaiting_room_selection')
+        yield intro
+        for room in rooms[:5]:  # Show top 5
+            yield format_room_option(room, nights)
+        yield ROOM_CHOICE_PROMPT
+
+    def store_stay(self, turn: Turn, num_guests: int, check_in: str, check_out: str, nights: int):
+        turn.booking['guests'] = num_guests
+        turn.booking['nights'] = nights
+        turn.booking['check_in'] = check_in
+        turn.booking['check_out'] = check_out
+
+    def confirm_booking(self, turn: Turn, guest_name: str, room: Dict) -> Optional[Dict]:
+        """Book the room in booking_data; returns the booking (clearing the session), or None if the room was just taken"""
+        booking_data = turn.booking
+        nights = booking_data.get('nights', 1)
+        is_amadeus = room.get('source') == 'amadeus'
+        booking = {
+            "booking_id": self.agent.next_booking_id(),
+            "guest_name": guest_name,
+            "guest_email": booking_data.get('email', 'Not provided'),
+            "guest_phone": booking_data.get('phone', 'Not provided'),
+            "special_requests": booking_data.get('special_requests', 'None'),
+            "payment_method": booking_data.get('payment_method', 'Not provided'),
+            "room_id": room.get('id', 'TBD'),
+            "room_type": room['type'],
+            "hotel_name": room.get('hotel_name', DEFAULT_HOTEL_NAME),
+            "price_per_night": room['price_per_night'],
+            "nights": nights,
+            "total_cost": room['price_per_night'] * nights,
+            "num_guests": booking_data.get('guests', 1),
+            "check_in": booking_data.get('check_in', 'TBD'),
+            "check_out": booking_data.get('check_out', 'TBD'),
+            "created_at": datetime.now().isoformat(),
+            "source": "amadeus" if is_amadeus else "web_chat"
+        }
+
+        # Holds the room's nights in our inventory (Amadeus offers aren't tracked)
+        if not self.agent.add_booking(booking):
+            turn.goto('awaiting_room_selection')
+            return None
+
+        # Clear session
+        turn.goto(None)
+        turn.session['booking_data'] = {}
+        return booking
+
+    def confirmation_header(self, booking: Dict, room: Dict) -> str:
+        is_amadeus = room.get('source') == 'amadeus'
+        response = f"✅ **RESERVATION CONFIRMED!**\n\n"
+        response += f"━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+        response += f"**Confirmation #:** {booking['booking_id']}\n"
+        response += f"**Guest:** {booking['guest_name']}\n"
+        if is_amadeus:
+            response += f"**Hotel:** {booking['hotel_name']}\n"
+        response += f"**Room:** {room['type']}\n"
+        if not is_amadeus and room.get('id'):
+            response += f"**Room #:** {room['id']}\n"
+        return response
+
+    def confirmation_details(self, booking: Dict, room: Dict) -> str:
+        response = (
+            f"\n**Reservation Details:**\n"
+            f"• Guests: {booking['num_guests']}\n"
+            f"• Check-in: {booking['check_in']}\n"
+            f"• Check-out: {booking['check_out']}\n"
+            f"• Nights: {booking['nights']}\n"
+            f"• Rate: ${room['price_per_night']:.2f}/night\n"
+            f"• **Total: ${booking['total_cost']:.2f}**\n\n"
+            f"**Included Amenities:**\n"
+        )
+        for amenity in room['amenities']:
+            response += f"✓ {amenity}\n"
+        return response
+
+    # ---- states ----
+
+    def handle_idle(self, turn: Turn):
+        """No step in progress: menu option 1, a booking widget request, or HotelAgent"""
+        session = turn.session
+
+        # Handle menu option 1 - Check room availability
+        if turn.message_lower in MENU_AVAILABILITY:
+            turn.goto('awaiting_availability_dates')
+            yield "I'd be happy to check room availability for you! 🏨\n\n**What dates would you like to check?**\n\nPlease provide your check-in and check-out dates.\n\nFor example:\n• \"Oct 15 to Oct 18\"\n• \"October 20 for 3 nights\"\n• \"Nov 1 to Nov 5\""
+            return
+
+        # Direct booking request from the booking widget ("X guests, Month Day to Month Day")
+        if session['step'] is None and 'guests' in turn.entities and find_dates(turn.message)[0]:
+            turn.goto('awaiting_guests_dates')
+            num_guests = turn.entities['guests']
+            check_in_date, check_out_date, nights = requested_stay(turn.message)
+            self.store_stay(turn, num_guests, check_in_date, check_out_date, nights)
+            yield from self.offer_rooms(
+                turn, num_guests, check_in_date, check_out_date, nights,
+                f"Perfect! For **{num_guests} guest(s)** staying **{nights} night(s)**, here are your options:\n\n",
+                f"I apologize, but we don't have rooms available for {num_guests} guests on those dates. Would you like to try different dates?"
+            )
+            return
+
+        # Process message normally
+        if turn.use_llm:
+            yield ChatStatus("Thinking...")
+        reply = self.agent.reply(turn.message, use_llm=turn.use_llm, llm_api_key=turn.api_key)
+        if reply.follow_up == 'guests_dates':
+            turn.goto('awaiting_guests_dates')
+        elif reply.follow_up == 'guest_name':
+            turn.goto('awaiting_name')
+            turn.booking['room'] = reply.room
+            check_in, check_out = reply.stay
+            turn.booking['check_in'], turn.booking['check_out'] = check_in, check_out
+            turn.booking['nights'] = (datetime.fromisoformat(check_out) - datetime.fromisoformat(check_in)).days
+        yield reply.text
+
+    def handle_availability_dates(self, turn: Turn):
+        """Dates for an availability check ("Oct 14 to Oct 18", "tomorrow for 2 nights", "friday to sunday")"""
+        check_in_dt, check_out_dt = extract_stay(turn.message)
+
+        # If we don't have clear dates, ask for clarification
+        if not check_in_dt or not check_out_dt:
+            yield "Please provide your check-in and check-out dates.\n\nFor example: \"Oct 15 to Oct 18\" or \"October 15 for 3 nights\""
+            return
+
+        nights = (check_out_dt - check_in_dt).days
+        # Default guest count for an availability check; our own inventory isn't filtered by it
+        rooms, _ = yield from self.find_rooms(check_in_dt.isoformat(), check_out_dt.isoformat(), 2)
+
+        if not rooms:
+            yield "I apologize, but we don't have any rooms available for those dates. Would you like to check different dates?"
+            return
+
+        turn.goto(None)
+        yield f"**Available Rooms** for {check_in_dt:%b} {check_in_dt.day} to {check_out_dt:%b} {check_out_dt.day}:\n\n"
+        for room in rooms[:5]:
+            yield format_room_option(room, nights)
+        yield "\nWould you like to book any of these rooms? Reply 'book' or select option 2 to start a reservation."
+
+    def handle_guests_dates(self, turn: Turn):
+        """Guest count and stay dates for a booking ("2 guests, oct 15 to oct 17", or just "2")"""
+        num_guests = turn.entities.get('guests') or turn.entities.get('leading_number')
+        if not num_guests:
+            yield "How many guests will be staying? Please provide the number of guests."
+            return
+
+        check_in_date, check_out_date, nights = requested_stay(turn.message)
+        self.store_stay(turn, num_guests, check_in_date, check_out_date, nights)
+        yield from self.offer_rooms(
+            turn, num_guests, check_in_date, check_out_date, nights,
+            f"Perfect! For **{num_guests} guest(s)** staying **{nights} night(s)**, here are your options:\n\n",
+            f"I apologize, but we don't have rooms available for {num_guests} guests. Would you like to see all our available rooms?"
+        )
+
+    def handle_room_selection(self, turn: Turn):
+        """A room type from the listed options, or a new guest count / number of nights"""
+        booking_data = turn.booking
+        entities = turn.entities
+
+        if 'nights' in entities or 'guests' in entities:
+            num_guests = entities.get('guests', booking_data.get('guests', 1))
+            nights = entities.get('nights', booking_data.get('nights', 1))
+            check_in_date = booking_data.get('check_in')
+            # If check-in date is TBD, set it to tomorrow
+            if check_in_date == "TBD" or not check_in_date:
+                check_in_date = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+            # Always recalculate check-out based on check-in + nights
+            check_out_date = (datetime.strptime(check_in_date, '%Y-%m-%d') + timedelta(days=nights)).strftime('%Y-%m-%d')
+            self.store_stay(turn, num_guests, check_in_date, check_out_date, nights)
+            yield from self.offer_rooms(
+                turn, num_guests, check_in_date, check_out_date, nights,
+                f"Perfect! Updated to **{num_guests} guest(s)** for **{nights} night(s)**. Here are your options:\n\n",
+                f"I apologize, but we don't have rooms available for {num_guests} guests. Would you like to see all our available rooms?"
+            )
+            return
+
+        selected_type = next((keyword for keyword in ROOM_CHOICE_KEYWORDS if keyword in turn.message_lower), None)
+        if not selected_type:
+            yield "Please select a room type from the options above (e.g., Queen, King, Suite)."
+            return
+
+        # The rooms listed earlier (might be from Amadeus or static data)
+        available_rooms = self.recall_rooms(turn)
+
+        # If not stored, fall back to our own inventory for the stay
+        if not available_rooms:
+            check_in_date, check_out_date = booking_data.get('check_in'), booking_data.get('check_out')
+            if not check_in_date or check_in_date == 'TBD' or not check_out_date or check_out_date == 'TBD':
+                check_in_date, check_out_date = default_stay(booking_data.get('nights', 1))
+            available_rooms = self.agent.find_available_rooms(check_in_date, check_out_date)
+
+        room = next((r for r in available_rooms if selected_type in r['type'].lower()), None)
+        if not room:
+            yield "That room is no longer available. Please choose another option from above."
+            return
+
+        booking_data['room'] = room
+        turn.goto('awaiting_contact_details')
+
+        nights = booking_data.get('nights', 1)
+        is_amadeus = room.get('source') == 'amadeus'
+        response = f"✨ **Excellent choice!**\n\n"
+        if is_amadeus:
+            response += f"**Hotel:** {room.get('hotel_name', DEFAULT_HOTEL_NAME)}\n"
+        response += f"**Room:** {room['type']}\n"
+        if not is_amadeus:
+            response += f"**Room Number:** {room['id']}\n"
+        response += (
+            f"**Nightly Rate:** ${room['price_per_night']:.2f}\n"
+            f"**Total Cost:** ${room['price_per_night'] * nights:.2f} for {nights} night(s)\n\n"
+            f"**Room Features:**\n"
+        )
+        for amenity in room['amenities']:
+            response += f"✓ {amenity}\n"
+        response += f"\n**Next step:** Please provide your contact details:"
+        yield response
+
+    def handle_contact_details(self, turn: Turn):
+        """Name, phone, optional email/requests/payment ("Name, Phone, Email, Requests, Payment: Name ****1234"), then book"""
+        message = turn.message
+        entities = turn.entities
+
+        # Name is the first part before the first comma
+        guest_name = message.split(',', 1)[0].strip()
+        phone = entities.get('phone')
+        email = entities.get('email')
+        payment_text = entities.get('payment_text')
+        payment_name = entities.get('payment_name')
+        card_last4 = entities.get('card_last4')
+
+        # Special requests: whatever is left once the other details are taken out
+        special_requests = message
+        if guest_name:
+            special_requests = special_requests.replace(guest_name, '', 1)
+        if email:
+            special_requests = special_requests.replace(email, '')
+        if phone:
+            special_requests = special_requests.replace(phone, '')
+        if payment_text:
+            special_requests = special_requests.replace(payment_text, '')
+        special_requests = special_requests.replace(',', '').strip()
+
+        if not guest_name or not phone:
+            yield "Please provide your name and phone number to continue with your reservation."
+            return
+
+        booking_data = turn.booking
+        booking_data['guest_name'] = guest_name
+        booking_data['email'] = email if email else 'Not provided'
+        booking_data['phone'] = phone
+        booking_data['special_requests'] = special_requests if special_requests else 'None'
+        booking_data['payment_method'] = f"{payment_name} ****{card_last4}" if payment_name and card_last4 else 'Not provided'
+
+        room = booking_data['room']
+        booking = self.confirm_booking(turn, guest_name, room)
+        if booking is None:
+            yield "I'm sorry, that room was just booked for your dates. Please choose another room from the options above."
+            return
+
+        yield self.confirmation_header(booking, room)
+        response = (
+            f"━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+            f"**Guest Information:**\n"
+            f"• Phone: {phone}\n"
+        )
+        if email:
+            response += f"• Email: {email}\n"
+        if payment_name and card_last4:
+            response += f"• Payment: {payment_name} ending in {card_last4}\n"
+        if special_requests:
+            response += f"• Special Requests: {special_requests}\n"
+        yield response
+        yield self.confirmation_details(booking, room)
+        response = (
+            f"\n**Important Information:**\n"
+            f"• Check-in time: 3:00 PM\n"
+            f"• Check-out time: 12:00 PM\n"
+            f"• Free 24/7 airport shuttle to CLT\n"
+            f"• Free parking & WiFi included\n"
+            f"• Cancellation: Free up to 48 hours before arrival\n\n"
+        )
+        if email:
+            response += f"📧 A confirmation email has been sent to **{email}**\n\n"
+        else:
+            response += f"📱 A confirmation SMS will be sent to **{phone}**\n\n"
+        response += f"Thank you for choosing Hilton Charlotte Airport! Anything else I can help with?"
+        yield response
+
+    def handle_name(self, turn: Turn):
+        """The guest's name for the room HotelAgent offered; anything else is handled as a fresh message"""
+        words = turn.message.split()
+        if not words or not all(word.replace("'", "").replace("-", "").isalpha() for word in words):
+            return False
+
+        guest_name = turn.message.title()
+        booking_data = turn.booking
+        room = booking_data['room']
+
+        # No dates were collected in this flow - never book nights the guest didn't ask for
+        if booking_data.get('check_in', 'TBD') == 'TBD' or booking_data.get('check_out', 'TBD') == 'TBD':
+            turn.goto('awaiting_guests_dates')
+            yield f"Thanks, {guest_name}! Before I book, I need a couple more details.\n\n" + GUESTS_DATES_PROMPT
+            return
+
+        booking = self.confirm_booking(turn, guest_name, room)
+        if booking is None:
+            yield "I'm sorry, that room was just booked for your dates. Please choose another room."
+            return
+
+        yield self.confirmation_header(booking, room)
+        response = (
+            f"━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+            f"**Guest Information:**\n"
+            f"• Email: {booking['guest_email']}\n"
+            f"• Phone: {booking['guest_phone']}\n"
+        )
+        if booking['payment_method'] and booking['payment_method'] != 'Not provided':
+            response += f"• Payment: {booking['payment_method']}\n"
+        if booking['special_requests'] and booking['special_requests'] != 'None':
+            response += f"• Special Requests: {booking['special_requests']}\n"
+        yield response
+        yield self.confirmation_details(booking, room)
+        yield (
+            f"\n**Important Information:**\n"
+            f"• Check-in time: 3:00 PM\n"
+            f"• Check-out time: 12:00 PM\n"
+            f"• Free 24/7 airport shuttle to CLT\n"
+            f"• Free parking & WiFi included\n"
+            f"• Cancellation: Free up to 48 hours before arrival\n\n"
+            f"📧 A confirmation email has been sent to **{booking_data.get('email', 'your email')}**\n\n"
+            f"Thank you for choosing Hilton Charlotte Airport! Anything else I can help with?"
+        )
@@ -0,0 +1,72 @@
+"""
+Hotel Data File Watcher
+Polls hotel_data.json and hands freshly parsed contents to a callback, off the request path
+"""
+
+import json
+import os
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+
+class DataFileWatcher:
+    """
+    Background thread that reloads a JSON file when it changes on disk
+
+    Changes are detected by polling (mtime, size) every `interval` seconds,
+    which works the same on every platform and filesystem. The file is parsed
+    in the watcher thread; a file that fails to parse (e.g. caught halfway
+    through an editor save) is skipped and retried on the next poll.
+    """
+
+    def __init__(self, path: str, on_change: Callable[[Dict], object], interval: float = 2.0):
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+        self._signature = self._stat()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def start(self):
+        """Start polling in a daemon thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='hotel-data-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def check(self) -> bool:
+        """Reload if the file changed since the last check; returns True if reloaded"""
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            if self.last_error is None:
+                print(f"Hotel data reload skipped, {self.path} is not valid JSON yet: {e}")
+            self.last_error = str(e)
+            return False
+
+        self._signature = signature
+        self.last_error = None
+        self.on_change(data)
+        self.reloads += 1
+        return True
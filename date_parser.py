@@ -0,0 +1,294 @@
+"""
+Date Parser
+Turns the dates guests type or say ("oct 15", "2nd of november", "tomorrow", "next friday") into calendar dates
+"""
+
+import re
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+MONTH_NUMBERS = {
+    'jan': 1, 'january': 1, 'feb': 2, 'february': 2, 'mar': 3, 'march': 3,
+    'apr': 4, 'april': 4, 'may': 5, 'jun': 6, 'june': 6, 'jul': 7, 'july': 7,
+    'aug': 8, 'august': 8, 'sep': 9, 'sept': 9, 'september': 9,
+    'oct': 10, 'october': 10, 'nov': 11, 'november': 11, 'dec': 12, 'december': 12,
+}
+WEEKDAY_NUMBERS = {
+    'mon': 0, 'monday': 0, 'tue': 1, 'tues': 1, 'tuesday': 1, 'wed': 2, 'wednesday': 2,
+    'thu': 3, 'thur': 3, 'thurs': 3, 'thursday': 3, 'fri': 4, 'friday': 4,
+    'sat': 5, 'saturday': 5, 'sun': 6, 'sunday': 6,
+}
+# Also everyday words ("I sat", "sun deck"): weekdays only after this/next/coming or in a range
+AMBIGUOUS_WEEKDAYS = ('sat', 'sun')
+NUMBER_WORDS = {
+    'a': 1, 'an': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+    'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12, 'fourteen': 14,
+}
+
+# A date found in text and how it repeats ('year', 'month', 'week' or None)
+Mention = Tuple[Optional[date], Optional[str]]
+
+# Speech-to-text writes "november second" as often as "november 2nd"
+_ORDINALS = ('first second third fourth fifth sixth seventh eighth ninth tenth eleventh twelfth '
+             'thirteenth fourteenth fifteenth sixteenth seventeenth eighteenth nineteenth').split()
+ORDINAL_WORDS = {word: day for day, word in enumerate(_ORDINALS, 1)}
+ORDINAL_WORDS['twentieth'] = 20
+ORDINAL_WORDS['thirtieth'] = 30
+for _tens, _base in (('twenty', 20), ('thirty', 30)):
+    for _day, _word in enumerate(_ORDINALS[:9 if _base == 20 else 1], 1):
+        ORDINAL_WORDS[f'{_tens}-{_word}'] = ORDINAL_WORDS[f'{_tens} {_word}'] = _base + _day
+
+
+def _words(names) -> str:
+    """Alternation of names, longest first so "september" wins over "sep" """
+    return '|'.join(re.escape(name) for name in sorted(names, key=len, reverse=True))
+
+
+MONTH = rf'(?:{_words(MONTH_NUMBERS)})\.?'
+WEEKDAY = rf'(?:{_words(name for name in WEEKDAY_NUMBERS if name not in AMBIGUOUS_WEEKDAYS)})'
+ANY_WEEKDAY = rf'(?:{_words(WEEKDAY_NUMBERS)})'
+ORDINAL_DAY = rf'(?:\d{{1,2}}(?:st|nd|rd|th)|{_words(ORDINAL_WORDS)})'
+DAY = rf'(?:\d{{1,2}}(?:st|nd|rd|th)?|{_words(ORDINAL_WORDS)})'
+COUNT = rf'(?:\d{{1,3}}|{_words(NUMBER_WORDS)})'
+# A number followed by one of these is a count, not a day ("may 2 people")
+COUNT_NOUN = r'(?:guests?|people|persons?|adults?|kids|children|nights?|days?|rooms?)'
+
+# Every date shape is one branch of a single pattern; finditer walks the
+# lowercased text once and the named group that matched says which shape
+# it was. Branches that share a prefix are ordered longest first.
+DATE_PATTERN = re.compile(
+    rf"""
+    \b(?:
+        (?P<iso_year>\d{{4}})-(?P<iso_month>\d{{1,2}})-(?P<iso_day>\d{{1,2}})
+      | (?P<num_month>\d{{1,2}})/(?P<num_day>\d{{1,2}})(?:/(?P<num_year>\d{{4}}|\d{{2}}))?
+      | (?P<span_month>{MONTH})\s+(?P<span_start>\d{{1,2}})(?:st|nd|rd|th)?\s*(?:-|–|to|through|till|until)\s*
+        (?P<span_end>\d{{1,2}})(?:st|nd|rd|th)?(?!\s+(?:{MONTH}|{COUNT_NOUN})\b)
+      | (?P<md_month>{MONTH})\s+(?:the\s+)?(?P<md_day>{DAY})(?!\s+{COUNT_NOUN}\b)(?:,?\s+(?P<md_year>\d{{4}}))?
+      | (?:the\s+)?(?P<dm_day>{DAY})\s+(?:of\s+)?(?P<dm_month>{MONTH})(?:,?\s+(?P<dm_year>\d{{4}}))?
+      | (?P<after_tomorrow>(?:the\s+)?day\s+after\s+tomorrow)
+      | (?P<today>today|tonight)
+      | (?P<tomorrow>tomorrow|tmrw)
+      | in\s+(?P<in_count>{COUNT})\s+(?P<in_unit>days?|weeks?)
+      | (?P<week_count>{COUNT})\s+weeks?\s+from\s+(?:today|now)
+      | (?P<weekend_mod>this|next|coming)\s+weekend
+      | (?P<next_week>next\s+week)
+      | (?:(?P<wspan_mod>this|next|coming)\s+)?(?P<wspan_start>{ANY_WEEKDAY})
+        (?:\s*(?:-|–)\s*|\s+(?:to|through|till|until)\s+)(?P<wspan_end>{ANY_WEEKDAY})
+      | (?P<any_weekday_mod>this|next|coming)\s+(?P<any_weekday>{ANY_WEEKDAY})
+      | (?P<weekday>{WEEKDAY})
+      | (?:for\s+)?(?P<stay>{COUNT})\s+(?:nights?|days?)
+      | the\s+(?P<ordinal_day>{ORDINAL_DAY})
+    )\b
+    """,
+    re.VERBOSE,
+)
+
+
+def _number(token: str) -> int:
+    return int(token) if token.isdigit() else NUMBER_WORDS[token]
+
+
+def _day(token: str) -> int:
+    digits = token.rstrip('stndrh')
+    return int(digits) if digits.isdigit() else ORDINAL_WORDS[token]
+
+
+def _month(token: str) -> int:
+    return MONTH_NUMBERS[token.rstrip('.')]
+
+
+def _calendar_date(year: Optional[str], month: int, day: int, today: date) -> Optional[date]:
+    """
+    The date for a month and day; without a year, the next time it comes round
+
+    "jan 3" said in December is next January, and a date already behind us
+    this year means next year - a hotel can't book the past.
+    """
+    try:
+        if year:
+            year = int(year)
+            return date(year + 2000 if year < 100 else year, month, day)
+        candidate = date(today.year, month, day)
+        if candidate < today:
+            candidate = date(today.year + 1, month, day)
+        return candidate
+    except ValueError:
+        return None
+
+
+def _upcoming_weekday(weekday: int, today: date, modifier: Optional[str]) -> date:
+    """"friday"/"this friday" is the coming one (today if it is friday), "next friday" never today"""
+    ahead = (weekday - today.weekday()) % 7
+    if ahead == 0 and modifier == 'next':
+        ahead = 7
+    return today + timedelta(days=ahead)
+
+
+def _resolve(match: re.Match, today: date) -> Tuple[List[Mention], Optional[int]]:
+    """
+    What one match says: (mentions, None) for dates, ([], nights) for a stay length
+
+    Each mention carries how it repeats when it has to move later ('year'
+    for "oct 15", 'week' for "friday", 'month' for "the 15th", None when
+    it is pinned), which extract_stay uses to put a check-out after the
+    check-in.
+    """
+    kind = match.lastgroup
+    group = match.group
+    if kind == 'iso_day':
+        return [(_calendar_date(group('iso_year'), int(group('iso_month')), int(group('iso_day')), today), None)], None
+    if kind in ('num_day', 'num_year'):
+        return [_dated(group('num_year'), int(group('num_month')), int(group('num_day')), today)], None
+    if kind == 'span_end':
+        month = _month(group('span_month'))
+        return [_dated(None, month, int(group('span_start')), today),
+                _dated(None, month, int(group('span_end')), today)], None
+    if kind in ('md_day', 'md_year'):
+        return [_dated(group('md_year'), _month(group('md_month')), _day(group('md_day')), today)], None
+    if kind in ('dm_month', 'dm_year'):
+        return [_dated(group('dm_year'), _month(group('dm_month')), _day(group('dm_day')), today)], None
+    if kind == 'after_tomorrow':
+        return [(today + timedelta(days=2), None)], None
+    if kind == 'today':
+        return [(today, None)], None
+    if kind == 'tomorrow':
+        return [(today + timedelta(days=1), None)], None
+    if kind == 'in_unit':
+        days = _number(group('in_count')) * (7 if group('in_unit').startswith('week') else 1)
+        return [(today + timedelta(days=days), None)], None
+    if kind == 'week_count':
+        return [(today + timedelta(weeks=_number(group('week_count'))), None)], None
+    if kind == 'weekend_mod':
+        # Saturday of this weekend (Sunday counts as still this weekend)
+        saturday = today - timedelta(days=1) if today.weekday() == 6 else _upcoming_weekday(5, today, None)
+        if group('weekend_mod') == 'next':
+            saturday += timedelta(days=7)
+        return [(max(saturday, today), 'week')], None
+    if kind == 'next_week':
+        return [(today + timedelta(days=7), None)], None
+    if kind == 'wspan_end':
+        return [(_upcoming_weekday(WEEKDAY_NUMBERS[group('wspan_start')], today, group('wspan_mod')), 'week'),
+                (_upcoming_weekday(WEEKDAY_NUMBERS[group('wspan_end')], today, None), 'week')], None
+    if kind == 'any_weekday':
+        return [(_upcoming_weekday(WEEKDAY_NUMBERS[group('any_weekday')], today, group('any_weekday_mod')), 'week')], None
+    if kind == 'weekday':
+        return [(_upcoming_weekday(WEEKDAY_NUMBERS[group('weekday')], today, None), 'week')], None
+    if kind == 'stay':
+        return [], _number(group('stay'))
+    if kind == 'ordinal_day':
+        # The next time that day comes round ("the 31st" in November is December 31)
+        day = _day(group('ordinal_day'))
+        first_month = today.replace(day=1)
+        ahead = 0 if day >= today.day else 1
+        found = _add_month(first_month, ahead, day) or _add_month(first_month, ahead + 1, day)
+        return [(found, 'month')] if found else [], None
+    return [], None
+
+
+def _dated(year: Optional[str], month: int, day: int, today: date) -> Mention:
+    return _calendar_date(year, month, day, today), None if year else 'year'
+
+
+def _add_month(start: date, months: int, day: int) -> Optional[date]:
+    """`day` of the month `months` after start's month, None if that month is too short"""
+    index = start.month - 1 + months
+    try:
+        return date(start.year + index // 12, index % 12 + 1, day)
+    except ValueError:
+        return None
+
+
+def _later(mention: date, repeat: Optional[str]) -> Optional[date]:
+    """The next occurrence of a repeating mention, None if it is pinned"""
+    if repeat == 'week':
+        return mention + timedelta(days=7)
+    if repeat == 'month':
+        return _add_month(mention, 1, mention.day)
+    if repeat == 'year':
+        try:
+            return mention.replace(year=mention.year + 1)
+        except ValueError:
+            return None
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _scan(text: str, today: date) -> Tuple[Tuple[Mention, ...], Optional[int]]:
+    """
+    Every date mentioned in a lowercased text, in order, plus the stay length if one was given
+
+    Cached per (text, today): the same phrases come up constantly, and
+    keying on the day means relative dates never outlive midnight.
+    """
+    mentions = []
+    nights = None
+    for match in DATE_PATTERN.finditer(text):
+        found, stay = _resolve(match, today)
+        mentions.extend(mention for mention in found if mention[0] is not None)
+        if stay and nights is None:
+            nights = stay
+    return tuple(mentions), nights
+
+
+def _mentions(text: str, today: Optional[date]) -> Tuple[Tuple[Mention, ...], Optional[int]]:
+    if not text:
+        return (), None
+    return _scan(' '.join(text.lower().split()), today or date.today())
+
+
+def find_dates(text: str, today: Optional[date] = None) -> Tuple[Tuple[date, ...], Optional[int]]:
+    """
+    Scan free text for dates
+
+    Args:
+        text: Guest message or spoken phrase
+        today: Date that relative phrases are anchored to (defaults to date.today())
+
+    Returns:
+        (dates in the order mentioned, nights from "for 3 nights" or None)
+    """
+    mentions, nights = _mentions(text, today)
+    return tuple(mention for mention, _ in mentions), nights
+
+
+def parse_date(text: str, today: Optional[date] = None) -> Optional[date]:
+    """The first date in the text, or None"""
+    dates, _ = find_dates(text, today)
+    return dates[0] if dates else None
+
+
+def parse_natural_date(text: str, today: Optional[date] = None) -> Optional[str]:
+    """The first date in the text as YYYY-MM-DD, or None"""
+    found = parse_date(text, today)
+    return found.isoformat() if found else None
+
+
+def extract_stay(text: str, today: Optional[date] = None) -> Tuple[Optional[date], Optional[date]]:
+    """
+    Check-in and check-out dates from a message
+
+    "oct 15 to oct 18", "tomorrow for 2 nights", "friday to sunday" and
+    "dec 30 - jan 2" all give both dates; a lone date, or a check-out that
+    can't come after the check-in, gives (check_in, None).
+    """
+    mentions, nights = _mentions(text, today)
+    if not mentions:
+        return None, None
+    check_in = mentions[0][0]
+    if len(mentions) > 1:
+        check_out, repeat = mentions[1]
+        while check_out is not None and check_out <= check_in:
+            check_out = _later(check_out, repeat)
+        if check_out is not None:
+            return check_in, check_out
+    if nights:
+        return check_in, check_in + timedelta(days=nights)
+    return check_in, None
+
+
+def parse_date_range(text: str, today: Optional[date] = None) -> Tuple[Optional[str], Optional[str]]:
+    """extract_stay as YYYY-MM-DD strings (None for whatever is missing)"""
+    check_in, check_out = extract_stay(text, today)
+    return (check_in.isoformat() if check_in else None,
+            check_out.isoformat() if check_out else None)
@@ -0,0 +1,104 @@
+"""
+Entity Extraction
+Precompiled patterns that pull guests, nights, dates, contact and payment details out of a message
+"""
+
+import re
+from typing import Dict
+
+MONTHS = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*'
+
+# Counts, dates and booking IDs come out of one finditer pass over the
+# lowercased message. Every shape that starts with a number shares a single
+# branch, so the common case (no digit at this word) fails after one test.
+# The name of the innermost group that closed last says what was found.
+ENTITY_PATTERN = re.compile(
+    rf"""
+    \b(?:
+        (?P<number>\d{{1,4}})(?:
+              \s*(?P<guests>guest|people|person|adult)
+            | \s*(?P<nights>night|day)
+            | (?:st|nd|rd|th)?\s+(?P<day_month>{MONTHS})
+            | [-/](?P<numeric_date>\d{{1,2}})\b
+        )
+      | (?P<booking_id>bk\d{{3,}})\b
+      | {MONTHS}\s*(?P<month_day>\d{{1,2}})(?:st|nd|rd|th)?\b
+    )
+    """,
+    re.VERBOSE,
+)
+
+# Shapes that would swallow their neighbours inside the alternation get
+# their own searches, and only run when a cheap substring test passes
+EMAIL_PATTERN = re.compile(r'[\w.-]+@[\w.-]+\.\w+')
+PAYMENT_PATTERN = re.compile(r'payment:\s*(.+?)\s*\*{4}(\d{4})', re.IGNORECASE)
+PHONE_PATTERN = re.compile(r'[+\d][\d\s\-()]{8,}')
+NAME_PATTERN = re.compile(r"(?:name is|i am|i'm)\s+([a-zA-Z\s]+)", re.IGNORECASE)
+NAME_CUES = ('name is', 'i am', "i'm")
+LEADING_NUMBER_PATTERN = re.compile(r'\s*(\d+)')
+
+
+def extract_entities(message: str) -> Dict:
+    """
+    Extract every entity we understand from a guest message in one call
+
+    Args:
+        message: Raw guest message (case is preserved for names)
+
+    Returns:
+        Dict containing only the entities found:
+            guests (int), nights (int), dates (list of 'oct 15' / '15th oct'
+            strings, lowercased, in message order), numeric_dates (list of
+            'MM/DD'), leading_number (int), phone, email, payment_name,
+            card_last4, payment_text (the matched payment chunk),
+            booking_id, guest_name
+    """
+    entities: Dict = {}
+    text = message.lower()
+
+    if '@' in message:
+        email_match = EMAIL_PATTERN.search(message)
+        if email_match:
+            entities['email'] = email_match.group(0)
+            # Keep digits inside the address from reading as dates or counts
+            text = text.replace(email_match.group(0).lower(), ' ')
+
+    if 'payment' in text:
+        payment_match = PAYMENT_PATTERN.search(message)
+        if payment_match:
+            entities['payment_text'] = payment_match.group(0)
+            entities['payment_name'] = payment_match.group(1).strip()
+            entities['card_last4'] = payment_match.group(2)
+
+    dates = []
+    numeric_dates = []
+    for match in ENTITY_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if kind == 'guests' or kind == 'nights':
+            entities.setdefault(kind, int(match.group('number')))
+        elif kind == 'numeric_date':
+            numeric_dates.append(match.group(0))
+        elif kind == 'booking_id':
+            entities.setdefault('booking_id', match.group(kind).upper())
+        else:
+            dates.append(match.group(0))
+
+    if dates:
+        entities['dates'] = dates
+    if numeric_dates:
+        entities['numeric_dates'] = numeric_dates
+
+    phone_match = PHONE_PATTERN.search(message)
+    if phone_match:
+        entities['phone'] = phone_match.group(0).strip()
+
+    if any(cue in text for cue in NAME_CUES):
+        name_match = NAME_PATTERN.search(message)
+        if name_match:
+            entities['guest_name'] = name_match.group(1).strip()
+
+    leading = LEADING_NUMBER_PATTERN.match(text)
+    if leading:
+        entities['leading_number'] = int(leading.group(1))
+
+    return entities
@@ -0,0 +1,106 @@
+"""
+FAQ Index
+BM25-scored inverted index over FAQ questions and answers
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+STOP_WORDS = frozenset("""
+    a about am an and any are as at be been but by can could did do does for
+    from get got had has have how i if in is it its me my of on or our please
+    should so than that the their them there they this to us was we what when
+    where which who will with would you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase word tokens with stop words dropped and plurals folded ('pets' -> 'pet')
+
+    Hyphenated words yield their parts and the joined form, so 'check-out'
+    also matches 'checkout'.
+    """
+    words = []
+    for word in TOKEN_PATTERN.findall(text.lower()):
+        if '-' in word:
+            parts = word.split('-')
+            words.extend(parts)
+            words.append(''.join(parts))
+        else:
+            words.append(word)
+
+    tokens = []
+    for token in words:
+        if token in STOP_WORDS:
+            continue
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class FAQIndex:
+    """
+    Inverted index over a list of FAQ entries ({'question', 'answer'})
+
+    Built once per FAQ list; a query only touches the postings of its own
+    terms instead of re-tokenizing every FAQ. Question words count
+    `question_weight` times as much as answer words, since guests phrase
+    their messages like the questions.
+    """
+
+    def __init__(self, faqs: List[Dict], question_weight: int = 3, k1: float = 1.2, b: float = 0.75):
+        self.faqs = faqs
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._lengths: List[int] = []
+
+        for doc_id, faq in enumerate(faqs):
+            counts = Counter()
+            for token in tokenize(faq.get('question', '')):
+                counts[token] += question_weight
+            counts.update(tokenize(faq.get('answer', '')))
+            self._lengths.append(sum(counts.values()))
+            for token, tf in counts.items():
+                self._postings.setdefault(token, []).append((doc_id, tf))
+
+        n = len(faqs)
+        self._avg_length = (sum(self._lengths) / n) if n else 0.0
+        self._idf = {
+            token: math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for token, postings in self._postings.items()
+        }
+
+    def search(self, query: str, limit: int = 3) -> List[Tuple[float, Dict]]:
+        """
+        Score FAQs against a query
+
+        Returns:
+            Up to `limit` (score, faq) pairs, best first
+        """
+        scores: Dict[int, float] = {}
+        k1, b, avg_length, lengths = self.k1, self.b, self._avg_length, self._lengths
+        for token in set(tokenize(query)):
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = self._idf[token]
+            for doc_id, tf in postings:
+                norm = k1 * (1 - b + b * lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(score, self.faqs[doc_id]) for doc_id, score in ranked]
+
+    def best_match(self, query: str, min_score: float) -> Optional[Dict]:
+        """The top-scoring FAQ, or None if nothing scores at least min_score"""
+        results = self.search(query, limit=1)
+        if results and results[0][0] >= min_score:
+            return results[0][1]
+        return None
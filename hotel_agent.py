@@ -3,27 +3,420 @@ Hotel Front Desk Agent - Main Logic
 Handles intent recognition, booking operations, and response generation
 """
 
+import hashlib
 import json
 import os
-from datetime import datetime
-from typing import Dict, List, Optional, Tuple
-import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from date_parser import extract_stay
+from inventory import InventoryCalendar, default_stay
+from entity_extraction import extract_entities
+from faq_index import FAQIndex
+from intent_classifier import DEFAULT_MODEL_PATH, IntentClassifier
+from keyword_matcher import KeywordMatcher
+from llm_client import get_openai_client
+from semantic_cache import SemanticIntentCache
+from storage import HotelStorage, create_storage
+from ttl_cache import TTLCache
+
+CATALOG_SECTIONS = ('hotel_info', 'rooms', 'policies', 'amenities', 'faqs')
+
+# Keyword tables for rule-based intent detection. Trigger phrases decide the
+# intent; the (keyword, value) tables pick the entity, first match wins.
+# Greetings are short enough to hide inside other words ("this", "which"),
+# so they only match as whole words.
+GREETING_PHRASES = ['hello', 'hi', 'hey', 'good morning', 'good afternoon']
+ROOM_TYPE_KEYWORDS = ['queen', 'king', 'suite', 'executive', 'accessible', 'standard', 'deluxe', 'family']
+AVAILABILITY_PHRASES = ['available', 'availability', 'check room', 'any rooms', 'do you have']
+BOOKING_PHRASES = ['book', 'reserve', 'reservation', "i'd like to book", 'i want to book']
+CANCELLATION_PHRASES = ['cancel', 'cancellation', 'cancel my reservation', 'cancel booking']
+AMENITY_PHRASES = ['amenities', 'facilities', 'pool', 'gym', 'fitness', 'parking',
+                   'wifi', 'breakfast', 'restaurant', 'what do you have']
+AMENITY_KEYWORDS = [
+    ('pool', 'pool'),
+    ('gym', 'fitness_center'),
+    ('fitness', 'fitness_center'),
+    ('parking', 'parking'),
+    ('wifi', 'wifi'),
+    ('internet', 'wifi'),
+    ('breakfast', 'breakfast'),
+    ('restaurant', 'restaurant'),
+    ('business', 'business_center'),
+    ('concierge', 'concierge'),
+]
+POLICY_PHRASES = ['policy', 'policies', 'check-in', 'checkout', 'check in',
+                  'check out', 'pet', 'smoking', 'payment', 'cancellation policy']
+POLICY_KEYWORDS = [
+    ('check-in', 'check_in'),
+    ('check in', 'check_in'),
+    ('checkout', 'check_out'),
+    ('check out', 'check_out'),
+    ('pet', 'pets'),
+    ('smoking', 'smoking'),
+    ('payment', 'payment'),
+    ('pay', 'payment'),
+    ('cancel', 'cancellation'),
+]
+
+
+WHOLE_WORD_CATEGORIES = ('greeting',)
+
+
+def _build_intent_matcher() -> KeywordMatcher:
+    """Compile every keyword table into one automaton, tagged by category"""
+    matcher = KeywordMatcher()
+    tables = {
+        'greeting': GREETING_PHRASES,
+        'room_type': ROOM_TYPE_KEYWORDS,
+        'availability': AVAILABILITY_PHRASES,
+        'booking': BOOKING_PHRASES,
+        'cancellation': CANCELLATION_PHRASES,
+        'amenities': AMENITY_PHRASES,
+        'amenity': [keyword for keyword, _ in AMENITY_KEYWORDS],
+        'policies': POLICY_PHRASES,
+        'policy': [keyword for keyword, _ in POLICY_KEYWORDS],
+    }
+    for category, phrases in tables.items():
+        for index, phrase in enumerate(phrases):
+            matcher.add(phrase, category, index, whole_word=category in WHOLE_WORD_CATEGORIES)
+    return matcher
+
+
+INTENT_MATCHER = _build_intent_matcher()
+
+# Minimum BM25 score for an FAQ answer; roughly one distinctive word in
+# common with a question, or two with an answer
+FAQ_MIN_SCORE = 1.5
+
+# Rule-based results for these intents come from unambiguous keywords, so
+# the LLM is not consulted for them in hedged mode
+CONFIDENT_RULE_INTENTS = ('greeting', 'amenities', 'policies')
+
+# A greeting is only the whole story when none of these request keywords
+# follow it ("hi, I need to cancel a booking" is a cancellation)
+REQUEST_CATEGORIES = ('availability', 'booking', 'cancellation', 'amenities', 'policies')
+
+# Asks for what a booking needs before any room is held
+GUESTS_DATES_PROMPT = (
+    "To find the perfect room for you, I need a few details:\n\n"
+    "**1.** How many guests will be staying?\n"
+    "**2.** What are your check-in and check-out dates?\n\n"
+    "You can respond like: \"2 guests, checking in Oct 15, checking out Oct 17\"\n\n"
+    "Or answer one at a time!"
+)
+
+# Entities that belong to one particular message; a paraphrase match reuses
+# the cached intent but never these values
+MESSAGE_SPECIFIC_ENTITIES = (
+    'dates', 'check_in', 'check_out', 'guests', 'nights', 'booking_id',
+    'guest_name', 'phone', 'email',
+)
+
+
+class AgentReply(NamedTuple):
+    """
+    A response plus what the reply asks the guest for next
+
+    follow_up is 'guests_dates' when the reply asks for guest count and
+    dates, or 'guest_name' when it asks for a name to book `room` under
+    for `stay` (check-in, check-out).
+    """
+    text: str
+    follow_up: Optional[str] = None
+    room: Optional[Dict] = None
+    stay: Optional[Tuple[str, str]] = None
 
 
 class HotelAgent:
-    def __init__(self, data_file='hotel_data.json'):
+    def __init__(self, data_file='hotel_data.json', storage: Optional[HotelStorage] = None):
         self.data_file = data_file
+        self.storage = storage or create_storage(data_file)
+        # LLM intent/entity results keyed by normalized message text
+        self.intent_cache = TTLCache(
+            max_entries=int(os.getenv('LLM_INTENT_CACHE_SIZE', '1024')),
+            ttl=float(os.getenv('LLM_INTENT_CACHE_TTL', '3600')),
+        )
+        # Paraphrases of messages the LLM already classified (0 disables)
+        semantic_size = int(os.getenv('SEMANTIC_CACHE_SIZE', '20000'))
+        self.semantic_cache = SemanticIntentCache(
+            capacity=semantic_size,
+            threshold=float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.55')),
+        ) if semantic_size > 0 else None
+        # Offline classifier consulted when the rules are not confident
+        self.intent_classifier = self._load_intent_classifier(os.getenv('INTENT_CLASSIFIER_PATH', DEFAULT_MODEL_PATH))
+        self.classifier_threshold = float(os.getenv('INTENT_CLASSIFIER_THRESHOLD', '0.6'))
+        # How long a guest waits for the LLM before the rule-based answer is
+        # used (0 waits for the LLM however long it takes)
+        self.llm_deadline = float(os.getenv('LLM_DEADLINE_MS', '1000')) / 1000
+        self.llm_workers = int(os.getenv('LLM_WORKERS', '8'))
+        self._llm_executor: Optional[ThreadPoolExecutor] = None
+        self._llm_in_flight = 0
+        # Which detector produced each answer (see _detect_intent_local/_hedged)
+        self.intent_paths: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._catalog_versions: Dict[str, int] = {}
+        self._section_hashes: Dict[str, str] = {}
+        # Called with each booking after it is added or cancelled
+        self.booking_hooks: List[Callable[[Dict], None]] = []
         self.load_data()
         
     def load_data(self):
-        """Load hotel data from JSON file"""
-        with open(self.data_file, 'r') as f:
-            self.data = json.load(f)
+        """Load the hotel catalog from storage and rebuild the inventory calendar and FAQ index"""
+        self.data = self.storage.load()
+        self._build_inventory()
+        self._build_faq_index()
+        for section in CATALOG_SECTIONS:
+            self._section_hashes[section] = self._section_hash(self.data.get(section))
+            self._bump_catalog_version(section)
+    
+    def reload_catalog(self, new_data: Dict) -> List[str]:
+        """
+        Swap in edited catalog sections (rates, rooms, amenities, FAQs, ...)
+        
+        Only sections whose content changed are replaced, and only the
+        indexes/caches derived from those sections are rebuilt. Bookings are
+        left untouched. Called by DataFileWatcher from its own thread.
+        
+        Returns:
+            Names of the sections that changed
+        """
+        changed = {
+            section: new_data[section] for section in CATALOG_SECTIONS
+            if section in new_data and self._section_hash(new_data[section]) != self._section_hashes.get(section)
+        }
+        if not changed:
+            return []
+        
+        with self._lock:
+            self.storage.replace_catalog(changed)
+            if 'rooms' in changed:
+                self._swap_rooms(changed['rooms'])
+            for section, value in changed.items():
+                self.data[section] = value
+                self._section_hashes[section] = self._section_hash(value)
+                self._bump_catalog_version(section)
+            if 'faqs' in changed:
+                self._build_faq_index()
+        
+        print(f"🔄 Reloaded hotel data: {', '.join(changed)}")
+        return list(changed)
+    
+    def _swap_rooms(self, rooms: List[Dict]):
+        """
+        Replace the room list and the calendar together (caller holds the lock)
+        
+        The new calendar is built off to the side from the stored bookings,
+        so a room removed and later re-added gets its stays back, and
+        find_available_rooms never sees rooms from one catalog with the
+        calendar of another.
+        """
+        version, inventory = self._replay_bookings(room['id'] for room in rooms)
+        self.data['rooms'] = rooms
+        self._build_room_indexes()
+        self.inventory = inventory
+        self._inventory_version = version
+    
+    @staticmethod
+    def _section_hash(value) -> str:
+        return hashlib.sha1(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()
+    
+    def catalog_version(self, section: str) -> int:
+        """Version counter for a catalog section, bumped whenever that section changes"""
+        return self._catalog_versions.get(section, 0)
+    
+    def _bump_catalog_version(self, section: str):
+        self._catalog_versions[section] = self._catalog_versions.get(section, 0) + 1
+    
+    def _build_faq_index(self):
+        """Index FAQ questions and answers for BM25 lookup"""
+        self._faq_index = FAQIndex(self.data.get('faqs', []))
+    
+    def _build_room_indexes(self):
+        """Index rooms by id and by (lowercased) room type"""
+        rooms_by_id = {room['id']: room for room in self.data['rooms']}
+        rooms_by_type: Dict[str, List[Dict]] = {}
+        for room in self.data['rooms']:
+            rooms_by_type.setdefault(room['type'].lower(), []).append(room)
+        self._rooms_by_id = rooms_by_id
+        self._room_position = {room_id: position for position, room_id in enumerate(rooms_by_id)}
+        self._rooms_by_type = rooms_by_type
+        # room type query (e.g. 'king') -> ids of rooms whose type contains it
+        self._type_query_cache: Dict[str, List[str]] = {}
+    
+    def _build_inventory(self):
+        """Rebuild the per-night occupancy calendar from rooms and active bookings"""
+        self._build_room_indexes()
+        self._build_calendar()
+    
+    def _build_calendar(self):
+        self._inventory_version, self.inventory = self._replay_bookings(self._rooms_by_id)
+    
+    def _replay_bookings(self, room_ids: Iterable[str]) -> Tuple[Optional[int], InventoryCalendar]:
+        """A new calendar for room_ids holding every current booking, with the booking version it reflects"""
+        # Read before the bookings, so a change made meanwhile triggers another rebuild
+        version = self.storage.booking_version()
+        inventory = InventoryCalendar(room_ids)
+        for booking in self.storage.bookings_since(datetime.now().strftime('%Y-%m-%d')):
+            # Legacy bookings without concrete dates don't hold any nights
+            inventory.reserve(
+                booking.get('room_id'), booking.get('check_in'),
+                booking.get('check_out'), booking['booking_id']
+            )
+        return version, inventory
+    
+    def _sync_inventory(self):
+        """Rebuild the calendar if bookings changed in storage since it was built (other workers)"""
+        if self.storage.booking_version() != self._inventory_version:
+            with self._lock:
+                if self.storage.booking_version() != self._inventory_version:
+                    self._build_calendar()
     
     def save_data(self):
-        """Save hotel data back to JSON file"""
-        with open(self.data_file, 'w') as f:
-            json.dump(self.data, f, indent=2)
+        """Flush hotel data to storage (a full snapshot for the JSON backend)"""
+        self.storage.save()
+    
+    def next_booking_id(self) -> str:
+        """Next unused booking id (BK0001, BK0002, ...), never reusing cancelled ids"""
+        return f"BK{self.storage.next_booking_number():04d}"
+    
+    def get_booking(self, booking_id: str) -> Optional[Dict]:
+        """Look up a booking by its confirmation number"""
+        return self.storage.get_booking(booking_id)
+    
+    def list_bookings(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """Bookings in creation order (the most recent `limit` if given)"""
+        return self.storage.list_bookings(limit=limit, offset=offset)
+    
+    def find_available_rooms(self, check_in: str, check_out: str,
+                             room_type: Optional[str] = None,
+                             min_capacity: Optional[int] = None) -> List[Dict]:
+        """
+        Rooms free for every night between check_in and check_out
+        
+        Args:
+            check_in: Check-in date (YYYY-MM-DD)
+            check_out: Check-out date (YYYY-MM-DD)
+            room_type: Optional substring of the room type (e.g. 'king')
+            min_capacity: Optional minimum number of guests the room must hold
+        
+        Returns:
+            Matching room dicts in catalog order
+        """
+        self._sync_inventory()
+        # Rooms and calendar from the same catalog (reload_catalog swaps both under the lock)
+        with self._lock:
+            inventory, rooms_by_id = self.inventory, self._rooms_by_id
+            candidates = self._room_ids_of_type(room_type) if room_type else None
+        rooms = [rooms_by_id[room_id] for room_id in inventory.available_room_ids(check_in, check_out, candidates)]
+        
+        if min_capacity:
+            rooms = [r for r in rooms if r['capacity'] >= min_capacity]
+        return rooms
+    
+    def get_room(self, room_id: str) -> Optional[Dict]:
+        """Look up a room by its id"""
+        return self._rooms_by_id.get(room_id)
+    
+    def room_types(self) -> List[str]:
+        """Distinct room type names, in catalog order"""
+        return [rooms[0]['type'] for rooms in self._rooms_by_type.values()]
+    
+    def rooms_of_type(self, type_name: str) -> List[Dict]:
+        """Rooms whose type is exactly type_name (case-insensitive)"""
+        return self._rooms_by_type.get(type_name.lower(), [])
+    
+    def _room_ids_of_type(self, room_type: str) -> List[str]:
+        """Ids of rooms whose type contains room_type (case-insensitive), cached per query"""
+        room_type = room_type.lower()
+        room_ids = self._type_query_cache.get(room_type)
+        if room_ids is None:
+            room_ids = [
+                room['id']
+                for type_name, rooms in self._rooms_by_type.items() if room_type in type_name
+                for room in rooms
+            ]
+            room_ids.sort(key=self._room_position.__getitem__)
+            self._type_query_cache[room_type] = room_ids
+        return room_ids
+    
+    def find_bookings_by_phone(self, phone: str) -> List[Dict]:
+        """All bookings made with a guest phone number (any formatting)"""
+        return self.storage.find_bookings(phone=phone)
+    
+    def is_room_available(self, room_id: str, check_in: str, check_out: str) -> bool:
+        """Check whether a specific room is free for a stay"""
+        self._sync_inventory()
+        return self.inventory.is_available(room_id, check_in, check_out)
+    
+    def add_booking(self, booking: Dict) -> bool:
+        """
+        Record a new booking and hold its room for the booked nights
+        
+        Bookings for rooms outside our own inventory (e.g. Amadeus offers)
+        are recorded without touching the calendar.
+        
+        Returns:
+            False if the room is already taken for those nights
+        """
+        with self._lock:
+            self._sync_inventory()
+            room_id = booking.get('room_id')
+            reserved = False
+            if self.inventory.has_room(room_id):
+                if not self.inventory.reserve(room_id, booking.get('check_in'),
+                                              booking.get('check_out'), booking['booking_id']):
+                    return False
+                reserved = True
+            
+            # Storage shared with other workers has the final say
+            if not self.storage.add_booking(booking):
+                if reserved:
+                    self.inventory.release(booking['booking_id'])
+                return False
+        self._run_booking_hooks(booking)
+        return True
+    
+    def cancel_booking(self, booking_id: str) -> Optional[Dict]:
+        """Remove a booking and release its nights; returns the removed booking"""
+        with self._lock:
+            booking = self.storage.remove_booking(booking_id)
+            if not booking:
+                return None
+            
+            self.inventory.release(booking_id)
+        self._run_booking_hooks(booking)
+        return booking
+    
+    def add_booking_hook(self, hook: Callable[[Dict], None]):
+        self.booking_hooks.append(hook)
+    
+    def _run_booking_hooks(self, booking: Dict):
+        for hook in self.booking_hooks:
+            try:
+                hook(booking)
+            except Exception as e:
+                print(f"Booking hook failed for {booking.get('booking_id')}: {e}")
+    
+    def update_room(self, room_id: str, **changes) -> Optional[Dict]:
+        """Change fields of a room (rate, description, ...) and persist the change"""
+        with self._lock:
+            room = self._rooms_by_id.get(room_id)
+            if not room:
+                return None
+            
+            if all(room.get(key) == value for key, value in changes.items()):
+                return room
+            
+            room.update(changes)
+            self.storage.update_room(room, changes)
+            self._section_hashes['rooms'] = self._section_hash(self.data['rooms'])
+            self._bump_catalog_version('rooms')
+            if 'type' in changes:
+                self._build_room_indexes()
+            return room
     
     def get_greeting(self) -> str:
         """Return a friendly greeting message"""
@@ -50,58 +443,87 @@ class HotelAgent:
         Returns:
             Agent's response
         """
+        return self.reply(message, use_llm, llm_api_key).text
+    
+    def reply(self, message: str, use_llm: bool = False, llm_api_key: str = None) -> AgentReply:
+        """process_message, also saying what the response asks the guest for (see AgentReply)"""
         message_lower = message.lower().strip()
         
         # Handle numbered menu options
         if message_lower in ['1', 'option 1', '1.']:
-            return self._handle_availability({})
+            return AgentReply(self._handle_availability({}))
         elif message_lower in ['2', 'option 2', '2.']:
-            return "I'd be happy to help you book a room! 🏨\n\nTo find the perfect room for you, I need a few details:\n\n**1.** How many guests will be staying?\n**2.** What are your check-in and check-out dates?\n\nYou can respond like: \"2 guests, checking in Oct 15, checking out Oct 17\"\n\nOr answer one at a time!"
+            return AgentReply("I'd be happy to help you book a room! 🏨\n\n" + GUESTS_DATES_PROMPT, 'guests_dates')
         elif message_lower in ['3', 'option 3', '3.']:
-            return self._handle_cancellation({})
+            return AgentReply(self._handle_cancellation({}))
         elif message_lower in ['4', 'option 4', '4.']:
-            return self._handle_amenities({})
+            return AgentReply(self._handle_amenities({}))
         elif message_lower in ['5', 'option 5', '5.']:
-            return self._handle_policies({})
+            return AgentReply(self._handle_policies({}))
         
-        # Intent detection
+        # Entities are extracted once and shared by whichever detector runs
+        extracted = extract_entities(message)
+        
+        # Intent detection: rules -> classifier -> LLM
         if use_llm and llm_api_key:
-            intent, entities = self._detect_intent_llm(message, llm_api_key)
+            intent, entities, path = self._detect_intent_hedged(message, llm_api_key, extracted)
+            if path.startswith('llm'):
+                # Fill gaps the model left; names are better left to the model
+                for key, value in extracted.items():
+                    if key != 'guest_name':
+                        entities.setdefault(key, value)
         else:
-            intent, entities = self._detect_intent_rule_based(message_lower)
+            intent, entities, path = self._detect_intent_local(message_lower, extracted)
+        with self._lock:
+            self.intent_paths[path] = self.intent_paths.get(path, 0) + 1
+        
+        # The stay the guest asked for, resolved once for every handler
+        check_in, check_out = self._requested_stay(message, entities)
+        entities = {key: value for key, value in entities.items() if key not in ('check_in', 'check_out')}
+        if check_in:
+            entities['check_in'], entities['check_out'] = check_in, check_out
         
         # Route to appropriate handler
         if intent == 'check_availability':
-            return self._handle_availability(entities)
+            return AgentReply(self._handle_availability(entities))
         elif intent == 'book_room':
             return self._handle_booking(entities)
         elif intent == 'cancel_booking':
-            return self._handle_cancellation(entities)
+            return AgentReply(self._handle_cancellation(entities))
         elif intent == 'amenities':
-            return self._handle_amenities(entities)
+            return AgentReply(self._handle_amenities(entities))
         elif intent == 'policies':
-            return self._handle_policies(entities)
+            return AgentReply(self._handle_policies(entities))
         elif intent == 'faq':
-            return self._handle_faq(message)
+            return AgentReply(self._handle_faq(message))
         elif intent == 'greeting':
-            return "Hello! Welcome to Hyatt House Charlotte Airport. I'm Sarah from the front desk. How can I assist you today?"
+            return AgentReply("Hello! Welcome to Hyatt House Charlotte Airport. I'm Sarah from the front desk. How can I assist you today?")
         else:
-            return self._handle_general_inquiry(message)
+            return AgentReply(self._handle_general_inquiry(message))
     
-    def _detect_intent_rule_based(self, message: str) -> Tuple[str, Dict]:
-        """Simple rule-based intent detection"""
+    def _detect_intent_rule_based(self, message: str, extracted: Optional[Dict] = None) -> Tuple[str, Dict]:
+        """
+        Simple rule-based intent detection
+        
+        All keyword tables are matched in a single pass (see INTENT_MATCHER);
+        the checks below only look at which keywords were found, in the same
+        priority order as before. Dates, names and booking IDs come from
+        `extracted` (see entity_extraction.extract_entities).
+        """
+        if extracted is None:
+            extracted = extract_entities(message)
         entities = {}
+        hits = INTENT_MATCHER.scan(message)
+        room_type_hits = hits.get('room_type')
         
         # Greeting
-        if any(word in message for word in ['hello', 'hi', 'hey', 'good morning', 'good afternoon']):
+        if 'greeting' in hits:
             return 'greeting', entities
         
         # Check if message is just a room type (for booking context)
-        room_types = ['queen', 'king', 'suite', 'executive', 'accessible', 'standard', 'deluxe', 'family']
-        if message in room_types or (len(message.split()) <= 3 and any(rt in message for rt in room_types)):
-            for room_type in room_types:
-                if room_type in message:
-                    entities['room_type'] = room_type
+        if room_type_hits and (message in ROOM_TYPE_KEYWORDS or len(message.split()) <= 3):
+            # Later entries in the table take precedence
+            entities['room_type'] = ROOM_TYPE_KEYWORDS[max(room_type_hits)]
             # If it's just a room type, assume they want to book
             return 'book_room', entities
         
@@ -115,88 +537,50 @@ class HotelAgent:
             return 'book_room', entities
         
         # Check availability
-        if any(phrase in message for phrase in ['available', 'availability', 'check room', 'any rooms', 'do you have']):
+        if 'availability' in hits:
             # Extract room type if mentioned
-            for room_type in room_types:
-                if room_type in message:
-                    entities['room_type'] = room_type
+            if room_type_hits:
+                entities['room_type'] = ROOM_TYPE_KEYWORDS[max(room_type_hits)]
             
-            # Extract dates if mentioned
-            date_patterns = [
-                r'(\d{1,2}[-/]\d{1,2})',  # MM/DD or MM-DD
-                r'(oct|nov|dec|jan|feb|mar|apr|may|jun|jul|aug|sep)\s*\d{1,2}',  # Month DD
-            ]
-            for pattern in date_patterns:
-                matches = re.findall(pattern, message)
-                if matches:
-                    entities['dates'] = matches
+            # Extract dates if mentioned (Month DD wins over MM/DD)
+            dates = extracted.get('dates') or extracted.get('numeric_dates')
+            if dates:
+                entities['dates'] = dates
             
             return 'check_availability', entities
         
         # Booking
-        if any(phrase in message for phrase in ['book', 'reserve', 'reservation', "i'd like to book", 'i want to book']):
+        if 'booking' in hits:
             # Extract guest name
-            name_match = re.search(r'(?:name is|i am|i\'m)\s+([a-zA-Z\s]+)', message)
-            if name_match:
-                entities['guest_name'] = name_match.group(1).strip()
+            if 'guest_name' in extracted:
+                entities['guest_name'] = extracted['guest_name']
             
             # Extract room type
-            for room_type in room_types:
-                if room_type in message:
-                    entities['room_type'] = room_type
+            if room_type_hits:
+                entities['room_type'] = ROOM_TYPE_KEYWORDS[max(room_type_hits)]
             
             return 'book_room', entities
         
         # Cancellation
-        if any(phrase in message for phrase in ['cancel', 'cancellation', 'cancel my reservation', 'cancel booking']):
+        if 'cancellation' in hits:
             # Extract booking ID
-            booking_match = re.search(r'(?:booking|reservation|id)\s*#?\s*([A-Z0-9]+)', message)
-            if booking_match:
-                entities['booking_id'] = booking_match.group(1)
+            if 'booking_id' in extracted:
+                entities['booking_id'] = extracted['booking_id']
             
             return 'cancel_booking', entities
         
         # Amenities
-        if any(phrase in message for phrase in ['amenities', 'facilities', 'pool', 'gym', 'fitness', 'parking', 
-                                                 'wifi', 'breakfast', 'restaurant', 'what do you have']):
-            # Extract specific amenity
-            amenity_keywords = {
-                'pool': 'pool',
-                'gym': 'fitness_center',
-                'fitness': 'fitness_center',
-                'parking': 'parking',
-                'wifi': 'wifi',
-                'internet': 'wifi',
-                'breakfast': 'breakfast',
-                'restaurant': 'restaurant',
-                'business': 'business_center',
-                'concierge': 'concierge'
-            }
-            for keyword, amenity in amenity_keywords.items():
-                if keyword in message:
-                    entities['amenity'] = amenity
-                    break
+        if 'amenities' in hits:
+            # Extract specific amenity (first entry in the table wins)
+            if 'amenity' in hits:
+                entities['amenity'] = AMENITY_KEYWORDS[min(hits['amenity'])][1]
             
             return 'amenities', entities
         
         # Policies
-        if any(phrase in message for phrase in ['policy', 'policies', 'check-in', 'checkout', 'check in', 
-                                                 'check out', 'pet', 'smoking', 'payment', 'cancellation policy']):
-            policy_keywords = {
-                'check-in': 'check_in',
-                'check in': 'check_in',
-                'checkout': 'check_out',
-                'check out': 'check_out',
-                'pet': 'pets',
-                'smoking': 'smoking',
-                'payment': 'payment',
-                'pay': 'payment',
-                'cancel': 'cancellation'
-            }
-            for keyword, policy in policy_keywords.items():
-                if keyword in message:
-                    entities['policy'] = policy
-                    break
+        if 'policies' in hits:
+            if 'policy' in hits:
+                entities['policy'] = POLICY_KEYWORDS[min(hits['policy'])][1]
             
             return 'policies', entities
         
@@ -206,13 +590,138 @@ class HotelAgent:
         
         return 'general', entities
     
-    def _detect_intent_llm(self, message: str, api_key: str) -> Tuple[str, Dict]:
-        """Use LLM for more sophisticated intent detection"""
+    @staticmethod
+    def _intent_cache_key(message: str) -> str:
+        """Case- and whitespace-insensitive form of a message"""
+        return ' '.join(message.lower().split())
+    
+    @staticmethod
+    def _load_intent_classifier(path: str) -> Optional[IntentClassifier]:
+        if not path or not os.path.exists(path):
+            print(f"Intent classifier not found at {path}, using rules and LLM only")
+            return None
+        return IntentClassifier.load(path)
+    
+    def _detect_intent_local(self, message: str, extracted: Dict) -> Tuple[str, Dict, str]:
+        """
+        Offline detection: keyword rules, then the classifier if it is confident
+        
+        Returns:
+            (intent, entities, path) with path rules_confident, classifier or
+            rules (the rule result, used when nothing better was found)
+        """
+        rule_intent, rule_entities = self._detect_intent_rule_based(message, extracted)
+        if self._rule_is_confident(message, rule_intent, rule_entities):
+            return rule_intent, rule_entities, 'rules_confident'
+        
+        if self.intent_classifier is not None:
+            intent, confidence = self.intent_classifier.predict(message)
+            if confidence >= self.classifier_threshold:
+                return intent, self._keyword_entities(message, extracted), 'classifier'
+        
+        return rule_intent, rule_entities, 'rules'
+    
+    @staticmethod
+    def _rule_is_confident(message: str, intent: str, entities: Dict) -> bool:
+        """Whether a rule-based result may skip the classifier and the LLM"""
+        if intent == 'greeting':
+            hits = INTENT_MATCHER.scan(message)
+            return not any(category in hits for category in REQUEST_CATEGORIES)
+        return intent in CONFIDENT_RULE_INTENTS or (intent == 'cancel_booking' and 'booking_id' in entities)
+    
+    def _keyword_entities(self, message: str, extracted: Dict) -> Dict:
+        """Every entity the keyword tables and extractor found, whatever the intent"""
+        hits = INTENT_MATCHER.scan(message)
+        entities = {}
+        if 'room_type' in hits:
+            entities['room_type'] = ROOM_TYPE_KEYWORDS[max(hits['room_type'])]
+        if 'amenity' in hits:
+            entities['amenity'] = AMENITY_KEYWORDS[min(hits['amenity'])][1]
+        if 'policy' in hits:
+            entities['policy'] = POLICY_KEYWORDS[min(hits['policy'])][1]
+        dates = extracted.get('dates') or extracted.get('numeric_dates')
+        if dates:
+            entities['dates'] = dates
+        for key in ('guest_name', 'booking_id'):
+            if key in extracted:
+                entities[key] = extracted[key]
+        return entities
+    
+    @staticmethod
+    def _semantic_key(message: str) -> Tuple:
+        """Keyword entities a paraphrase must share with a cached message ("check in" vs "check out")"""
+        hits = INTENT_MATCHER.scan(message.lower())
+        key = []
+        if 'room_type' in hits:
+            key.append(ROOM_TYPE_KEYWORDS[max(hits['room_type'])])
+        if 'amenity' in hits:
+            key.append(AMENITY_KEYWORDS[min(hits['amenity'])][1])
+        if 'policy' in hits:
+            key.append(POLICY_KEYWORDS[min(hits['policy'])][1])
+        return tuple(key)
+    
+    def _detect_intent_hedged(self, message: str, api_key: str, extracted: Dict) -> Tuple[str, Dict, str]:
+        """
+        Local detection with the LLM raced against a deadline
+        
+        Rules and the classifier run first (microseconds); a confident answer
+        from either is returned straight away. Otherwise the rule result is
+        used when the LLM misses `llm_deadline`, fails, or when every LLM
+        worker is busy. An LLM call that misses the deadline keeps running
+        and still fills intent_cache, so the next identical message gets the
+        LLM answer.
+        
+        Returns:
+            (intent, entities, path) where path names the detector that won:
+            llm_cache, llm_semantic, llm, rules_confident, classifier,
+            rules_deadline, rules_busy or rules_error
+        """
+        cached = self.intent_cache.get(self._intent_cache_key(message))
+        if cached is not None:
+            intent, entities = cached
+            return intent, dict(entities), 'llm_cache'
+        
+        rule_intent, rule_entities, path = self._detect_intent_local(message.lower().strip(), extracted)
+        if path != 'rules':
+            return rule_intent, rule_entities, path
+        
+        # A close paraphrase of a message the LLM already classified
+        semantic = None
+        if self.semantic_cache is not None:
+            semantic = self.semantic_cache.lookup(message, self._semantic_key(message))
+        if semantic is not None:
+            _, (intent, cached_entities) = semantic
+            entities = {key: value for key, value in cached_entities.items() if key not in MESSAGE_SPECIFIC_ENTITIES}
+            entities.update(rule_entities)
+            return intent, entities, 'llm_semantic'
+        
+        with self._lock:
+            if self._llm_in_flight >= self.llm_workers:
+                return rule_intent, rule_entities, 'rules_busy'
+            self._llm_in_flight += 1
+            if self._llm_executor is None:
+                self._llm_executor = ThreadPoolExecutor(max_workers=self.llm_workers, thread_name_prefix='llm-intent')
+        
+        future = self._llm_executor.submit(self._query_llm, message, api_key)
+        future.add_done_callback(self._llm_call_done)
         try:
-            from openai import OpenAI
-            client = OpenAI(api_key=api_key)
-            
-            prompt = f"""Analyze this hotel guest message and extract:
+            intent, entities = future.result(timeout=self.llm_deadline or None)
+            return intent, entities, 'llm'
+        except FutureTimeout:
+            return rule_intent, rule_entities, 'rules_deadline'
+        except Exception as e:
+            print(f"LLM intent detection failed: {e}, falling back to rule-based")
+            return rule_intent, rule_entities, 'rules_error'
+    
+    def _llm_call_done(self, future):
+        with self._lock:
+            self._llm_in_flight -= 1
+    
+    def _query_llm(self, message: str, api_key: str) -> Tuple[str, Dict]:
+        """Ask the LLM for intent and entities and cache the answer; raises on failure"""
+        client = get_openai_client(api_key)
+        
+        prompt = f"""Analyze this hotel guest message and extract:
 1. Intent: greeting, check_availability, book_room, cancel_booking, amenities, policies, faq, or general
 2. Entities: guest_name, room_type, dates, booking_id, amenity, policy, etc.
 
@@ -220,35 +729,37 @@ Guest message: "{message}"
 
 Respond in JSON format:
 {{"intent": "...", "entities": {{...}}}}"""
-            
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3
-            )
-            
-            result = json.loads(response.choices[0].message.content)
-            return result.get('intent', 'general'), result.get('entities', {})
-        except Exception as e:
-            print(f"LLM intent detection failed: {e}, falling back to rule-based")
-            return self._detect_intent_rule_based(message.lower())
+        
+        response = client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.3
+        )
+        
+        result = json.loads(response.choices[0].message.content)
+        intent = result.get('intent', 'general')
+        entities = result.get('entities') if isinstance(result.get('entities'), dict) else {}
+        self.intent_cache.set(self._intent_cache_key(message), (intent, entities))
+        if self.semantic_cache is not None:
+            self.semantic_cache.add(message, (intent, entities), self._semantic_key(message))
+        return intent, dict(entities)
     
     def _handle_availability(self, entities: Dict) -> str:
         """Handle room availability inquiries"""
         room_type = entities.get('room_type', '').lower()
-        
-        available_rooms = [r for r in self.data['rooms'] if r['available']]
-        
-        if room_type:
-            # Filter by room type
-            filtered_rooms = [r for r in available_rooms if room_type in r['type'].lower()]
+        check_in, check_out = self._stay_dates(entities)
+        if check_in:
+            stay = f"{check_in} to {check_out}"
         else:
-            filtered_rooms = available_rooms
+            check_in, check_out = default_stay()
+            stay = f"tomorrow night ({check_in} to {check_out}) - tell me your dates to check others"
+        
+        filtered_rooms = self.find_available_rooms(check_in, check_out, room_type=room_type)
         
         if not filtered_rooms:
-            return "I apologize, but we don't have any rooms available matching your criteria at the moment. Would you like me to check other room types?"
+            return f"I apologize, but we don't have any rooms available matching your criteria for {stay}. Would you like me to check other room types?"
         
-        response = "Here are our available rooms:\n\n"
+        response = f"Here are our available rooms for {stay}:\n\n"
         for room in filtered_rooms:
             response += f"**{room['type']}** (Room #{room['id']})\n"
             response += f"• {room['description']}\n"
@@ -259,78 +770,108 @@ Respond in JSON format:
         response += "Would you like to book any of these rooms?"
         return response
     
-    def _handle_booking(self, entities: Dict) -> str:
+    @staticmethod
+    def _requested_stay(message: str, entities: Dict) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Check-in/check-out (YYYY-MM-DD) the guest asked for, or (None, None)
+        
+        Dates the LLM picked out may be in any wording; otherwise they are
+        read from the message. A check-in alone lasts the nights asked for
+        ("oct 15 for 3 nights"), else one night.
+        """
+        check_in, check_out = entities.get('check_in'), entities.get('check_out')
+        if isinstance(check_in, str) and isinstance(check_out, str) and 'TBD' not in (check_in, check_out):
+            message = f"{check_in} to {check_out}"
+        stay_in, stay_out = extract_stay(message)
+        if stay_in is None:
+            return None, None
+        if stay_out is None:
+            stay_out = stay_in + timedelta(days=1)
+        return stay_in.isoformat(), stay_out.isoformat()
+    
+    def _stay_dates(self, entities: Dict) -> Tuple[Optional[str], Optional[str]]:
+        """Check-in/check-out from entities, (None, None) if the guest gave no dates"""
+        check_in = entities.get('check_in')
+        check_out = entities.get('check_out')
+        if not check_in or not check_out or check_in == 'TBD' or check_out == 'TBD':
+            return None, None
+        return check_in, check_out
+    
+    def _handle_booking(self, entities: Dict) -> AgentReply:
         """Handle room booking requests"""
         guest_name = entities.get('guest_name')
         room_type = entities.get('room_type', '').lower()
+        check_in, check_out = self._stay_dates(entities)
+        
+        # If no name or room type, ask for details
+        if not guest_name and not room_type:
+            return AgentReply("I'd be happy to help you book a room! Could you please provide your name and preferred room type?\n\nAvailable types:\n• Queen Guest Room ($139/night)\n• King Guest Room ($149/night)\n• 2 Queen Beds ($159/night)\n• Executive King ($189/night)\n• One-Bedroom Suite ($259/night)")
+        
+        # Nothing is booked or held until we know which nights
+        if not check_in:
+            choice = f"the {room_type.title()} room" if room_type else "a room"
+            return AgentReply(f"I'd be happy to book {choice} for you! 🏨\n\n" + GUESTS_DATES_PROMPT, 'guests_dates')
         
         # If only room type provided, ask for name
         if room_type and not guest_name:
             # Check if room type is available first
-            available_rooms = [r for r in self.data['rooms'] if r['available']]
-            room = next((r for r in available_rooms if room_type in r['type'].lower()), None)
+            available_rooms = self.find_available_rooms(check_in, check_out, room_type=room_type)
+            room = available_rooms[0] if available_rooms else None
             
             if not room:
-                return f"I apologize, but we don't have {room_type.title()} rooms available at the moment. Here are our available options:\n\n" + self._handle_availability({})
+                return AgentReply(f"I apologize, but we don't have {room_type.title()} rooms available for {check_in} to {check_out}. Here are our available options:\n\n" + self._handle_availability({'check_in': check_in, 'check_out': check_out}))
             
-            # Store the pending room type in a way the next message can use
-            return (
+            # The next message (the name) books this room
+            return AgentReply(
                 f"**Excellent choice!** ✨\n\n"
                 f"**Room:** {room['type']}\n"
+                f"**Dates:** {check_in} to {check_out}\n"
                 f"**Rate:** ${room['price_per_night']}/night\n"
                 f"**Includes:** {', '.join(room['amenities'][:4])}\n\n"
-                f"To complete your reservation, please provide your full name."
+                f"To complete your reservation, please provide your full name.",
+                'guest_name', room, (check_in, check_out)
             )
         
         # If we have a name but no room type, try to find the last available room type from conversation
         if guest_name and not room_type:
             # Default to first available room for now
-            available_rooms = [r for r in self.data['rooms'] if r['available']]
+            available_rooms = self.find_available_rooms(check_in, check_out)
             room = available_rooms[0] if available_rooms else None
             
             if room:
                 room_type = room['type'].lower()
             else:
-                return "I apologize, but we don't have any rooms available at the moment."
-        
-        # If no name or room type, ask for details
-        if not guest_name and not room_type:
-            return "I'd be happy to help you book a room! Could you please provide your name and preferred room type?\n\nAvailable types:\n• Queen Guest Room ($139/night)\n• King Guest Room ($149/night)\n• 2 Queen Beds ($159/night)\n• Executive King ($189/night)\n• One-Bedroom Suite ($259/night)"
+                return AgentReply(f"I apologize, but we don't have any rooms available for {check_in} to {check_out}.")
         
         # Find available room
-        available_rooms = [r for r in self.data['rooms'] if r['available']]
-        
-        if room_type:
-            room = next((r for r in available_rooms if room_type in r['type'].lower()), None)
-        else:
-            room = available_rooms[0] if available_rooms else None
+        available_rooms = self.find_available_rooms(check_in, check_out, room_type=room_type)
+        room = available_rooms[0] if available_rooms else None
         
         if not room:
-            return "I apologize, but we don't have that room type available. Would you like to see our available rooms?"
+            return AgentReply("I apologize, but we don't have that room type available. Would you like to see our available rooms?")
         
         # Create booking
-        booking_id = f"BK{len(self.data['bookings']) + 1:04d}"
+        booking_id = self.next_booking_id()
         booking = {
             "booking_id": booking_id,
             "guest_name": guest_name,
             "room_id": room['id'],
             "room_type": room['type'],
             "price_per_night": room['price_per_night'],
-            "check_in": entities.get('check_in', 'TBD'),
-            "check_out": entities.get('check_out', 'TBD'),
+            "check_in": check_in,
+            "check_out": check_out,
             "created_at": datetime.now().isoformat()
         }
         
-        # Update data
-        self.data['bookings'].append(booking)
-        room['available'] = False
-        self.save_data()
+        if not self.add_booking(booking):
+            return AgentReply("I apologize, but that room was just booked for those dates. Would you like to see our available rooms?")
         
-        return (
+        return AgentReply(
             f"✅ Booking confirmed!\n\n"
             f"**Booking ID:** {booking_id}\n"
             f"**Guest:** {guest_name}\n"
             f"**Room:** {room['type']} (#{room['id']})\n"
+            f"**Dates:** {check_in} to {check_out}\n"
             f"**Rate:** ${room['price_per_night']}/night\n\n"
             f"Please note your booking ID for future reference. "
             f"Is there anything else I can help you with?"
@@ -341,30 +882,23 @@ Respond in JSON format:
         booking_id = entities.get('booking_id')
         
         if not booking_id:
-            # List all bookings
-            if not self.data['bookings']:
+            # List the most recent bookings
+            bookings = self.list_bookings(limit=20)
+            if not bookings:
                 return "There are no active bookings in the system."
             
             response = "Here are the current bookings:\n\n"
-            for booking in self.data['bookings']:
+            for booking in bookings:
                 response += f"• **{booking['booking_id']}** - {booking['guest_name']} - {booking['room_type']}\n"
             response += "\nPlease provide the booking ID you'd like to cancel."
             return response
         
-        # Find and cancel booking
-        booking = next((b for b in self.data['bookings'] if b['booking_id'] == booking_id), None)
+        # Find and cancel booking, releasing its nights
+        booking = self.cancel_booking(booking_id)
         
         if not booking:
             return f"I couldn't find a booking with ID {booking_id}. Please check the booking ID and try again."
         
-        # Remove booking and mark room as available
-        self.data['bookings'].remove(booking)
-        room = next((r for r in self.data['rooms'] if r['id'] == booking['room_id']), None)
-        if room:
-            room['available'] = True
-        
-        self.save_data()
-        
         return (
             f"✅ Booking {booking_id} has been successfully cancelled.\n\n"
             f"Guest: {booking['guest_name']}\n"
@@ -403,24 +937,9 @@ Respond in JSON format:
         return response
     
     def _handle_faq(self, message: str) -> str:
-        """Handle FAQ using simple text matching"""
-        message_lower = message.lower()
-        
-        # Find best matching FAQ
-        best_match = None
-        best_score = 0
-        
-        for faq in self.data['faqs']:
-            # Simple scoring based on word overlap
-            question_words = set(faq['question'].lower().split())
-            message_words = set(message_lower.split())
-            overlap = len(question_words & message_words)
-            
-            if overlap > best_score:
-                best_score = overlap
-                best_match = faq
-        
-        if best_match and best_score >= 2:
+        """Answer from the best BM25 match in the FAQ index (see faq_index.FAQIndex)"""
+        best_match = self._faq_index.best_match(message, FAQ_MIN_SCORE)
+        if best_match:
             return best_match['answer']
         
         return self._handle_general_inquiry(message)
@@ -0,0 +1,129 @@
+"""
+Amadeus Hotel Directory Cache
+Persistent cache of resolved Amadeus hotel records, refreshed in the background after a TTL of days
+"""
+
+import json
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from booking_journal import write_snapshot
+
+
+class HotelDirectory:
+    """
+    Hotel lookups that change rarely (which Amadeus hotel id is ours), kept
+    on disk between restarts
+
+    resolve() calls `fetch` only when nothing is cached for a key. After
+    `ttl` seconds an entry is stale: it is still returned, and a single
+    background thread fetches a fresh one. A lookup that found nothing is
+    remembered for `miss_ttl` seconds, so an outage or a missing hotel
+    doesn't cost a directory call on every request. A fetch that raises
+    keeps the old entry.
+    """
+
+    def __init__(self, path: str = 'amadeus_directory.json', ttl: float = 7 * 86400.0,
+                 miss_ttl: float = 600.0):
+        self.path = path
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._refreshing = set()
+        # key -> {'hotel': record or None, 'fetched_at': epoch seconds}
+        self._entries: Dict[str, Dict] = self._load()
+        self.hits = 0
+        self.stale_hits = 0
+        self.fetches = 0
+        self.fetch_errors = 0
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Hotel directory: ignoring unreadable {self.path}: {e}")
+            return {}
+
+    def _fresh(self, entry: Dict, now: float) -> bool:
+        ttl = self.ttl if entry['hotel'] is not None else self.miss_ttl
+        return now - entry['fetched_at'] < ttl
+
+    def resolve(self, key: str, fetch: Callable[[], Optional[Dict]]) -> Optional[Dict]:
+        """The cached record for key, fetching it now only if there has never been one"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._fresh(entry, time.time()):
+                    self.hits += 1
+                else:
+                    self.stale_hits += 1
+                    self._refresh_in_background(key, fetch)
+                return entry['hotel']
+        return self.refresh(key, fetch)
+
+    def _refresh_in_background(self, key: str, fetch: Callable[[], Optional[Dict]]):
+        """Start one refresh thread per key; caller holds the lock"""
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        threading.Thread(target=self._background_refresh, args=(key, fetch),
+                         name='hotel-directory-refresh', daemon=True).start()
+
+    def _background_refresh(self, key: str, fetch: Callable[[], Optional[Dict]]):
+        try:
+            self.refresh(key, fetch)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def refresh(self, key: str, fetch: Callable[[], Optional[Dict]]) -> Optional[Dict]:
+        """Fetch key now and save it; on failure the previous record (if any) is kept and returned"""
+        self.fetches += 1
+        try:
+            hotel = fetch()
+        except Exception as e:
+            self.fetch_errors += 1
+            print(f"Hotel directory: refreshing {key} failed: {e}")
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None:
+                    # Remember the failure in memory only, so callers back off for miss_ttl
+                    self._entries[key] = {'hotel': None, 'fetched_at': time.time()}
+            return entry['hotel'] if entry is not None else None
+
+        with self._lock:
+            self._entries[key] = {'hotel': hotel, 'fetched_at': time.time()}
+            snapshot = dict(self._entries)
+        with self._write_lock:
+            try:
+                write_snapshot(self.path, snapshot)
+            except OSError as e:
+                print(f"Hotel directory: could not save {self.path}: {e}")
+        return hotel
+
+    def stats(self) -> Dict:
+        """Entries and counters, for status endpoints"""
+        now = time.time()
+        with self._lock:
+            entries = {
+                key: {
+                    'hotel_id': (entry['hotel'] or {}).get('hotelId'),
+                    'age_hours': round((now - entry['fetched_at']) / 3600, 1),
+                    'fresh': self._fresh(entry, now),
+                }
+                for key, entry in self._entries.items()
+            }
+        return {
+            'path': self.path,
+            'ttl_days': self.ttl / 86400,
+            'entries': entries,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'fetches': self.fetches,
+            'fetch_errors': self.fetch_errors,
+        }
@@ -0,0 +1,170 @@
+"""
+HTTP Client
+Pooled keep-alive requests sessions with retry/backoff and per-endpoint timeouts
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) seconds
+Timeout = Tuple[float, float]
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RetryPolicy(Retry):
+    """
+    urllib3 Retry that also retries 429 for non-idempotent methods
+
+    A 429 means the request was refused before it was processed, so a POST
+    (e.g. starting a VAPI call) can safely be sent again; a 5xx cannot.
+    Retry-After is honored up to `max_retry_after` seconds, so a long
+    server-requested pause can't stall a live phone call.
+    """
+
+    max_retry_after = 10.0
+    on_retry = None
+
+    def new(self, **kw):
+        retry = super().new(**kw)
+        retry.max_retry_after = self.max_retry_after
+        retry.on_retry = self.on_retry
+        return retry
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if status_code == 429 and self.total:
+            return True
+        return super().is_retry(method, status_code, has_retry_after)
+
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.max_retry_after)
+
+    def increment(self, *args, **kwargs):
+        retry = super().increment(*args, **kwargs)
+        if self.on_retry is not None:
+            self.on_retry()
+        return retry
+
+
+class ApiSession:
+    """
+    One requests.Session per external API, shared by every call to it
+
+    Connections are kept alive and pooled, so calls after the first skip
+    the TCP and TLS handshakes. Transient failures (connection errors, 429
+    and 5xx) are retried with exponential backoff; after the last attempt
+    the final response is returned so callers' raise_for_status() reports
+    the real status. Requests that failed with a 5xx or a read error are
+    only resent for `retry_methods` (idempotent methods by default). Each
+    call names its endpoint, which picks its timeout and is what stats()
+    are grouped by. `on_retry`, if given, is called with the endpoint each
+    time a request is resent (e.g. to count it against a metered quota).
+
+    Settings come from `{prefix}_HTTP_POOL_SIZE`, `{prefix}_HTTP_RETRIES`,
+    `{prefix}_HTTP_BACKOFF` and `{prefix}_TIMEOUT_{ENDPOINT}` (read seconds),
+    falling back to the constructor arguments.
+    """
+
+    IDEMPOTENT_METHODS = Retry.DEFAULT_ALLOWED_METHODS
+
+    def __init__(self, prefix: str, timeouts: Dict[str, Timeout], default_timeout: Timeout = (3.05, 30.0),
+                 pool_size: int = 10, retries: int = 2, backoff: float = 0.3,
+                 retry_methods: frozenset = IDEMPOTENT_METHODS,
+                 on_retry: Optional[Callable[[str], None]] = None):
+        self.prefix = prefix
+        self.on_retry = on_retry
+        self.default_timeout = default_timeout
+        self.timeouts = {
+            endpoint: (connect, float(os.getenv(f"{prefix}_TIMEOUT_{endpoint.upper()}", read)))
+            for endpoint, (connect, read) in timeouts.items()
+        }
+        self.pool_size = int(os.getenv(f"{prefix}_HTTP_POOL_SIZE", pool_size))
+        retries = int(os.getenv(f"{prefix}_HTTP_RETRIES", retries))
+        backoff = float(os.getenv(f"{prefix}_HTTP_BACKOFF", backoff))
+
+        retry = RetryPolicy(
+            total=retries,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=retry_methods,
+            backoff_factor=backoff,
+            raise_on_status=False,
+            respect_retry_after_header=True,
+        )
+        retry.on_retry = self._count_retry
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._lock = threading.Lock()
+        # Endpoint of the request this thread is sending (retries run in the caller's thread)
+        self._local = threading.local()
+        self.retries = 0
+        # endpoint -> [requests, failures, total seconds, max seconds]
+        self._endpoints: Dict[str, list] = {}
+
+    def _count_retry(self):
+        with self._lock:
+            self.retries += 1
+        if self.on_retry is not None:
+            self.on_retry(self._local.endpoint)
+
+    def timeout_for(self, endpoint: str) -> Timeout:
+        return self.timeouts.get(endpoint, self.default_timeout)
+
+    def request(self, method: str, url: str, endpoint: str, **kwargs) -> requests.Response:
+        """Send a request on the pooled session with the endpoint's timeout"""
+        kwargs.setdefault('timeout', self.timeout_for(endpoint))
+        start = time.perf_counter()
+        failed = True
+        self._local.endpoint = endpoint
+        try:
+            response = self.session.request(method, url, **kwargs)
+            failed = not response.ok
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                counters = self._endpoints.setdefault(endpoint, [0, 0, 0.0, 0.0])
+                counters[0] += 1
+                counters[1] += failed
+                counters[2] += elapsed
+                counters[3] = max(counters[3], elapsed)
+
+    def get(self, url: str, endpoint: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, endpoint, **kwargs)
+
+    def post(self, url: str, endpoint: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, endpoint, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def stats(self) -> Dict:
+        """Per-endpoint request counts and latency, for status endpoints"""
+        with self._lock:
+            endpoints = {
+                endpoint: {
+                    'requests': count,
+                    'failures': failures,
+                    'avg_ms': round(total / count * 1000, 2) if count else 0.0,
+                    'max_ms': round(longest * 1000, 2),
+                    'timeout_seconds': list(self.timeout_for(endpoint)),
+                }
+                for endpoint, (count, failures, total, longest) in self._endpoints.items()
+            }
+            return {
+                'pool_size': self.pool_size,
+                'retries': self.retries,
+                'endpoints': endpoints,
+            }
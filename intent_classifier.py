@@ -0,0 +1,138 @@
+"""
+Intent Classifier
+Multinomial logistic regression over hashed n-gram vectors, trained offline with NumPy
+
+Train and export a model:
+    python intent_classifier.py train corpus/intent_train.jsonl --out models/intent_classifier.npz
+
+Try it:
+    python intent_classifier.py predict "do you guys have a swimming pool"
+"""
+
+import argparse
+import json
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from text_vectors import DEFAULT_DIM, hashed_matrix
+
+DEFAULT_MODEL_PATH = 'models/intent_classifier.npz'
+
+
+class IntentClassifier:
+    """
+    Linear softmax classifier: probabilities = softmax(X @ weights + bias)
+
+    X rows are text_vectors.hashed_vector features, so a prediction is one
+    small matrix product; pass many messages to predict_batch to classify
+    them together.
+    """
+
+    def __init__(self, labels: Sequence[str], weights: np.ndarray, bias: np.ndarray):
+        self.labels = list(labels)
+        self.weights = weights.astype(np.float32)
+        self.bias = bias.astype(np.float32)
+        self.dim = weights.shape[0]
+
+    def predict_proba(self, texts: Iterable[str]) -> np.ndarray:
+        """(n_messages, n_labels) class probabilities"""
+        logits = hashed_matrix(texts, self.dim) @ self.weights + self.bias
+        return _softmax(logits)
+
+    def predict_batch(self, texts: Iterable[str]) -> List[Tuple[str, float]]:
+        """(intent, confidence) for each message"""
+        probabilities = self.predict_proba(texts)
+        best = probabilities.argmax(axis=1)
+        return [(self.labels[index], float(probabilities[row, index])) for row, index in enumerate(best)]
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """(intent, confidence) for one message"""
+        return self.predict_batch([text])[0]
+
+    def save(self, path: str):
+        np.savez(path, labels=np.array(self.labels), weights=self.weights, bias=self.bias)
+
+    @classmethod
+    def load(cls, path: str) -> 'IntentClassifier':
+        with np.load(path) as model:
+            return cls([str(label) for label in model['labels']], model['weights'], model['bias'])
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return shifted / shifted.sum(axis=1, keepdims=True)
+
+
+def train_classifier(texts: Sequence[str], intents: Sequence[str], dim: int = DEFAULT_DIM,
+                     epochs: int = 500, learning_rate: float = 2.0, l2: float = 1e-4) -> IntentClassifier:
+    """
+    Fit the classifier with full-batch gradient descent on cross-entropy
+
+    The corpora here are a few hundred to a few thousand messages, which a
+    few hundred full-batch steps handle in well under a second.
+    """
+    labels = sorted(set(intents))
+    index = {label: i for i, label in enumerate(labels)}
+    features = hashed_matrix(texts, dim)
+    targets = np.zeros((len(texts), len(labels)), dtype=np.float32)
+    targets[np.arange(len(texts)), [index[intent] for intent in intents]] = 1.0
+
+    weights = np.zeros((dim, len(labels)), dtype=np.float32)
+    bias = np.zeros(len(labels), dtype=np.float32)
+    n = len(texts)
+    for _ in range(epochs):
+        error = (_softmax(features @ weights + bias) - targets) / n
+        weights -= learning_rate * (features.T @ error + l2 * weights)
+        bias -= learning_rate * error.sum(axis=0)
+
+    return IntentClassifier(labels, weights, bias)
+
+
+def load_corpus(path: str) -> Tuple[List[str], List[str]]:
+    """Read a JSON-lines corpus of {"text": ..., "intent": ...} records"""
+    texts, intents = [], []
+    with open(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                texts.append(record['text'])
+                intents.append(record['intent'])
+    return texts, intents
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train or try the offline intent classifier')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    train = commands.add_parser('train', help='train on a JSON-lines corpus and export the model')
+    train.add_argument('corpus', help='JSON lines with "text" and "intent" fields')
+    train.add_argument('--out', default=DEFAULT_MODEL_PATH, help='model file to write (.npz)')
+    train.add_argument('--dim', type=int, default=DEFAULT_DIM, help='hashed feature dimensions')
+    train.add_argument('--epochs', type=int, default=500)
+    train.add_argument('--learning-rate', type=float, default=2.0)
+    train.add_argument('--l2', type=float, default=1e-4)
+
+    predict = commands.add_parser('predict', help='classify messages with an exported model')
+    predict.add_argument('messages', nargs='+')
+    predict.add_argument('--model', default=DEFAULT_MODEL_PATH)
+
+    args = parser.parse_args()
+
+    if args.command == 'train':
+        texts, intents = load_corpus(args.corpus)
+        classifier = train_classifier(texts, intents, dim=args.dim, epochs=args.epochs,
+                                      learning_rate=args.learning_rate, l2=args.l2)
+        predicted = [intent for intent, _ in classifier.predict_batch(texts)]
+        accuracy = sum(p == t for p, t in zip(predicted, intents)) / len(intents)
+        classifier.save(args.out)
+        print(f"Trained on {len(texts)} messages, {len(classifier.labels)} intents "
+              f"(training accuracy {accuracy:.1%}) -> {args.out}")
+    else:
+        classifier = IntentClassifier.load(args.model)
+        for message, (intent, confidence) in zip(args.messages, classifier.predict_batch(args.messages)):
+            print(f"{intent:20s} {confidence:.2f}  {message}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""
+Room Inventory Calendar
+Tracks room x night occupancy so availability can be answered for any date range
+"""
+
+from bisect import bisect_left, insort
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+DateLike = Union[str, date]
+
+
+def to_night(value: DateLike) -> Optional[int]:
+    """Convert a YYYY-MM-DD string (or date) to a night ordinal, None if unparseable"""
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return datetime.strptime(value[:10], '%Y-%m-%d').toordinal()
+    except ValueError:
+        return None
+
+
+def parse_stay(check_in: DateLike, check_out: DateLike) -> Optional[Tuple[int, int]]:
+    """
+    Convert a check-in/check-out pair to a half-open night range [start, end)
+
+    Returns:
+        (start, end) night ordinals, or None if the dates are missing or invalid
+    """
+    start = to_night(check_in)
+    end = to_night(check_out)
+    if start is None or end is None or end <= start:
+        return None
+    return start, end
+
+
+def default_stay(nights: int = 1) -> Tuple[str, str]:
+    """Default stay used when a guest hasn't given dates: tomorrow for N nights"""
+    check_in = datetime.now() + timedelta(days=1)
+    check_out = check_in + timedelta(days=max(nights, 1))
+    return check_in.strftime('%Y-%m-%d'), check_out.strftime('%Y-%m-%d')
+
+
+class InventoryCalendar:
+    """
+    Per-night occupancy for every room in the hotel
+
+    Each night holds a bitmask of occupied rooms (one bit per room), so a
+    range query is a handful of integer ORs regardless of how many rooms or
+    bookings there are. Each room also keeps a sorted list of its stays for
+    single-room interval lookups.
+    """
+
+    def __init__(self, room_ids: Iterable[str] = ()):
+        self._room_index: Dict[str, int] = {}
+        self._room_ids: List[Optional[str]] = []
+        self._all_rooms = 0
+        self._nights: Dict[int, int] = {}
+        self._stays: Dict[str, List[Tuple[int, int, str]]] = {}
+        self._bookings: Dict[str, Tuple[str, int, int]] = {}
+
+        for room_id in room_ids:
+            self.add_room(room_id)
+
+    def add_room(self, room_id: str):
+        """Start tracking a room (no-op if already tracked)"""
+        if room_id in self._room_index:
+            return
+        self._room_index[room_id] = len(self._room_ids)
+        self._room_ids.append(room_id)
+        self._all_rooms |= 1 << self._room_index[room_id]
+        self._stays[room_id] = []
+
+    def remove_room(self, room_id: str):
+        """Stop offering a room; its existing stays are dropped from the calendar"""
+        index = self._room_index.pop(room_id, None)
+        if index is None:
+            return
+        for _, _, booking_id in list(self._stays.pop(room_id, [])):
+            self._clear_nights(index, *self._bookings.pop(booking_id)[1:])
+        self._room_ids[index] = None
+        self._all_rooms &= ~(1 << index)
+
+    def has_room(self, room_id: str) -> bool:
+        return room_id in self._room_index
+
+    def reserve(self, room_id: str, check_in: DateLike, check_out: DateLike,
+                booking_id: str) -> bool:
+        """
+        Mark a room occupied for every night of a stay
+
+        Returns:
+            True if reserved, False if the room is unknown, the dates are
+            invalid, or any night is already taken
+        """
+        stay = parse_stay(check_in, check_out)
+        index = self._room_index.get(room_id)
+        if stay is None or index is None or booking_id in self._bookings:
+            return False
+
+        start, end = stay
+        bit = 1 << index
+        if self._occupied_mask(start, end) & bit:
+            return False
+
+        nights = self._nights
+        for night in range(start, end):
+            nights[night] = nights.get(night, 0) | bit
+        insort(self._stays[room_id], (start, end, booking_id))
+        self._bookings[booking_id] = (room_id, start, end)
+        return True
+
+    def release(self, booking_id: str) -> bool:
+        """Free the nights held by a booking"""
+        entry = self._bookings.pop(booking_id, None)
+        if entry is None:
+            return False
+        room_id, start, end = entry
+        stays = self._stays[room_id]
+        del stays[bisect_left(stays, (start, end, booking_id))]
+        self._clear_nights(self._room_index[room_id], start, end)
+        return True
+
+    def is_available(self, room_id: str, check_in: DateLike, check_out: DateLike) -> bool:
+        """Check whether a single room is free for every night of a stay"""
+        stay = parse_stay(check_in, check_out)
+        stays = self._stays.get(room_id)
+        if stay is None or stays is None:
+            return False
+
+        start, end = stay
+        # The only stays that can overlap are the one starting just before
+        # `start` and any starting inside [start, end)
+        pos = bisect_left(stays, (start,))
+        if pos > 0 and stays[pos - 1][1] > start:
+            return False
+        return pos == len(stays) or stays[pos][0] >= end
+
+    def available_room_ids(self, check_in: DateLike, check_out: DateLike,
+                           candidates: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Room ids free for every night of the stay, in the order rooms were added
+
+        Args:
+            check_in: Check-in date (YYYY-MM-DD)
+            check_out: Check-out date (YYYY-MM-DD)
+            candidates: Optional subset of room ids to consider (order preserved)
+        """
+        stay = parse_stay(check_in, check_out)
+        if stay is None:
+            return []
+        occupied = self._occupied_mask(*stay)
+
+        if candidates is not None:
+            index = self._room_index
+            return [
+                room_id for room_id in candidates
+                if room_id in index and not (occupied >> index[room_id]) & 1
+            ]
+
+        free = self._all_rooms & ~occupied
+        room_ids = self._room_ids
+        result = []
+        while free:
+            low = free & -free
+            result.append(room_ids[low.bit_length() - 1])
+            free ^= low
+        return result
+
+    def bookings_for_room(self, room_id: str) -> List[Tuple[str, str, str]]:
+        """(booking_id, check_in, check_out) for every stay held by a room"""
+        return [
+            (booking_id, date.fromordinal(start).isoformat(), date.fromordinal(end).isoformat())
+            for start, end, booking_id in self._stays.get(room_id, [])
+        ]
+
+    def _occupied_mask(self, start: int, end: int) -> int:
+        nights = self._nights
+        mask = 0
+        for night in range(start, end):
+            mask |= nights.get(night, 0)
+        return mask
+
+    def _clear_nights(self, index: int, start: int, end: int):
+        nights = self._nights
+        keep = ~(1 << index)
+        for night in range(start, end):
+            remaining = nights.get(night, 0) & keep
+            if remaining:
+                nights[night] = remaining
+            else:
+                nights.pop(night, None)
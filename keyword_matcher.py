@@ -0,0 +1,99 @@
+"""
+Keyword Matcher
+Aho-Corasick automaton that finds every occurrence of many phrases in one pass over a message
+"""
+
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+
+class KeywordMatcher:
+    """
+    Multi-pattern substring matcher
+
+    Every phrase is tagged with one or more (category, index) pairs. A scan
+    walks the message once, whatever the number of phrases, and reports which
+    indices of which categories occurred. Matching is plain substring
+    matching, the same as `phrase in message`, unless a phrase is added with
+    whole_word=True: then it only counts when no letter or digit touches it
+    on either side ('hi' matches "hi there" but not "this").
+    """
+
+    def __init__(self, phrases: Iterable[Tuple[str, Hashable, int]] = ()):
+        # Trie nodes: transitions and the tags of phrases ending exactly here
+        self._goto: List[Dict[str, int]] = [{}]
+        self._tags: List[List[Tuple[Hashable, int]]] = [[]]
+        # (category, index) -> phrase length, for whole-word phrases
+        self._whole_words: Dict[Tuple[Hashable, int], int] = {}
+        for phrase, category, index in phrases:
+            self.add(phrase, category, index)
+        self._built = False
+
+    def add(self, phrase: str, category: Hashable, index: int, whole_word: bool = False):
+        """Register a phrase under (category, index); call before the first scan"""
+        node = 0
+        for ch in phrase:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._tags.append([])
+            node = nxt
+        self._tags[node].append((category, index))
+        if whole_word:
+            self._whole_words[(category, index)] = len(phrase)
+        self._built = False
+
+    def _build(self):
+        """
+        Compute failure links breadth-first and fold them into a full DFA
+
+        After this every node maps each character straight to the next
+        state, so a scan does exactly one dict lookup per character.
+        """
+        goto = self._goto
+        fail = [0] * len(goto)
+        # Tags reported at each node: its own plus those of every proper suffix
+        out = [list(tags) for tags in self._tags]
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{}] * (len(goto) - 1)
+        queue = deque(goto[0].values())
+
+        while queue:
+            node = queue.popleft()
+            # Inherit the failure state's transitions, then override with our own
+            delta[node] = {**delta[fail[node]], **goto[node]}
+            for ch, nxt in goto[node].items():
+                queue.append(nxt)
+                fail[nxt] = delta[fail[node]].get(ch, 0)
+                out[nxt] += out[fail[nxt]]
+        self._delta = delta
+        self._out = out
+        self._built = True
+
+    def scan(self, text: str) -> Dict[Hashable, Set[int]]:
+        """
+        Find every registered phrase occurring in text
+
+        Returns:
+            {category: {index, ...}} for each category with at least one hit
+        """
+        if not self._built:
+            self._build()
+
+        delta, out, whole_words = self._delta, self._out, self._whole_words
+        hits: Dict[Hashable, Set[int]] = {}
+        node = 0
+        for end, ch in enumerate(text):
+            node = delta[node].get(ch, 0)
+            if out[node]:
+                for tag in out[node]:
+                    length = whole_words.get(tag)
+                    if length is not None and not self._on_word_boundaries(text, end + 1 - length, end + 1):
+                        continue
+                    hits.setdefault(tag[0], set()).add(tag[1])
+        return hits
+
+    @staticmethod
+    def _on_word_boundaries(text: str, start: int, end: int) -> bool:
+        return (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum())
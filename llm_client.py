@@ -0,0 +1,56 @@
+"""
+LLM Client Pool
+Reuses one OpenAI client (and its HTTP connection pool) per API key
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+
+class OpenAIClientPool:
+    """
+    Keeps a bounded number of OpenAI clients, one per API key
+
+    Building a client sets up a fresh HTTP connection pool, so a new client
+    per message means a new TLS handshake per message. Keys can come from
+    request bodies, so the pool is LRU-bounded; an evicted client is simply
+    dropped (not closed) in case another request is still using it.
+    """
+
+    def __init__(self, max_clients: int = 16, timeout: float = 20.0):
+        self.max_clients = max_clients
+        self.timeout = timeout
+        self._clients: "OrderedDict[str, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+
+    def get(self, api_key: str):
+        """Return the shared client for api_key, creating it on first use"""
+        with self._lock:
+            client = self._clients.get(api_key)
+            if client is not None:
+                self._clients.move_to_end(api_key)
+                return client
+
+            from openai import OpenAI
+            client = OpenAI(api_key=api_key, timeout=self.timeout)
+            self._clients[api_key] = client
+            self.created += 1
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+            return client
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+# Singleton instance
+openai_client_pool = None
+
+def get_openai_client(api_key: str):
+    """Get the shared OpenAI client for an API key"""
+    global openai_client_pool
+    if openai_client_pool is None:
+        openai_client_pool = OpenAIClientPool(timeout=float(os.getenv('LLM_REQUEST_TIMEOUT', '20')))
+    return openai_client_pool.get(api_key)
@@ -0,0 +1,158 @@
+"""
+Offer Cache
+Short-lived cache of Amadeus hotel offers, served stale while a background refresh runs
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional
+
+from single_flight import SingleFlight
+
+
+class OfferCache:
+    """
+    Hotel offers per (hotel ids, check-in, check-out, adults, rooms)
+
+    get() returns cached offers for `ttl` seconds. For the next `stale_ttl`
+    seconds the old offers are still returned at once while a single
+    background thread fetches fresh ones; after that the caller waits for a
+    live fetch. An empty result is cached for `empty_ttl` seconds only and
+    is never served stale. A fetch that raises is not cached: the stale
+    offers are kept if there are any, otherwise the caller gets [].
+    Concurrent misses for the same key share one fetch.
+
+    invalidate() drops every entry whose stay overlaps a local booking, and
+    makes any fetch already in flight skip storing its (older) result.
+    """
+
+    def __init__(self, ttl: float = 120.0, stale_ttl: float = 600.0, empty_ttl: float = 30.0,
+                 max_entries: int = 512):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.empty_ttl = empty_ttl
+        self.max_entries = max_entries
+        # key -> (fetched_at monotonic, offers)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._generation = 0
+        # Keyed by (key, generation) so nobody joins a fetch older than an invalidation
+        self._flights = SingleFlight()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.fetch_errors = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(hotel_ids: List[str], check_in: str, check_out: str, adults: int,
+            room_quantity: int) -> tuple:
+        return (tuple(sorted(hotel_ids)), check_in, check_out, adults, room_quantity)
+
+    def get(self, key: tuple, fetch: Callable[[], List[Dict]]) -> List[Dict]:
+        """Offers for key: cached, stale with a background refresh, or fetched now"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                fetched_at, offers = entry
+                age = time.monotonic() - fetched_at
+                if age < (self.ttl if offers else self.empty_ttl):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return offers
+                if offers and age < self.ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self.stale_hits += 1
+                    self._refresh_in_background(key, fetch)
+                    return offers
+            self.misses += 1
+        return self._fetch(key, fetch)
+
+    def _refresh_in_background(self, key: tuple, fetch: Callable[[], List[Dict]]):
+        """Start one refresh thread per key; caller holds the lock"""
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        self.refreshes += 1
+        threading.Thread(target=self._background_refresh, args=(key, fetch),
+                         name='offer-cache-refresh', daemon=True).start()
+
+    def _background_refresh(self, key: tuple, fetch: Callable[[], List[Dict]]):
+        try:
+            self._fetch(key, fetch)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _fetch(self, key: tuple, fetch: Callable[[], List[Dict]]) -> List[Dict]:
+        generation = self._generation
+        try:
+            offers = self._flights.do((key, generation), fetch)
+        except Exception as e:
+            self.fetch_errors += 1
+            print(f"Offer cache: fetching offers for {key[0]} {key[1]}..{key[2]} failed: {e}")
+            with self._lock:
+                entry = self._entries.get(key)
+            return entry[1] if entry is not None and entry[1] else []
+
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (time.monotonic(), offers)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return offers
+
+    def peek(self, key: tuple) -> Optional[List[Dict]]:
+        """Cached non-empty offers for key however old they are, without fetching"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry[1]:
+                return None
+            self._entries.move_to_end(key)
+            self.stale_hits += 1
+            return entry[1]
+
+    def invalidate(self, check_in: Optional[str] = None, check_out: Optional[str] = None) -> int:
+        """Drop entries whose stay overlaps [check_in, check_out) (all entries if a date is missing)"""
+        with self._lock:
+            self._generation += 1
+            if check_in and check_out:
+                stale = [key for key in self._entries if key[1] < check_out and check_in < key[2]]
+            else:
+                stale = list(self._entries)
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self):
+        self.invalidate()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        """Counters and size, for status endpoints"""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl,
+            'stale_ttl_seconds': self.stale_ttl,
+            'empty_ttl_seconds': self.empty_ttl,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'refreshes': self.refreshes,
+            'fetch_errors': self.fetch_errors,
+            'invalidations': self.invalidations,
+            'evictions': self.evictions,
+            'coalesced': self._flights.shared,
+            'hit_rate': round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,216 @@
+"""
+Quota Governor
+Per-second token bucket and persistent monthly call budget for a metered API
+"""
+
+import sqlite3
+import threading
+import time
+from calendar import monthrange
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+
+class QuotaExceeded(Exception):
+    """Raised instead of making a call the rate limit or monthly budget doesn't allow"""
+
+
+class QuotaGovernor:
+    """
+    Decides whether a metered API call may go out, and counts the ones that do
+
+    acquire(endpoint) is called before every request. Calls are counted per
+    calendar month (UTC) and endpoint in a SQLite file, so the count
+    survives restarts and is shared by every worker process. When fewer than
+    `conserve_below` calls are left, conserving() is true and callers should
+    answer from cached data wherever they have any. Once the month's calls
+    reach `monthly_budget - reserve` further calls raise QuotaExceeded, so
+    callers fall back to static data instead of being cut off by the
+    provider; the reserve absorbs calls made outside this app. Resends by
+    the HTTP client are billed too, so they are counted with record(),
+    which never refuses. Endpoints in `exempt` (the OAuth token) are counted
+    but never refused.
+
+    A token bucket (`rate` calls per second, `burst` at once) smooths
+    bursts; a caller waits up to `max_wait` seconds for a token before the
+    call is refused. A call the monthly budget refuses gives its token
+    back. The bucket is per process.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS api_usage (
+            month TEXT NOT NULL,
+            endpoint TEXT NOT NULL,
+            calls INTEGER NOT NULL,
+            PRIMARY KEY (month, endpoint)
+        ) WITHOUT ROWID;
+    """
+
+    # Fractions of the usable budget at which a warning is printed
+    WARN_AT = (0.5, 0.75, 0.9, 1.0)
+
+    def __init__(self, db_path: str = 'amadeus_quota.db', monthly_budget: int = 2000, reserve: int = 100,
+                 conserve_below: int = 200, rate: float = 10.0, burst: int = 10, max_wait: float = 0.5, exempt: Iterable[str] = ('token',)):
+        self.db_path = db_path
+        self.monthly_budget = monthly_budget
+        self.reserve = reserve
+        self.conserve_below = conserve_below
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.exempt = frozenset(exempt)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._bucket_lock = threading.Lock()
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._warned: Dict[str, float] = {}
+        self.rate_limited = 0
+        self.denied: Dict[str, int] = {}
+        # The database is created by the first call that needs it, so an
+        # unconfigured API never touches the disk
+        self._schema_ready = False
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite3 connections aren't shareable)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if not self._schema_ready:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(self.SCHEMA)
+                self._schema_ready = True
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self):
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+
+    @staticmethod
+    def current_month() -> str:
+        return datetime.now(timezone.utc).strftime('%Y-%m')
+
+    @property
+    def usable_budget(self) -> int:
+        return max(self.monthly_budget - self.reserve, 0)
+
+    def _take_token(self) -> bool:
+        """Take one token from the bucket, waiting up to max_wait for a refill"""
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            with self._bucket_lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+                self._refilled_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def _return_token(self):
+        with self._bucket_lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+    def acquire(self, endpoint: str):
+        """Record a call to endpoint, or raise QuotaExceeded if it must not be made"""
+        if not self._take_token():
+            self.rate_limited += 1
+            raise QuotaExceeded(f"Amadeus rate limit: more than {self.rate:g} calls/second")
+
+        month = self.current_month()
+        enforce = endpoint not in self.exempt
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            used = conn.execute("SELECT COALESCE(SUM(calls), 0) FROM api_usage WHERE month = ?",
+                                (month,)).fetchone()[0]
+            if enforce and used >= self.usable_budget:
+                conn.execute("ROLLBACK")
+                self._return_token()
+                self.denied[endpoint] = self.denied.get(endpoint, 0) + 1
+                raise QuotaExceeded(
+                    f"Amadeus monthly budget used up: {used} of {self.monthly_budget} calls used "
+                    f"({self.reserve} held in reserve)"
+                )
+            self._count(conn, month, endpoint)
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        self._warn(month, used + 1)
+
+    def record(self, endpoint: str):
+        """Count a call that has already been made (an HTTP retry); never refuses"""
+        month = self.current_month()
+        conn = self._conn()
+        self._count(conn, month, endpoint)
+        used = conn.execute("SELECT COALESCE(SUM(calls), 0) FROM api_usage WHERE month = ?",
+                            (month,)).fetchone()[0]
+        self._warn(month, used)
+
+    @staticmethod
+    def _count(conn: sqlite3.Connection, month: str, endpoint: str):
+        conn.execute(
+            "INSERT INTO api_usage (month, endpoint, calls) VALUES (?, ?, 1) "
+            "ON CONFLICT(month, endpoint) DO UPDATE SET calls = calls + 1",
+            (month, endpoint),
+        )
+
+    def _warn(self, month: str, used: int):
+        """Print once per process each time usage crosses a WARN_AT threshold"""
+        if not self.usable_budget:
+            return
+        fraction = used / self.usable_budget
+        crossed = [level for level in self.WARN_AT if fraction >= level and level > self._warned.get(month, 0)]
+        if crossed:
+            self._warned[month] = crossed[-1]
+            print(f"⚠️ Amadeus quota: {used} of {self.monthly_budget} calls used in {month} "
+                  f"({fraction:.0%} of the usable budget)")
+
+    def usage(self, month: Optional[str] = None) -> Dict[str, int]:
+        """Calls per endpoint in a month (the current one by default)"""
+        rows = self._conn().execute("SELECT endpoint, calls FROM api_usage WHERE month = ?",
+                                    (month or self.current_month(),))
+        return dict(rows.fetchall())
+
+    def remaining(self) -> int:
+        """Calls left this month before calls are refused"""
+        return max(self.usable_budget - sum(self.usage().values()), 0)
+
+    def conserving(self) -> bool:
+        """True when the budget is low enough that cached data should be preferred"""
+        return self.remaining() < self.conserve_below
+
+    def stats(self) -> Dict:
+        """Budget, usage and a month-end projection, for status endpoints"""
+        now = datetime.now(timezone.utc)
+        by_endpoint = self.usage()
+        used = sum(by_endpoint.values())
+        remaining = max(self.usable_budget - used, 0)
+        days = monthrange(now.year, now.month)[1]
+        elapsed = (now.day - 1 + (now.hour * 3600 + now.minute * 60 + now.second) / 86400) / days
+        return {
+            'month': now.strftime('%Y-%m'),
+            'monthly_budget': self.monthly_budget,
+            'reserve': self.reserve,
+            'used': used,
+            'remaining': remaining,
+            'conserving': remaining < self.conserve_below,
+            'exhausted': remaining == 0,
+            'projected_month_end': round(used / elapsed) if elapsed > 0 else used,
+            'by_endpoint': by_endpoint,
+            'denied': dict(self.denied),
+            'rate_per_second': self.rate,
+            'rate_limited': self.rate_limited,
+        }
@@ -0,0 +1,125 @@
+"""
+Semantic Intent Cache
+Reuses LLM intent results for paraphrases of messages it has already classified
+"""
+
+import threading
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from text_vectors import DEFAULT_DIM, hashed_vector
+
+
+class SemanticIntentCache:
+    """
+    Nearest-neighbour cache over hashed n-gram vectors
+
+    Every stored message is a unit column in a float32 matrix, so a lookup
+    is a vector-matrix product (cosine similarity) and an argmax. The matrix
+    is laid out feature-major: a message only has a few dozen non-zero
+    features, and only those rows of the matrix are read. Columns are
+    allocated `chunk` at a time as the cache fills, up to `capacity`; once
+    it is full, new entries overwrite the oldest ones. Runs entirely offline.
+
+    Similar wording is not enough on its own: "what time is check in" and
+    "what time is check out" differ by one stop word. Entries carry a key
+    (e.g. the keyword entities of the message) and a lookup only considers
+    entries stored under the same key.
+    """
+
+    def __init__(self, capacity: int = 20000, threshold: float = 0.55, dim: int = DEFAULT_DIM,
+                 chunk: int = 1024):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.dim = dim
+        self.chunk = chunk
+        self._matrix = np.zeros((dim, 0), dtype=np.float32)
+        # Column -> id of the key it was stored under
+        self._key_ids = np.zeros(0, dtype=np.int32)
+        self._keys: Dict[Hashable, int] = {}
+        self._values: List[Optional[Any]] = []
+        self._size = 0
+        self._next = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _grow(self):
+        """Add up to `chunk` columns; caller holds the lock"""
+        columns = min(self.capacity, self._matrix.shape[1] + self.chunk)
+        matrix = np.zeros((self.dim, columns), dtype=np.float32)
+        matrix[:, :self._size] = self._matrix[:, :self._size]
+        key_ids = np.zeros(columns, dtype=np.int32)
+        key_ids[:self._size] = self._key_ids[:self._size]
+        # Lookups already running keep reading the old arrays, which stay valid
+        self._matrix, self._key_ids = matrix, key_ids
+        self._values.extend([None] * (columns - len(self._values)))
+
+    def add(self, text: str, value: Any, key: Hashable = None) -> bool:
+        """Remember the value for a message; returns False if it has no content words"""
+        vector = hashed_vector(text, self.dim)
+        if not vector.any():
+            return False
+        with self._lock:
+            column = self._next
+            if column >= self._matrix.shape[1]:
+                self._grow()
+            self._matrix[:, column] = vector
+            self._key_ids[column] = self._keys.setdefault(key, len(self._keys))
+            self._values[column] = value
+            self._next = (column + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+        return True
+
+    def lookup(self, text: str, key: Hashable = None) -> Optional[Tuple[float, Any]]:
+        """
+        Find the most similar message stored under the same key
+
+        Returns:
+            (similarity, value) if the best match reaches `threshold`, else None
+        """
+        vector = hashed_vector(text, self.dim)
+        with self._lock:
+            matrix, key_ids, size = self._matrix, self._key_ids, self._size
+            key_id = self._keys.get(key)
+        if size == 0 or key_id is None or not vector.any():
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # The product runs outside the lock; a column overwritten meanwhile
+        # can at worst pair a near-threshold score with its replacement's
+        # value. Rows are accumulated one at a time as views: indexing the
+        # matrix with the feature list would copy every row it reads.
+        scores = np.zeros(size, dtype=np.float32)
+        scratch = np.empty(size, dtype=np.float32)
+        for feature in np.flatnonzero(vector):
+            np.multiply(matrix[feature, :size], vector[feature], out=scratch)
+            scores += scratch
+        scores[key_ids[:size] != key_id] = -1.0
+        best = int(np.argmax(scores))
+        similarity = float(scores[best])
+
+        with self._lock:
+            if similarity >= self.threshold:
+                self.hits += 1
+                return similarity, self._values[best]
+            self.misses += 1
+            return None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def stats(self) -> Dict:
+        """Counters and size, for status endpoints"""
+        lookups = self.hits + self.misses
+        return {
+            'size': self._size,
+            'capacity': self.capacity,
+            'threshold': self.threshold,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'matrix_bytes': int(self._matrix.nbytes),
+        }
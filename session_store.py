@@ -0,0 +1,595 @@
+"""
+Session Store
+Bounded storage for chat and call sessions (idle expiry, LRU eviction), in memory or shared through SQLite
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def approximate_size(value: Any) -> int:
+    """
+    Deep sys.getsizeof of JSON-like data (dicts, lists, tuples, strings, numbers)
+
+    Objects reachable twice are counted once. This is an estimate of what a
+    session keeps alive, not an exact heap measurement.
+    """
+    seen = set()
+    total = 0
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set)):
+            stack.extend(item)
+    return total
+
+
+class SessionArchive:
+    """
+    Append-only JSON lines file of sessions the store has retired
+
+    One record per line: {"session_id": ..., "archived_at": ..., "session": {...}}.
+    Each record is a single write to a file opened in append mode, so several
+    worker processes can share one archive.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def __call__(self, session_id: str, session: Dict):
+        record = {'session_id': session_id, 'archived_at': datetime.now().isoformat(), 'session': session}
+        line = json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n'
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'ab')
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class SessionStore:
+    """
+    Interface every session backend implements: session dicts keyed by id,
+    with bounded lifetime and size
+
+    A session that hasn't been used for `idle_ttl` seconds is gone: reads
+    treat it as missing and the sweeper frees it. Past `max_entries`
+    sessions, or `max_bytes` of accounted size (0 for no limit), the least
+    recently used ones are evicted.
+
+    Handlers change sessions in place, so the store can't see the change;
+    call save() when a request is done with a session. That writes it back,
+    refreshes its size and marks it used.
+
+    With `index_key`, sessions can also be looked up by the value of that
+    field (find()). Sessions marked with finish() stay readable for
+    `retention` seconds and are then handed to `archive` (if given) and
+    removed by the sweeper.
+    """
+
+    def __init__(self, name: str = 'sessions', max_entries: int = 10000,
+                 idle_ttl: float = 1800.0, max_bytes: int = 0, index_key: Optional[str] = None,
+                 retention: float = 3600.0, archive: Optional[Callable[[str, Dict], None]] = None):
+        self.name = name
+        self.max_entries = max_entries
+        self.idle_ttl = idle_ttl
+        self.max_bytes = max_bytes
+        self.index_key = index_key
+        self.retention = retention
+        self.archive = archive
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Counted by this process
+        self.created = 0
+        self.expired = 0
+        self.evicted = 0
+        self.archived = 0
+        self.sweeps = 0
+
+    def _lookup_value(self, session: Dict) -> Optional[str]:
+        """The session's index_key field as an index key, or None"""
+        if self.index_key is None:
+            return None
+        value = session.get(self.index_key)
+        return None if value is None else str(value)
+
+    def get(self, session_id: str, default: Any = None) -> Any:
+        """The live session for an id (marking it used), or default"""
+        raise NotImplementedError
+
+    def get_or_create(self, session_id: str, factory: Callable[[], Dict]) -> Dict:
+        """The live session for an id, or a new one from factory() if there is none"""
+        raise NotImplementedError
+
+    def find(self, value: Any) -> Tuple[Optional[str], Optional[Dict]]:
+        """(session id, session) of the live session whose index_key field equals value, or (None, None)"""
+        raise NotImplementedError
+
+    def save(self, session_id: str, session: Dict):
+        """Store (or re-store after in-place changes) a session"""
+        raise NotImplementedError
+
+    def finish(self, session_id: str, session: Dict):
+        """Save a session that is over; it is archived and removed `retention` seconds after the first finish()"""
+        raise NotImplementedError
+
+    def pop(self, session_id: str, default: Any = None) -> Any:
+        raise NotImplementedError
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def items(self) -> List[Tuple[str, Dict]]:
+        """Snapshot of the live (id, session) pairs, least recently used first"""
+        raise NotImplementedError
+
+    def sweep(self) -> int:
+        """Retire finished and expired sessions and enforce the limits; returns how many sessions were removed"""
+        raise NotImplementedError
+
+    def _archive(self, retired: List[Tuple[str, Dict]]):
+        if self.archive is not None:
+            for session_id, session in retired:
+                self.archive(session_id, session)
+        self.archived += len(retired)
+
+    def start_sweeper(self, interval: float = 60.0):
+        """Sweep every `interval` seconds in a daemon thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, args=(interval,),
+                                            name=f'{self.name}-sweeper', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Session sweep failed ({self.name}): {e}")
+
+    def _size(self) -> Tuple[int, int]:
+        """(sessions, accounted bytes)"""
+        raise NotImplementedError
+
+    def stats(self) -> Dict:
+        """Counters and size, for status endpoints"""
+        sessions, size = self._size()
+        return {
+            'backend': self.backend,
+            'sessions': sessions,
+            'bytes': size,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'idle_ttl_seconds': self.idle_ttl,
+            'retention_seconds': self.retention,
+            'created': self.created,
+            'expired': self.expired,
+            'evicted': self.evicted,
+            'archived': self.archived,
+            'sweeps': self.sweeps,
+        }
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Sessions in this process's memory, in least recently used order
+
+    Sizes are approximate_size() estimates. Sessions are handed out by
+    reference, so nothing is copied per request, but they are only visible
+    to the process that created them: use the SQLite backend when running
+    more than one worker.
+    """
+
+    backend = 'memory'
+
+    def __init__(self, name: str = 'sessions', max_entries: int = 10000,
+                 idle_ttl: float = 1800.0, max_bytes: int = 0, index_key: Optional[str] = None,
+                 retention: float = 3600.0, archive: Optional[Callable[[str, Dict], None]] = None):
+        super().__init__(name, max_entries, idle_ttl, max_bytes, index_key, retention, archive)
+        # session id -> [session, last used (monotonic), accounted bytes, index value, finished at]
+        self._entries: "OrderedDict[str, list]" = OrderedDict()
+        self._bytes = 0
+        # index value -> session id
+        self._index: Dict[str, str] = {}
+        # (finished at, session id) in finishing order
+        self._finished: deque = deque()
+        # Finished sessions dropped early (expired or evicted), archived by the next sweep
+        self._unarchived: List[Tuple[str, Dict]] = []
+        self._lock = threading.Lock()
+
+    def _live_entry(self, session_id: str, now: float) -> Optional[list]:
+        """The entry for session_id if it hasn't expired (dropping it if it has); caller holds the lock"""
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return None
+        if now - entry[1] > self.idle_ttl:
+            self._drop(session_id)
+            self.expired += 1
+            return None
+        return entry
+
+    def _put(self, session_id: str, session: Dict, now: float, size: int, finished_at: Optional[float]):
+        """Insert as the most recently used entry; caller holds the lock and has removed any old entry"""
+        lookup = self._lookup_value(session)
+        self._entries[session_id] = [session, now, size, lookup, finished_at]
+        self._bytes += size
+        if lookup is not None:
+            self._index[lookup] = session_id
+
+    def _remove(self, session_id: str) -> Optional[list]:
+        entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+            if entry[3] is not None and self._index.get(entry[3]) == session_id:
+                del self._index[entry[3]]
+        return entry
+
+    def _drop(self, session_id: str):
+        """Remove an entry before its retention is up, keeping a finished session for the archive"""
+        entry = self._remove(session_id)
+        if entry is not None and entry[4] is not None:
+            self._unarchived.append((session_id, entry[0]))
+
+    def _evict_over_limits(self):
+        while self._entries and (len(self._entries) > self.max_entries
+                                 or (self.max_bytes and self._bytes > self.max_bytes)):
+            session_id = next(iter(self._entries))
+            self._drop(session_id)
+            self.evicted += 1
+
+    def get(self, session_id: str, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._live_entry(session_id, now)
+            if entry is None:
+                return default
+            entry[1] = now
+            self._entries.move_to_end(session_id)
+            return entry[0]
+
+    def get_or_create(self, session_id: str, factory: Callable[[], Dict]) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._live_entry(session_id, now)
+            if entry is not None:
+                entry[1] = now
+                self._entries.move_to_end(session_id)
+                return entry[0]
+            session = factory()
+            self._put(session_id, session, now, approximate_size(session), None)
+            self.created += 1
+            self._evict_over_limits()
+            return session
+
+    def find(self, value: Any) -> Tuple[Optional[str], Optional[Dict]]:
+        with self._lock:
+            session_id = self._index.get(str(value))
+            if session_id is None:
+                return None, None
+            entry = self._live_entry(session_id, time.monotonic())
+            return (session_id, entry[0]) if entry is not None else (None, None)
+
+    def save(self, session_id: str, session: Dict, finish: bool = False):
+        """Store (or re-store after in-place changes) a session, re-measuring its size"""
+        size = approximate_size(session)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._remove(session_id)
+            if entry is None:
+                self.created += 1
+            finished_at = entry[4] if entry is not None else None
+            if finish and finished_at is None:
+                finished_at = now
+                self._finished.append((finished_at, session_id))
+            self._put(session_id, session, now, size, finished_at)
+            self._evict_over_limits()
+
+    def finish(self, session_id: str, session: Dict):
+        self.save(session_id, session, finish=True)
+
+    def pop(self, session_id: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._remove(session_id)
+        return default if entry is None else entry[0]
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return self._live_entry(session_id, time.monotonic()) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def items(self) -> List[Tuple[str, Dict]]:
+        cutoff = time.monotonic() - self.idle_ttl
+        with self._lock:
+            return [(session_id, entry[0]) for session_id, entry in self._entries.items() if entry[1] >= cutoff]
+
+    def sweep(self) -> int:
+        now = time.monotonic()
+        cutoff = now - self.idle_ttl
+        retired = []
+        with self._lock:
+            before = len(self._entries)
+            # Finished in order, so the ones past retention are a prefix
+            while self._finished and self._finished[0][0] < now - self.retention:
+                finished_at, session_id = self._finished.popleft()
+                entry = self._entries.get(session_id)
+                if entry is not None and entry[4] == finished_at:
+                    self._remove(session_id)
+                    retired.append((session_id, entry[0]))
+            # Least recently used first, so the expired ones are a prefix
+            while self._entries:
+                session_id, entry = next(iter(self._entries.items()))
+                if entry[1] >= cutoff:
+                    break
+                self._drop(session_id)
+                self.expired += 1
+            self._evict_over_limits()
+            self.sweeps += 1
+            removed = before - len(self._entries)
+            retired += self._unarchived
+            self._unarchived = []
+        self._archive(retired)
+        return removed
+
+    def _size(self) -> Tuple[int, int]:
+        return len(self._entries), self._bytes
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions in a SQLite database (WAL mode) shared by every worker process
+
+    Any worker can serve any step of a conversation: a session is read from
+    the database when a request starts and written back by save(), as
+    compact JSON. Several stores (chat, calls) can share one file; rows are
+    keyed by store name and session id, and the index_key value is an
+    indexed column.
+
+    Sizes are the serialized lengths. The entry and byte limits are enforced
+    by sweep() rather than on every write. Two requests for the same session
+    at the same time each work on their own copy, and the last save wins.
+    """
+
+    backend = 'sqlite'
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            store TEXT NOT NULL,
+            session_id TEXT NOT NULL,
+            last_used REAL NOT NULL,
+            size INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            lookup TEXT,
+            finished_at REAL,
+            PRIMARY KEY (store, session_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_sessions_last_used ON sessions(store, last_used);
+    """
+
+    INDEXES = """
+        CREATE INDEX IF NOT EXISTS idx_sessions_lookup ON sessions(store, lookup);
+        CREATE INDEX IF NOT EXISTS idx_sessions_finished ON sessions(store, finished_at);
+    """
+
+    def __init__(self, db_path: str = 'sessions.db', name: str = 'sessions', max_entries: int = 10000,
+                 idle_ttl: float = 1800.0, max_bytes: int = 0, index_key: Optional[str] = None,
+                 retention: float = 3600.0, archive: Optional[Callable[[str, Dict], None]] = None):
+        super().__init__(name, max_entries, idle_ttl, max_bytes, index_key, retention, archive)
+        self.db_path = db_path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(self.SCHEMA)
+        # Session databases created before lookups and retention
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+        for column, kind in (('lookup', 'TEXT'), ('finished_at', 'REAL')):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE sessions ADD COLUMN {column} {kind}")
+        conn.executescript(self.INDEXES)
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite3 connections aren't shareable)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self):
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+
+    def _live(self, session_id: str, data: str, last_used: float, touch: bool) -> Optional[Dict]:
+        """Decode a fetched row, or drop it if it has expired; optionally mark it used"""
+        conn = self._conn()
+        now = time.time()
+        if now - last_used > self.idle_ttl:
+            # Unless another worker has just refreshed it; finished sessions
+            # are left for sweep() to archive
+            deleted = conn.execute(
+                "DELETE FROM sessions WHERE store = ? AND session_id = ? AND last_used = ? "
+                "AND finished_at IS NULL",
+                (self.name, session_id, last_used)
+            ).rowcount
+            self.expired += deleted
+            return None
+        if touch:
+            conn.execute("UPDATE sessions SET last_used = ? WHERE store = ? AND session_id = ?",
+                         (now, self.name, session_id))
+        return json.loads(data)
+
+    def _load(self, session_id: str, touch: bool) -> Optional[Dict]:
+        """The live session for an id, optionally marking it used; None if missing or expired"""
+        row = self._conn().execute(
+            "SELECT data, last_used FROM sessions WHERE store = ? AND session_id = ?",
+            (self.name, session_id)
+        ).fetchone()
+        return None if row is None else self._live(session_id, row[0], row[1], touch)
+
+    def get(self, session_id: str, default: Any = None) -> Any:
+        session = self._load(session_id, touch=True)
+        return default if session is None else session
+
+    def get_or_create(self, session_id: str, factory: Callable[[], Dict]) -> Dict:
+        # Not marked used here: the caller saves it when the request is done
+        session = self._load(session_id, touch=False)
+        return factory() if session is None else session
+
+    def find(self, value: Any) -> Tuple[Optional[str], Optional[Dict]]:
+        # Not marked used: a caller that changes the session saves it
+        row = self._conn().execute(
+            "SELECT session_id, data, last_used FROM sessions WHERE store = ? AND lookup = ? "
+            "ORDER BY last_used DESC LIMIT 1",
+            (self.name, str(value))
+        ).fetchone()
+        if row is None:
+            return None, None
+        session = self._live(row[0], row[1], row[2], touch=False)
+        return (row[0], session) if session is not None else (None, None)
+
+    def save(self, session_id: str, session: Dict, finish: bool = False):
+        """Write a session back as JSON, marking it used"""
+        data = json.dumps(session, separators=(',', ':'))
+        now = time.time()
+        finished_at = now if finish else None
+        row = (now, len(data), data, self._lookup_value(session), finished_at, self.name, session_id)
+        conn = self._conn()
+        updated = conn.execute(
+            "UPDATE sessions SET last_used = ?, size = ?, data = ?, lookup = ?, "
+            "finished_at = COALESCE(finished_at, ?) WHERE store = ? AND session_id = ?", row
+        ).rowcount
+        if not updated:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (last_used, size, data, lookup, finished_at, store, session_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                row
+            )
+            self.created += 1
+
+    def finish(self, session_id: str, session: Dict):
+        self.save(session_id, session, finish=True)
+
+    def pop(self, session_id: str, default: Any = None) -> Any:
+        session = self._load(session_id, touch=False)
+        self._conn().execute("DELETE FROM sessions WHERE store = ? AND session_id = ?", (self.name, session_id))
+        return default if session is None else session
+
+    def __len__(self) -> int:
+        cutoff = time.time() - self.idle_ttl
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM sessions WHERE store = ? AND last_used >= ?", (self.name, cutoff)
+        ).fetchone()[0]
+
+    def items(self) -> List[Tuple[str, Dict]]:
+        cutoff = time.time() - self.idle_ttl
+        rows = self._conn().execute(
+            "SELECT session_id, data FROM sessions WHERE store = ? AND last_used >= ? ORDER BY last_used",
+            (self.name, cutoff)
+        )
+        return [(session_id, json.loads(data)) for session_id, data in rows]
+
+    def sweep(self) -> int:
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Archived inside the transaction: a failed write leaves the rows for the next sweep
+            retired = []
+            retained = self._delete(conn, retired, "finished_at < ?", (now - self.retention,))
+            expired = self._delete(conn, retired, "last_used < ?", (now - self.idle_ttl,))
+            count = conn.execute("SELECT COUNT(*) FROM sessions WHERE store = ?", (self.name,)).fetchone()[0]
+            evicted = 0
+            if count > self.max_entries:
+                evicted += self._delete(
+                    conn, retired,
+                    "session_id IN (SELECT session_id FROM sessions WHERE store = ? ORDER BY last_used LIMIT ?)",
+                    (self.name, count - self.max_entries)
+                )
+            if self.max_bytes:
+                # Keep the most recently used sessions that fit in max_bytes
+                evicted += self._delete(
+                    conn, retired,
+                    "session_id IN (SELECT session_id FROM (SELECT session_id, SUM(size) OVER "
+                    "(ORDER BY last_used DESC, session_id) AS kept FROM sessions WHERE store = ?) WHERE kept > ?)",
+                    (self.name, self.max_bytes)
+                )
+            self._archive(retired)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self.expired += expired
+        self.evicted += evicted
+        self.sweeps += 1
+        return retained + expired + evicted
+
+    def _delete(self, conn: sqlite3.Connection, retired: List[Tuple[str, Dict]], condition: str, params: Tuple) -> int:
+        """Delete this store's rows matching condition, adding the finished ones to retired; returns the count"""
+        retired += [(session_id, json.loads(data)) for session_id, data in conn.execute(
+            f"SELECT session_id, data FROM sessions WHERE store = ? AND finished_at IS NOT NULL AND {condition}",
+            (self.name, *params)
+        )]
+        return conn.execute(f"DELETE FROM sessions WHERE store = ? AND {condition}", (self.name, *params)).rowcount
+
+    def _size(self) -> Tuple[int, int]:
+        count, size = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM sessions WHERE store = ?", (self.name,)
+        ).fetchone()
+        return count, size
+
+
+def create_session_store(name: str, max_entries: int = 10000, idle_ttl: float = 1800.0,
+                         max_bytes: int = 0, **options) -> SessionStore:
+    """
+    Build the session backend selected by SESSION_STORAGE ('memory' or 'sqlite')
+
+    Use 'sqlite' when running several worker processes. The database path
+    comes from SESSION_DB_PATH (default: sessions.db) and is shared by every
+    store and worker. Other options (index_key, retention, archive) are
+    passed through to the store.
+    """
+    backend = os.getenv('SESSION_STORAGE', 'memory').lower()
+    if backend == 'sqlite':
+        return SQLiteSessionStore(os.getenv('SESSION_DB_PATH', 'sessions.db'), name,
+                                  max_entries, idle_ttl, max_bytes, **options)
+    if backend != 'memory':
+        raise ValueError(f"Unknown SESSION_STORAGE backend: {backend}")
+    return MemorySessionStore(name, max_entries, idle_ttl, max_bytes, **options)
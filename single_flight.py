@@ -0,0 +1,69 @@
+"""
+Single Flight
+Concurrent identical calls share one execution and its result
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one
+
+    The first do(key, fn) runs fn; any do() with that key arriving before
+    it finishes waits for it and gets the same return value (or the same
+    exception) instead of running fn again. Nothing is remembered after
+    the call completes, so this is not a cache; callers that want reuse
+    put a cache in front of it.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def stats(self) -> Dict:
+        """Upstream calls made and calls that joined one already running"""
+        return {
+            'calls': self.calls,
+            'shared': self.shared,
+            'in_flight': len(self._flights),
+        }
@@ -0,0 +1,532 @@
+"""
+Hotel Data Storage Backends
+JSON snapshot + journal for development, SQLite for production-sized booking histories
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from itertools import islice
+from typing import Dict, List, Optional
+
+from booking_journal import BookingJournal, write_snapshot
+
+CATALOG_SECTIONS = ('hotel_info', 'policies', 'amenities', 'faqs')
+
+
+def normalize_phone(phone: Optional[str]) -> str:
+    """Digits only, so '555-123-4567' and '(555) 123 4567' look up the same guest"""
+    return ''.join(ch for ch in (phone or '') if ch.isdigit())
+
+
+def normalize_email(email: Optional[str]) -> str:
+    """Lowercased address, or '' for placeholders like 'Not provided'"""
+    email = (email or '').strip().lower()
+    return email if '@' in email else ''
+
+
+class HotelStorage:
+    """
+    Interface every storage backend implements
+
+    The catalog (hotel_info, rooms, policies, amenities, faqs) is small and is
+    handed to HotelAgent as a dict. Bookings stay behind the backend and are
+    reached through the lookup methods, so a backend never has to hold the
+    full booking history in memory.
+    """
+
+    # Whether several worker processes can book through the same store
+    multi_process = False
+
+    def load(self) -> Dict:
+        """Return the catalog dict (hotel_info, rooms, policies, amenities, faqs)"""
+        raise NotImplementedError
+
+    def save(self):
+        """Flush everything to durable storage"""
+
+    def close(self):
+        """Release files/connections"""
+
+    def get_booking(self, booking_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def list_bookings(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """Bookings in creation order (the last `limit` when offset is 0)"""
+        raise NotImplementedError
+
+    def bookings_since(self, check_out: str) -> List[Dict]:
+        """Bookings whose check-out is on/after a date (YYYY-MM-DD), i.e. still holding nights"""
+        raise NotImplementedError
+
+    def find_bookings(self, phone: Optional[str] = None, email: Optional[str] = None) -> List[Dict]:
+        """Bookings made with a guest phone number and/or email address"""
+        raise NotImplementedError
+
+    def booking_count(self) -> int:
+        raise NotImplementedError
+
+    def add_booking(self, booking: Dict) -> bool:
+        """
+        Store a new booking
+
+        Returns:
+            False, storing nothing, if a stored booking already holds the
+            same room for any of those nights
+        """
+        raise NotImplementedError
+
+    def remove_booking(self, booking_id: str) -> Optional[Dict]:
+        """Delete a booking; returns it, or None if it doesn't exist"""
+        raise NotImplementedError
+
+    def update_room(self, room: Dict, changes: Dict):
+        """Persist changes already applied to an in-memory room dict"""
+        raise NotImplementedError
+
+    def next_booking_number(self) -> int:
+        """Reserve and return the next booking number (never reused)"""
+        raise NotImplementedError
+
+    def booking_version(self) -> Optional[int]:
+        """Counter bumped by every booking added or removed by any process; None if only this process writes"""
+        return None
+
+    def replace_catalog(self, sections: Dict):
+        """Persist new versions of whole catalog sections (e.g. after a hot reload)"""
+        raise NotImplementedError
+
+
+class JSONStorage(HotelStorage):
+    """
+    hotel_data.json snapshot plus an append-only journal of changes
+
+    Everything lives in memory, which is fine for development and small
+    properties. Bookings are kept in an insertion-ordered dict keyed by
+    booking id, with side indexes by guest phone and email, so lookups and
+    cancellations are constant time; the list form only exists in the
+    snapshot. See BookingJournal for the durability model.
+    """
+
+    def __init__(self, data_file: str = 'hotel_data.json', compact_every: int = 500):
+        self.data_file = data_file
+        self.compact_every = compact_every
+        self.journal = BookingJournal(os.path.splitext(data_file)[0] + '.journal')
+        self._lock = threading.RLock()
+        self.data: Dict = {}
+        self._bookings: Dict[str, Dict] = {}
+        self._by_phone: Dict[str, Dict[str, Dict]] = {}
+        self._by_email: Dict[str, Dict[str, Dict]] = {}
+        self._written_signature = None  # (mtime, size) of our last snapshot
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.data_file)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def load(self) -> Dict:
+        """Load the snapshot and replay any journaled changes on top"""
+        with self._lock:
+            with open(self.data_file, 'r') as f:
+                self.data = json.load(f)
+
+            self._bookings = {}
+            self._by_phone = {}
+            self._by_email = {}
+            for booking in self.data.pop('bookings', []):
+                self._index(booking)
+
+            for op, record in self.journal.replay(after_seq=self.data.get('journal_seq', 0)):
+                self._apply(op, record)
+
+            highest = self.data.get('last_booking_number', 0)
+            for booking_id in self._bookings:
+                suffix = booking_id[2:]
+                if suffix.isdigit():
+                    highest = max(highest, int(suffix))
+            self.data['last_booking_number'] = highest
+
+            self._written_signature = self._file_signature()
+            if self.journal.pending:
+                self.save()
+            return self.data
+
+    def save(self):
+        """Write a full snapshot of the hotel data and compact the journal"""
+        with self._lock:
+            if self._file_signature() != self._written_signature:
+                self._keep_external_catalog_edits()
+            self.data['journal_seq'] = self.journal.seq
+            write_snapshot(self.data_file, {**self.data, 'bookings': list(self._bookings.values())})
+            self._written_signature = self._file_signature()
+            self.journal.reset()
+
+    def _keep_external_catalog_edits(self):
+        """The data file was edited since our last snapshot; don't overwrite its catalog"""
+        try:
+            with open(self.data_file, 'r') as f:
+                on_disk = json.load(f)
+        except (OSError, ValueError):
+            return
+        for section in CATALOG_SECTIONS + ('rooms',):
+            if section in on_disk:
+                self.data[section] = on_disk[section]
+
+    def close(self):
+        self.journal.close()
+
+    def _record(self, op: str, record: Dict):
+        """Journal a change, compacting into a snapshot every `compact_every` records"""
+        self.journal.append(op, record)
+        if self.journal.pending >= self.compact_every:
+            self.save()
+
+    def _apply(self, op: str, record: Dict):
+        """Apply a journaled change to the in-memory data"""
+        if op == 'add_booking':
+            self._index(record)
+            suffix = record['booking_id'][2:]
+            if suffix.isdigit():
+                self.data['last_booking_number'] = max(self.data.get('last_booking_number', 0), int(suffix))
+        elif op == 'remove_booking':
+            self._unindex(record['booking_id'])
+        elif op == 'update_room':
+            room = next((r for r in self.data['rooms'] if r['id'] == record['id']), None)
+            if room:
+                room.update(record)
+            else:
+                self.data['rooms'].append(record)
+
+    def _index(self, booking: Dict):
+        """Add a booking to the id/phone/email indexes"""
+        booking_id = booking['booking_id']
+        self._unindex(booking_id)
+        self._bookings[booking_id] = booking
+        phone = normalize_phone(booking.get('guest_phone'))
+        if phone:
+            self._by_phone.setdefault(phone, {})[booking_id] = booking
+        email = normalize_email(booking.get('guest_email'))
+        if email:
+            self._by_email.setdefault(email, {})[booking_id] = booking
+
+    def _unindex(self, booking_id: str) -> Optional[Dict]:
+        """Drop a booking from every index; returns it if it was present"""
+        booking = self._bookings.pop(booking_id, None)
+        if booking is None:
+            return None
+        for index, key in ((self._by_phone, normalize_phone(booking.get('guest_phone'))),
+                           (self._by_email, normalize_email(booking.get('guest_email')))):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.pop(booking_id, None)
+                if not bucket:
+                    del index[key]
+        return booking
+
+    def get_booking(self, booking_id: str) -> Optional[Dict]:
+        return self._bookings.get(booking_id)
+
+    def list_bookings(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        with self._lock:
+            if limit is None and not offset:
+                return list(self._bookings.values())
+            newest_first = islice(reversed(self._bookings.values()), offset,
+                                  None if limit is None else offset + limit)
+            return list(newest_first)[::-1]
+
+    def bookings_since(self, check_out: str) -> List[Dict]:
+        return [b for b in self._bookings.values() if str(b.get('check_out')) >= check_out]
+
+    def find_bookings(self, phone: Optional[str] = None, email: Optional[str] = None) -> List[Dict]:
+        with self._lock:
+            matches = dict(self._by_phone.get(normalize_phone(phone), {}))
+            matches.update(self._by_email.get(normalize_email(email), {}))
+            return sorted(matches.values(), key=lambda b: b.get('created_at', ''))
+
+    def booking_count(self) -> int:
+        return len(self._bookings)
+
+    def add_booking(self, booking: Dict) -> bool:
+        # Single process: HotelAgent's calendar has already checked the nights
+        with self._lock:
+            self._index(booking)
+            self._record('add_booking', booking)
+        return True
+
+    def remove_booking(self, booking_id: str) -> Optional[Dict]:
+        with self._lock:
+            booking = self._unindex(booking_id)
+            if booking:
+                self._record('remove_booking', {'booking_id': booking_id})
+            return booking
+
+    def update_room(self, room: Dict, changes: Dict):
+        with self._lock:
+            self._record('update_room', {'id': room['id'], **changes})
+
+    def next_booking_number(self) -> int:
+        with self._lock:
+            self.data['last_booking_number'] += 1
+            return self.data['last_booking_number']
+
+    def replace_catalog(self, sections: Dict):
+        # The catalog dict is shared with HotelAgent, so swapping each section
+        # reference is the whole update; the next snapshot persists it
+        with self._lock:
+            self.data.update(sections)
+            self.save()
+
+
+class SQLiteStorage(HotelStorage):
+    """
+    SQLite database in WAL mode
+
+    Bookings are indexed by id, room, stay dates and guest phone/email, and
+    only the bookings still holding nights are ever pulled into memory. On
+    first use the database is seeded from the JSON data file.
+
+    Several worker processes can share the database: booking numbers come
+    from one counter, add_booking() refuses a room already held for any of
+    the nights inside the same transaction that inserts, and
+    booking_version() tells each worker when its calendar is out of date.
+    """
+
+    multi_process = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS catalog (section TEXT PRIMARY KEY, data TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS rooms (
+            id TEXT PRIMARY KEY,
+            position INTEGER NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS bookings (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            booking_id TEXT NOT NULL UNIQUE,
+            room_id TEXT,
+            check_in TEXT,
+            check_out TEXT,
+            guest_phone TEXT,
+            guest_email TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_bookings_room ON bookings(room_id);
+        CREATE INDEX IF NOT EXISTS idx_bookings_check_in ON bookings(check_in);
+        CREATE INDEX IF NOT EXISTS idx_bookings_check_out ON bookings(check_out);
+        CREATE INDEX IF NOT EXISTS idx_bookings_phone ON bookings(guest_phone);
+        CREATE INDEX IF NOT EXISTS idx_bookings_email ON bookings(guest_email);
+    """
+
+    def __init__(self, db_path: str = 'hotel_data.db', seed_file: Optional[str] = 'hotel_data.json'):
+        self.db_path = db_path
+        self.seed_file = seed_file
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(self.SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite3 connections aren't shareable)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def load(self) -> Dict:
+        conn = self._conn()
+        if conn.execute("SELECT COUNT(*) FROM rooms").fetchone()[0] == 0 and self.seed_file:
+            self._seed()
+
+        data = {section: json.loads(value) for section, value in conn.execute("SELECT section, data FROM catalog")}
+        data['rooms'] = [json.loads(row[0]) for row in conn.execute("SELECT data FROM rooms ORDER BY position")]
+        return data
+
+    def _seed(self):
+        """Import catalog and bookings from the JSON data file"""
+        with open(self.seed_file, 'r') as f:
+            seed = json.load(f)
+
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for section in CATALOG_SECTIONS:
+                if section in seed:
+                    conn.execute("INSERT OR REPLACE INTO catalog VALUES (?, ?)", (section, json.dumps(seed[section])))
+            for position, room in enumerate(seed.get('rooms', [])):
+                conn.execute("INSERT OR REPLACE INTO rooms VALUES (?, ?, ?)", (room['id'], position, json.dumps(room)))
+
+            highest = seed.get('last_booking_number', 0)
+            for booking in seed.get('bookings', []):
+                self._insert_booking(conn, booking)
+                suffix = booking['booking_id'][2:]
+                if suffix.isdigit():
+                    highest = max(highest, int(suffix))
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('last_booking_number', ?)", (str(highest),))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        print(f"Seeded {self.db_path} from {self.seed_file}")
+
+    @staticmethod
+    def _insert_booking(conn: sqlite3.Connection, booking: Dict):
+        conn.execute(
+            "INSERT OR REPLACE INTO bookings "
+            "(booking_id, room_id, check_in, check_out, guest_phone, guest_email, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                booking['booking_id'], booking.get('room_id'),
+                booking.get('check_in'), booking.get('check_out'),
+                normalize_phone(booking.get('guest_phone')) or None,
+                normalize_email(booking.get('guest_email')) or None,
+                json.dumps(booking),
+            )
+        )
+
+    def close(self):
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+
+    def get_booking(self, booking_id: str) -> Optional[Dict]:
+        row = self._conn().execute("SELECT data FROM bookings WHERE booking_id = ?", (booking_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list_bookings(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        rows = self._conn().execute(
+            "SELECT data FROM bookings ORDER BY seq DESC LIMIT ? OFFSET ?",
+            (-1 if limit is None else limit, offset)
+        ).fetchall()
+        return [json.loads(row[0]) for row in reversed(rows)]
+
+    def bookings_since(self, check_out: str) -> List[Dict]:
+        rows = self._conn().execute(
+            "SELECT data FROM bookings WHERE check_out >= ? ORDER BY seq", (check_out,)
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def find_bookings(self, phone: Optional[str] = None, email: Optional[str] = None) -> List[Dict]:
+        rows = self._conn().execute(
+            "SELECT data FROM bookings WHERE guest_phone = ? OR guest_email = ? ORDER BY seq",
+            (normalize_phone(phone) or None, normalize_email(email) or None)
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def booking_count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM bookings").fetchone()[0]
+
+    def add_booking(self, booking: Dict) -> bool:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another worker may have taken the room since our calendar was built.
+            # Only our own rooms are held per night; Amadeus offers carry a
+            # truncated offer id as room_id, which unrelated offers can share.
+            conflict = None
+            if booking.get('source') != 'amadeus':
+                conflict = conn.execute(
+                    "SELECT 1 FROM bookings WHERE room_id = ? AND check_in < ? AND check_out > ? "
+                    "AND room_id IN (SELECT id FROM rooms) LIMIT 1",
+                    (booking.get('room_id'), booking.get('check_out'), booking.get('check_in'))
+                ).fetchone()
+            if conflict is None:
+                self._insert_booking(conn, booking)
+                self._bump_booking_version(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return conflict is None
+
+    def remove_booking(self, booking_id: str) -> Optional[Dict]:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT data FROM bookings WHERE booking_id = ?", (booking_id,)).fetchone()
+            if row:
+                conn.execute("DELETE FROM bookings WHERE booking_id = ?", (booking_id,))
+                self._bump_booking_version(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return json.loads(row[0]) if row else None
+
+    def update_room(self, room: Dict, changes: Dict):
+        conn = self._conn()
+        position = conn.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM rooms").fetchone()[0]
+        conn.execute(
+            "INSERT INTO rooms (id, position, data) VALUES (?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET data = excluded.data",
+            (room['id'], position, json.dumps(room))
+        )
+
+    def next_booking_number(self) -> int:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO meta VALUES ('last_booking_number', '1') "
+                "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+            )
+            number = int(conn.execute("SELECT value FROM meta WHERE key = 'last_booking_number'").fetchone()[0])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return number
+
+    @staticmethod
+    def _bump_booking_version(conn: sqlite3.Connection):
+        conn.execute(
+            "INSERT INTO meta VALUES ('booking_version', '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+
+    def booking_version(self) -> Optional[int]:
+        row = self._conn().execute("SELECT value FROM meta WHERE key = 'booking_version'").fetchone()
+        return int(row[0]) if row else 0
+
+    def replace_catalog(self, sections: Dict):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for section, value in sections.items():
+                if section == 'rooms':
+                    conn.execute("DELETE FROM rooms")
+                    for position, room in enumerate(value):
+                        conn.execute("INSERT INTO rooms VALUES (?, ?, ?)", (room['id'], position, json.dumps(room)))
+                elif section in CATALOG_SECTIONS:
+                    conn.execute("INSERT OR REPLACE INTO catalog VALUES (?, ?)", (section, json.dumps(value)))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def create_storage(data_file: str = 'hotel_data.json') -> HotelStorage:
+    """
+    Build the storage backend selected by HOTEL_STORAGE ('json' or 'sqlite')
+
+    The SQLite database path comes from HOTEL_DB_PATH (default: hotel_data.db)
+    and is seeded from data_file the first time it is opened.
+    """
+    backend = os.getenv('HOTEL_STORAGE', 'json').lower()
+    if backend == 'sqlite':
+        return SQLiteStorage(os.getenv('HOTEL_DB_PATH', 'hotel_data.db'), seed_file=data_file)
+    if backend != 'json':
+        raise ValueError(f"Unknown HOTEL_STORAGE backend: {backend}")
+    return JSONStorage(data_file)
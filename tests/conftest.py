@@ -0,0 +1,45 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Tests import the top-level modules the same way app.py does
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope='session')
+def app_dir(tmp_path_factory):
+    """Scratch working directory holding a copy of hotel_data.json for app.py"""
+    path = tmp_path_factory.mktemp('app')
+    shutil.copy(os.path.join(ROOT, 'hotel_data.json'), path)
+    return path
+
+
+@pytest.fixture(scope='session')
+def loaded_app(app_dir):
+    """app.py on JSON storage and memory sessions, without Amadeus or background threads"""
+    with pytest.MonkeyPatch.context() as patch:
+        patch.chdir(app_dir)
+        for name, value in {
+            'HOTEL_STORAGE': 'json', 'SESSION_STORAGE': 'memory',
+            'HOTEL_DATA_RELOAD_INTERVAL': '0', 'SESSION_SWEEP_INTERVAL': '0',
+            'AMADEUS_API_KEY': '', 'AMADEUS_API_SECRET': '',
+        }.items():
+            patch.setenv(name, value)
+        import app
+    return app
+
+
+@pytest.fixture
+def app_module(loaded_app, app_dir, monkeypatch):
+    # Anything app.py writes (journal, archives) lands in the scratch directory
+    monkeypatch.chdir(app_dir)
+    return loaded_app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
@@ -0,0 +1,137 @@
+import json
+
+import pytest
+
+from booking_journal import BookingJournal, write_snapshot
+from storage import JSONStorage, SQLiteStorage
+
+
+def booking(number, check_in='2026-11-01', check_out='2026-11-03', room_id='101'):
+    return {
+        'booking_id': f'BK{number:04d}',
+        'room_id': room_id,
+        'check_in': check_in,
+        'check_out': check_out,
+        'guest_phone': '704-555-0100',
+        'guest_email': 'guest@example.com',
+    }
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / 'hotel_data.json'
+    write_snapshot(str(path), {'rooms': [{'id': '101', 'type': 'King'}], 'bookings': []})
+    return str(path)
+
+
+def test_replay_discards_torn_last_line(tmp_path):
+    path = tmp_path / 'bookings.journal'
+    journal = BookingJournal(str(path), fsync=False)
+    journal.append('add_booking', booking(1))
+    journal.append('add_booking', booking(2))
+    journal.close()
+    intact_size = path.stat().st_size
+    with open(path, 'ab') as f:
+        f.write(b'{"seq":3,"op":"add_book')
+
+    journal = BookingJournal(str(path), fsync=False)
+    records = list(journal.replay())
+
+    assert [data['booking_id'] for _, data in records] == ['BK0001', 'BK0002']
+    assert journal.seq == 2
+    assert path.stat().st_size == intact_size
+    # Appending after recovery continues the sequence on a clean line
+    assert journal.append('add_booking', booking(3)) == 3
+    journal.close()
+    assert [json.loads(line)['seq'] for line in path.read_text().splitlines()] == [1, 2, 3]
+
+
+def test_replay_skips_records_already_in_snapshot(tmp_path):
+    path = tmp_path / 'bookings.journal'
+    journal = BookingJournal(str(path), fsync=False)
+    for number in (1, 2, 3):
+        journal.append('add_booking', booking(number))
+    journal.close()
+
+    records = list(BookingJournal(str(path), fsync=False).replay(after_seq=2))
+
+    assert [data['booking_id'] for _, data in records] == ['BK0003']
+
+
+def test_storage_recovers_journaled_bookings_after_crash(data_file):
+    storage = JSONStorage(data_file)
+    storage.load()
+    storage.add_booking(booking(1))
+    storage.add_booking(booking(2))
+    storage.remove_booking('BK0001')
+    # Crash: the snapshot was never rewritten, only the journal has the changes
+    storage.journal.close()
+
+    with open(data_file) as f:
+        assert json.load(f)['bookings'] == []
+
+    recovered = JSONStorage(data_file)
+    recovered.load()
+    assert [b['booking_id'] for b in recovered.list_bookings()] == ['BK0002']
+    assert recovered.next_booking_number() == 3
+    recovered.close()
+
+
+def test_compaction_writes_snapshot_and_truncates_journal(data_file):
+    storage = JSONStorage(data_file, compact_every=3)
+    storage.load()
+    storage.add_booking(booking(1))
+    storage.add_booking(booking(2))
+    assert storage.journal.pending == 2
+
+    storage.add_booking(booking(3))
+
+    assert storage.journal.pending == 0
+    with open(storage.journal.path, 'rb') as f:
+        assert f.read() == b''
+    with open(data_file) as f:
+        snapshot = json.load(f)
+    assert [b['booking_id'] for b in snapshot['bookings']] == ['BK0001', 'BK0002', 'BK0003']
+    assert snapshot['journal_seq'] == 3
+    storage.close()
+
+    reloaded = JSONStorage(data_file)
+    reloaded.load()
+    assert reloaded.booking_count() == 3
+    reloaded.close()
+
+
+def test_crash_between_snapshot_and_truncate_applies_nothing_twice(data_file):
+    storage = JSONStorage(data_file)
+    storage.load()
+    storage.add_booking(booking(1))
+    storage.remove_booking('BK0001')
+    storage.add_booking(booking(2))
+    journal_bytes = open(storage.journal.path, 'rb').read()
+    storage.save()
+    storage.close()
+    # Snapshot is on disk but the journal truncation was lost
+    with open(storage.journal.path, 'wb') as f:
+        f.write(journal_bytes)
+
+    reloaded = JSONStorage(data_file)
+    reloaded.load()
+    assert [b['booking_id'] for b in reloaded.list_bookings()] == ['BK0002']
+    reloaded.close()
+
+
+@pytest.mark.parametrize('backend', ['json', 'sqlite'])
+def test_bookings_since(backend, data_file, tmp_path):
+    if backend == 'json':
+        storage = JSONStorage(data_file)
+    else:
+        storage = SQLiteStorage(str(tmp_path / 'hotel_data.db'), seed_file=data_file)
+    storage.load()
+    storage.add_booking(booking(1, '2026-10-01', '2026-10-05'))
+    storage.add_booking(booking(2, '2026-10-05', '2026-10-10'))
+    storage.add_booking(booking(3, '2026-10-12', '2026-10-14'))
+
+    assert sorted(b['booking_id'] for b in storage.bookings_since('2026-10-05')) == ['BK0001', 'BK0002', 'BK0003']
+    assert sorted(b['booking_id'] for b in storage.bookings_since('2026-10-06')) == ['BK0002', 'BK0003']
+    assert storage.bookings_since('2026-10-15') == []
+    storage.close()
@@ -0,0 +1,70 @@
+import json
+
+from catalog_cache import CatalogCache
+
+
+def test_body_is_rebuilt_only_for_a_new_version():
+    cache = CatalogCache()
+    payload = {'rooms': [1, 2]}
+
+    first = cache.get('rooms', 1, lambda: payload)
+    assert json.loads(first.body) == payload
+    assert cache.get('rooms', 1, lambda: {'rooms': 'ignored'}) is first
+    assert cache.builds == 1
+
+    payload['rooms'].append(3)
+    second = cache.get('rooms', 2, lambda: payload)
+    assert cache.builds == 2
+    assert second.etag != first.etag
+
+
+def test_identical_rebuild_keeps_the_etag():
+    cache = CatalogCache()
+    first = cache.get('policies', 1, lambda: {'pets': 'no'})
+    second = cache.get('policies', 2, lambda: {'pets': 'no'})
+
+    assert second.version == 2
+    assert second.etag == first.etag
+
+
+def test_invalidate_forces_a_rebuild():
+    cache = CatalogCache()
+    cache.get('rooms', 1, lambda: {})
+    cache.get('amenities', 1, lambda: {})
+    cache.invalidate('rooms')
+    cache.get('rooms', 1, lambda: {})
+    cache.get('amenities', 1, lambda: {})
+    assert cache.builds == 3
+
+    cache.invalidate()
+    cache.get('amenities', 1, lambda: {})
+    assert cache.builds == 4
+
+
+def test_endpoint_answers_if_none_match_with_304(client):
+    response = client.get('/api/policies')
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert 'must-revalidate' in response.headers['Cache-Control']
+
+    cached = client.get('/api/policies', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.data == b''
+    assert cached.headers['ETag'] == etag
+    assert client.get('/api/policies', headers={'If-None-Match': '"other"'}).status_code == 200
+
+
+def test_catalog_edit_changes_the_etag(client, app_module):
+    agent = app_module.agent
+    original = agent.data['amenities']
+    etag = client.get('/api/amenities').headers['ETag']
+
+    agent.reload_catalog({'amenities': {**original, 'rooftop_bar': 'Open 5pm-11pm'}})
+    try:
+        response = client.get('/api/amenities', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.json['amenities']['rooftop_bar'] == 'Open 5pm-11pm'
+        assert response.headers['ETag'] != etag
+    finally:
+        agent.reload_catalog({'amenities': original})
+    assert client.get('/api/amenities', headers={'If-None-Match': etag}).status_code == 304
@@ -0,0 +1,70 @@
+import threading
+from datetime import date, timedelta
+
+from booking_journal import write_snapshot
+from hotel_agent import HotelAgent
+from storage import JSONStorage
+
+CHECK_IN = (date.today() + timedelta(days=30)).isoformat()
+CHECK_OUT = (date.today() + timedelta(days=32)).isoformat()
+KING = {'id': '101', 'type': 'King', 'capacity': 2, 'price_per_night': 150}
+QUEEN = {'id': '102', 'type': 'Queen', 'capacity': 2, 'price_per_night': 130}
+
+
+def make_agent(tmp_path):
+    data_file = str(tmp_path / 'hotel_data.json')
+    write_snapshot(data_file, {'rooms': [KING, QUEEN], 'bookings': []})
+    return HotelAgent(data_file, storage=JSONStorage(data_file))
+
+
+def booking(booking_id, room_id='101'):
+    return {'booking_id': booking_id, 'room_id': room_id, 'check_in': CHECK_IN, 'check_out': CHECK_OUT}
+
+
+def test_room_removed_and_re_added_keeps_its_stays(tmp_path):
+    agent = make_agent(tmp_path)
+    assert agent.add_booking(booking('BK0001'))
+
+    assert agent.reload_catalog({'rooms': [QUEEN]}) == ['rooms']
+    assert agent.find_available_rooms(CHECK_IN, CHECK_OUT) == [QUEEN]
+    agent.reload_catalog({'rooms': [KING, QUEEN]})
+
+    assert not agent.is_room_available('101', CHECK_IN, CHECK_OUT)
+    assert not agent.add_booking(booking('BK0002'))
+    assert agent.find_available_rooms(CHECK_IN, CHECK_OUT) == [QUEEN]
+
+
+def test_lookups_during_reloads_see_one_catalog(tmp_path):
+    agent = make_agent(tmp_path)
+    errors = []
+    stop = threading.Event()
+
+    def search():
+        while not stop.is_set():
+            try:
+                for room in agent.find_available_rooms(CHECK_IN, CHECK_OUT, room_type='king'):
+                    assert room['id'] == '101'
+            except Exception as e:
+                errors.append(e)
+                return
+
+    reader = threading.Thread(target=search)
+    reader.start()
+    for _ in range(200):
+        agent.reload_catalog({'rooms': [QUEEN]})
+        agent.reload_catalog({'rooms': [KING, QUEEN]})
+    stop.set()
+    reader.join()
+    assert errors == []
+
+
+def test_room_type_indexes_follow_room_edits(tmp_path):
+    agent = make_agent(tmp_path)
+    assert agent.room_types() == ['King', 'Queen']
+    assert [room['id'] for room in agent.find_available_rooms(CHECK_IN, CHECK_OUT, room_type='king')] == ['101']
+
+    agent.update_room('102', type='Executive King')
+    assert agent.room_types() == ['King', 'Executive King']
+    assert agent.rooms_of_type('executive king') == [agent.get_room('102')]
+    assert [room['id'] for room in agent.find_available_rooms(CHECK_IN, CHECK_OUT, room_type='king')] == ['101', '102']
+    assert agent.find_available_rooms(CHECK_IN, CHECK_OUT, room_type='queen') == []
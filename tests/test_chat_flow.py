@@ -0,0 +1,111 @@
+import os
+import shutil
+from types import SimpleNamespace
+
+import pytest
+
+from chat_flow import BookingFlow, ChatStatus, State, StateMachine
+from hotel_agent import HotelAgent
+from storage import JSONStorage
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NO_AMADEUS = SimpleNamespace(is_configured=lambda: False)
+
+
+@pytest.fixture
+def flow(tmp_path):
+    data_file = str(tmp_path / 'hotel_data.json')
+    shutil.copy(os.path.join(ROOT, 'hotel_data.json'), data_file)
+    agent = HotelAgent(data_file, storage=JSONStorage(data_file))
+    yield BookingFlow(agent, lambda: NO_AMADEUS)
+    agent.storage.close()
+
+
+def new_session():
+    return {'step': None, 'booking_data': {}}
+
+
+def say(flow, session, message):
+    return ''.join(part for part in flow.replies(session, message) if not isinstance(part, ChatStatus))
+
+
+def test_menu_booking_walks_through_every_step(flow):
+    session = new_session()
+    say(flow, session, '2')
+    assert session['step'] == 'awaiting_guests_dates'
+
+    reply = say(flow, session, '2 guests, dec 20 to dec 22')
+    assert session['step'] == 'awaiting_room_selection'
+    assert 'King Guest Room' in reply
+
+    say(flow, session, 'king')
+    assert session['step'] == 'awaiting_contact_details'
+
+    reply = say(flow, session, 'Jane Doe, 704-555-0100')
+    assert 'RESERVATION CONFIRMED' in reply
+    assert session == new_session()
+    booking = flow.agent.list_bookings()[-1]
+    assert (booking['guest_name'], booking['room_type']) == ('Jane Doe', 'King Guest Room')
+    assert booking['check_in'].endswith('-12-20') and booking['check_out'].endswith('-12-22')
+
+
+def test_name_step_books_the_quoted_stay(flow):
+    session = new_session()
+    reply = say(flow, session, 'I want to book a king room dec 20 to dec 22')
+    assert session['step'] == 'awaiting_name'
+    assert '-12-20 to ' in reply
+
+    say(flow, session, 'jane doe')
+    booking = flow.agent.list_bookings()[-1]
+    assert booking['guest_name'] == 'Jane Doe'
+    assert booking['check_in'].endswith('-12-20') and booking['check_out'].endswith('-12-22')
+    assert session['step'] is None
+
+
+def test_name_step_falls_back_to_idle_for_other_messages(flow):
+    session = new_session()
+    say(flow, session, 'I want to book a king room dec 20 to dec 22')
+    bookings = flow.agent.storage.booking_count()
+
+    reply = say(flow, session, 'what are your policies?')
+    assert 'Check-in' in reply or 'check-in' in reply
+    assert flow.agent.storage.booking_count() == bookings
+
+
+def test_booking_without_dates_asks_for_them(flow):
+    session = new_session()
+    bookings = flow.agent.storage.booking_count()
+
+    reply = say(flow, session, 'I want to book a king room, my name is John Smith')
+    assert 'check-in and check-out dates' in reply
+    assert session['step'] == 'awaiting_guests_dates'
+    assert flow.agent.storage.booking_count() == bookings
+
+
+def test_undeclared_transition_is_refused():
+    def handler(turn):
+        turn.goto('elsewhere')
+        yield 'moved'
+
+    machine = StateMachine({None: State(handler), 'elsewhere': State(handler)})
+    with pytest.raises(ValueError, match='No transition from idle to elsewhere'):
+        list(machine.run(new_session(), 'hello'))
+
+
+def test_unrecognized_message_goes_to_the_fallback_state():
+    def picky(turn):
+        if turn.message != 'yes':
+            return False
+        yield 'picky'
+
+    def idle(turn):
+        yield 'idle'
+
+    timings = []
+    machine = StateMachine({None: State(idle), 'asking': State(picky, fallback=None)})
+    machine.add_timing_hook(lambda stage, seconds: timings.append(stage))
+    session = {'step': 'asking', 'booking_data': {}}
+
+    assert list(machine.run(session, 'yes')) == ['picky']
+    assert list(machine.run(session, 'hello')) == ['idle']
+    assert timings == ['asking', 'asking', 'idle']
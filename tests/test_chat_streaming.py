@@ -0,0 +1,58 @@
+import json
+
+from chat_flow import ChatStatus
+
+
+def parse_events(body):
+    """(event, payload) for each SSE frame"""
+    events = []
+    for frame in body.strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in frame.split('\n'))
+        events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+
+def test_streamed_reply_matches_the_json_reply(client):
+    plain = client.post('/api/chat', json={'message': 'what amenities do you have', 'session_id': 'plain'})
+    streamed = client.post('/api/chat', json={'message': 'what amenities do you have', 'session_id': 'streamed',
+                                               'stream': True})
+
+    assert streamed.mimetype == 'text/event-stream'
+    assert streamed.headers['Cache-Control'] == 'no-cache'
+    events = parse_events(streamed.get_data(as_text=True))
+    assert events[-1] == ('done', {'success': True})
+    assert {event for event, _ in events[:-1]} == {'chunk'}
+    assert ''.join(payload['text'] for _, payload in events[:-1]) == plain.json['message']
+
+
+def test_booking_steps_arrive_as_separate_chunks(client):
+    client.post('/api/chat', json={'message': '2', 'session_id': 'steps'})
+    response = client.post('/api/chat', json={'message': '2 guests, dec 20 to dec 22', 'session_id': 'steps',
+                                              'stream': True})
+
+    events = parse_events(response.get_data(as_text=True))
+    chunks = [payload['text'] for event, payload in events if event == 'chunk']
+    assert len(chunks) > 2
+    assert chunks[0].startswith('Perfect! For **2 guest(s)** staying **2 night(s)**')
+    assert events[-1][0] == 'done'
+
+
+def test_progress_notes_and_failures_have_their_own_events(app_module):
+    def replies():
+        yield ChatStatus('Checking live availability...')
+        yield 'First part'
+        raise RuntimeError('upstream went away')
+
+    events = parse_events(''.join(app_module.stream_chat_events(replies())))
+
+    assert events == [
+        ('status', {'text': 'Checking live availability...'}),
+        ('chunk', {'text': 'First part'}),
+        ('error', {'success': False, 'error': 'upstream went away'}),
+    ]
+
+
+def test_empty_message_is_rejected_before_streaming(client):
+    response = client.post('/api/chat', json={'message': '', 'stream': True})
+    assert response.status_code == 400
+    assert response.json['success'] is False
@@ -0,0 +1,33 @@
+from datetime import date
+
+import pytest
+
+from date_parser import parse_date_range, parse_natural_date
+
+SATURDAY = date(2026, 10, 17)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('fri to sun', ('2026-10-23', '2026-10-25')),
+    ('sat - mon', ('2026-10-17', '2026-10-19')),
+    ('next fri through sun', ('2026-10-23', '2026-10-25')),
+    ('this sat', ('2026-10-17', None)),
+    ('next sun', ('2026-10-18', None)),
+    ('friday to sunday', ('2026-10-23', '2026-10-25')),
+])
+def test_weekday_abbreviations(text, expected):
+    assert parse_date_range(text, SATURDAY) == expected
+
+
+@pytest.mark.parametrize('text', ['i sat by the pool', 'is the sun deck open', 'i may 2 people', 'june 3 guests'])
+def test_words_that_are_not_dates(text):
+    assert parse_natural_date(text, SATURDAY) is None
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('may 2', '2027-05-02'),
+    ('may 2nd for 2 people', '2027-05-02'),
+    ('the 2nd of may', '2027-05-02'),
+])
+def test_may_next_to_a_day_is_a_month(text, expected):
+    assert parse_natural_date(text, SATURDAY) == expected
@@ -0,0 +1,123 @@
+import json
+import threading
+
+import pytest
+
+import hotel_directory
+from hotel_directory import HotelDirectory
+
+HOTEL = {'hotelId': 'HLCLT123', 'name': 'Test Hotel'}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(hotel_directory, 'time', clock)
+    return clock
+
+
+class Fetcher:
+    """Counts calls and returns (or raises) whatever `result` is set to"""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+def wait_for_refresh(directory, key):
+    for thread in threading.enumerate():
+        if thread.name == 'hotel-directory-refresh':
+            thread.join(5)
+    assert key not in directory._refreshing
+
+
+def test_record_is_fetched_once_and_kept_on_disk(tmp_path, clock):
+    path = str(tmp_path / 'directory.json')
+    fetch = Fetcher(HOTEL)
+    directory = HotelDirectory(path, ttl=100)
+
+    assert directory.resolve('CLT', fetch) == HOTEL
+    assert directory.resolve('CLT', fetch) == HOTEL
+    assert fetch.calls == 1
+    with open(path) as f:
+        assert json.load(f)['CLT']['hotel'] == HOTEL
+
+    restarted = HotelDirectory(path, ttl=100)
+    assert restarted.resolve('CLT', fetch) == HOTEL
+    assert fetch.calls == 1
+    assert restarted.stats()['hits'] == 1
+
+
+def test_stale_record_is_served_while_one_refresh_runs(tmp_path, clock):
+    directory = HotelDirectory(str(tmp_path / 'directory.json'), ttl=100)
+    directory.resolve('CLT', Fetcher(HOTEL))
+    clock.now += 101
+
+    release = threading.Event()
+    moved = {'hotelId': 'HLCLT456', 'name': 'Test Hotel'}
+
+    def slow_fetch():
+        release.wait(5)
+        return moved
+
+    assert directory.resolve('CLT', slow_fetch) == HOTEL
+    assert directory.resolve('CLT', slow_fetch) == HOTEL
+    release.set()
+    wait_for_refresh(directory, 'CLT')
+    assert directory.fetches == 2  # the first fetch plus one refresh
+
+    assert directory.resolve('CLT', Fetcher(None)) == moved
+    assert directory.stats()['stale_hits'] == 2
+
+
+def test_missing_hotel_is_remembered_for_miss_ttl(tmp_path, clock):
+    directory = HotelDirectory(str(tmp_path / 'directory.json'), ttl=100, miss_ttl=10)
+    fetch = Fetcher(None)
+
+    assert directory.resolve('CLT', fetch) is None
+    clock.now += 9
+    assert directory.resolve('CLT', fetch) is None
+    assert fetch.calls == 1
+
+    clock.now += 2
+    fetch.result = HOTEL
+    assert directory.resolve('CLT', fetch) is None
+    wait_for_refresh(directory, 'CLT')
+    assert directory.resolve('CLT', fetch) == HOTEL
+    assert fetch.calls == 2
+
+
+def test_failed_fetch_keeps_the_old_record(tmp_path, clock):
+    path = str(tmp_path / 'directory.json')
+    directory = HotelDirectory(path, ttl=100)
+    directory.resolve('CLT', Fetcher(HOTEL))
+    clock.now += 101
+
+    assert directory.refresh('CLT', Fetcher(RuntimeError('directory down'))) == HOTEL
+    assert directory.resolve('CLT', Fetcher(HOTEL)) == HOTEL
+    assert directory.stats()['fetch_errors'] == 1
+
+
+def test_failed_first_fetch_backs_off_without_saving(tmp_path, clock):
+    path = tmp_path / 'directory.json'
+    directory = HotelDirectory(str(path), miss_ttl=10)
+    fetch = Fetcher(RuntimeError('directory down'))
+
+    assert directory.resolve('CLT', fetch) is None
+    assert directory.resolve('CLT', fetch) is None
+    assert fetch.calls == 1
+    assert not path.exists()
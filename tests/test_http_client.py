@@ -0,0 +1,93 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from http_client import ApiSession
+
+
+@pytest.fixture
+def server():
+    """Local HTTP/1.1 server: /slow sleeps, /status/<code> answers with queued statuses"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def respond(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            self.rfile.read(length)
+            server.requests.append((self.command, self.path, self.client_address[1]))
+            if self.path == '/slow':
+                time.sleep(0.5)
+            status = server.statuses.pop(0) if server.statuses else 200
+            self.send_response(status)
+            self.send_header('Content-Length', '2')
+            self.end_headers()
+            self.wfile.write(b'{}')
+
+        do_GET = do_POST = respond
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.requests = []
+    server.statuses = []
+    server.url = f'http://127.0.0.1:{server.server_port}'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_endpoint_read_timeout_applies(server):
+    http = ApiSession('HTTP_TEST', {'offers': (1.0, 0.1), 'hotels': (1.0, 2.0)}, retries=0)
+
+    with pytest.raises(requests.exceptions.ConnectionError, match='Read timed out'):
+        http.get(f'{server.url}/slow', 'offers')
+    assert http.get(f'{server.url}/slow', 'hotels').ok
+
+    stats = http.stats()['endpoints']
+    assert stats['offers']['failures'] == 1
+    assert stats['offers']['timeout_seconds'] == [1.0, 0.1]
+    assert (stats['hotels']['requests'], stats['hotels']['failures']) == (1, 0)
+    http.close()
+
+
+def test_timeout_can_be_set_from_the_environment(monkeypatch):
+    monkeypatch.setenv('HTTP_TEST_TIMEOUT_OFFERS', '4.5')
+    http = ApiSession('HTTP_TEST', {'offers': (1.0, 20.0)}, default_timeout=(2.0, 9.0))
+
+    assert http.timeout_for('offers') == (1.0, 4.5)
+    assert http.timeout_for('unknown') == (2.0, 9.0)
+
+
+def test_connections_are_reused(server):
+    http = ApiSession('HTTP_TEST', {}, retries=0)
+    for _ in range(3):
+        assert http.get(f'{server.url}/status/200', 'hotels').ok
+
+    assert len({port for _, _, port in server.requests}) == 1
+    http.close()
+
+
+def test_server_errors_are_retried_only_for_idempotent_methods(server):
+    retried = []
+    http = ApiSession('HTTP_TEST', {}, retries=2, backoff=0, on_retry=retried.append)
+
+    server.statuses = [503, 200]
+    assert http.get(f'{server.url}/status', 'offers').status_code == 200
+    server.statuses = [503, 200]
+    assert http.post(f'{server.url}/status', 'calls', json={}).status_code == 503
+    # A 429 was refused before it was processed, so even a POST is resent
+    server.statuses = [429, 200]
+    assert http.post(f'{server.url}/status', 'calls', json={}).status_code == 200
+
+    assert retried == ['offers', 'calls']
+    assert http.stats()['retries'] == 2
+    server.statuses = [503, 503, 503]
+    assert http.get(f'{server.url}/status', 'offers').status_code == 503
+    assert http.stats()['endpoints']['offers']['failures'] == 1
+    http.close()
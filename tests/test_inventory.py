@@ -0,0 +1,60 @@
+from inventory import InventoryCalendar, parse_stay
+
+
+def test_reserve_blocks_overlapping_stays():
+    calendar = InventoryCalendar(['101', '102'])
+    assert calendar.reserve('101', '2026-12-20', '2026-12-23', 'BK0001')
+
+    assert not calendar.reserve('101', '2026-12-22', '2026-12-24', 'BK0002')
+    assert not calendar.reserve('101', '2026-12-19', '2026-12-21', 'BK0002')
+    assert not calendar.is_available('101', '2026-12-21', '2026-12-22')
+    assert calendar.available_room_ids('2026-12-21', '2026-12-22') == ['102']
+
+
+def test_back_to_back_stays_share_no_night():
+    calendar = InventoryCalendar(['101'])
+    assert calendar.reserve('101', '2026-12-20', '2026-12-22', 'BK0001')
+
+    assert calendar.is_available('101', '2026-12-22', '2026-12-24')
+    assert calendar.reserve('101', '2026-12-22', '2026-12-24', 'BK0002')
+    assert calendar.reserve('101', '2026-12-18', '2026-12-20', 'BK0003')
+    assert [stay[0] for stay in calendar.bookings_for_room('101')] == ['BK0003', 'BK0001', 'BK0002']
+
+
+def test_reserve_refuses_unknown_rooms_bad_dates_and_duplicate_ids():
+    calendar = InventoryCalendar(['101'])
+    assert not calendar.reserve('999', '2026-12-20', '2026-12-22', 'BK0001')
+    assert not calendar.reserve('101', '2026-12-22', '2026-12-20', 'BK0001')
+    assert not calendar.reserve('101', None, '2026-12-20', 'BK0001')
+    assert calendar.reserve('101', '2026-12-20', '2026-12-22', 'BK0001')
+    assert not calendar.reserve('101', '2027-01-05', '2027-01-06', 'BK0001')
+
+
+def test_release_frees_the_nights():
+    calendar = InventoryCalendar(['101'])
+    calendar.reserve('101', '2026-12-20', '2026-12-22', 'BK0001')
+
+    assert calendar.release('BK0001')
+    assert not calendar.release('BK0001')
+    assert calendar.is_available('101', '2026-12-20', '2026-12-22')
+    assert calendar.reserve('101', '2026-12-21', '2026-12-23', 'BK0002')
+
+
+def test_remove_room_drops_it_and_its_stays():
+    calendar = InventoryCalendar(['101', '102'])
+    calendar.reserve('101', '2026-12-20', '2026-12-22', 'BK0001')
+    calendar.reserve('102', '2026-12-20', '2026-12-22', 'BK0002')
+
+    calendar.remove_room('101')
+    assert not calendar.has_room('101')
+    assert calendar.bookings_for_room('101') == []
+    assert not calendar.release('BK0001')
+    assert calendar.available_room_ids('2026-12-20', '2026-12-22') == []
+    assert calendar.available_room_ids('2026-12-22', '2026-12-23') == ['102']
+
+
+def test_parse_stay_needs_a_check_out_after_check_in():
+    assert parse_stay('2026-12-20', '2026-12-22') is not None
+    assert parse_stay('2026-12-20', '2026-12-20') is None
+    assert parse_stay('2026-12-20', None) is None
+    assert parse_stay('December 20', '2026-12-22') is None
@@ -0,0 +1,21 @@
+from hotel_agent import INTENT_MATCHER
+from keyword_matcher import KeywordMatcher
+
+
+def test_whole_word_phrases_need_word_boundaries():
+    matcher = KeywordMatcher()
+    matcher.add('hi', 'greeting', 0, whole_word=True)
+    matcher.add('pool', 'amenity', 0)
+
+    assert matcher.scan('hi there') == {'greeting': {0}}
+    assert matcher.scan('oh, hi!') == {'greeting': {0}}
+    assert matcher.scan('which one is this') == {}
+    # Plain phrases still match anywhere
+    assert matcher.scan('whirlpool') == {'amenity': {0}}
+
+
+def test_greeting_keywords_do_not_fire_inside_words():
+    for message in ('which rooms are free this weekend', 'is something wrong with my booking',
+                    'they said the shuttle was late'):
+        assert 'greeting' not in INTENT_MATCHER.scan(message)
+    assert INTENT_MATCHER.scan('hey, good morning')['greeting'] == {2, 3}
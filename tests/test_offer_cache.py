@@ -0,0 +1,195 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import offer_cache
+from offer_cache import OfferCache
+
+KEY = OfferCache.key(['HLCLT123'], '2026-12-20', '2026-12-22', 2, 1)
+OFFER = {'id': 'OFFER1', 'price': 189}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(offer_cache, 'time', clock)
+    return clock
+
+
+class Fetcher:
+    """Counts calls and returns (or raises) whatever `result` is set to"""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+def wait_for_refresh(cache):
+    for thread in threading.enumerate():
+        if thread.name == 'offer-cache-refresh':
+            thread.join(5)
+    assert not cache._refreshing
+
+
+def test_offers_are_fresh_then_stale_then_fetched_live(clock):
+    cache = OfferCache(ttl=10, stale_ttl=20)
+    fetch = Fetcher([OFFER])
+    assert cache.get(KEY, fetch) == [OFFER]
+    clock.now += 9
+    assert cache.get(KEY, fetch) == [OFFER]
+    assert fetch.calls == 1
+
+    clock.now += 2
+    release = threading.Event()
+    newer = [dict(OFFER, price=179)]
+
+    def slow_fetch():
+        release.wait(5)
+        return newer
+
+    assert cache.get(KEY, slow_fetch) == [OFFER]
+    assert cache.get(KEY, slow_fetch) == [OFFER]
+    release.set()
+    wait_for_refresh(cache)
+    assert cache.get(KEY, fetch) == newer
+    assert cache.stats()['refreshes'] == 1
+
+    clock.now += 31
+    fetch.result = [dict(OFFER, price=199)]
+    assert cache.get(KEY, fetch) == fetch.result
+    assert cache.stats()['misses'] == 2
+
+
+def test_empty_results_are_short_lived_and_never_stale(clock):
+    cache = OfferCache(ttl=100, stale_ttl=100, empty_ttl=5)
+    fetch = Fetcher([])
+    assert cache.get(KEY, fetch) == []
+    assert cache.get(KEY, fetch) == []
+    assert fetch.calls == 1
+
+    clock.now += 6
+    fetch.result = [OFFER]
+    assert cache.get(KEY, fetch) == [OFFER]
+    assert fetch.calls == 2
+
+
+def test_failed_fetch_keeps_stale_offers(clock):
+    cache = OfferCache(ttl=10, stale_ttl=20)
+    cache.get(KEY, Fetcher([OFFER]))
+    clock.now += 40
+
+    assert cache.get(KEY, Fetcher(RuntimeError('timeout'))) == [OFFER]
+    assert cache.peek(KEY) == [OFFER]
+    assert cache.get(OfferCache.key(['OTHER'], '2026-12-20', '2026-12-22', 2, 1),
+                     Fetcher(RuntimeError('timeout'))) == []
+    assert cache.stats()['fetch_errors'] == 2
+
+
+def test_concurrent_misses_share_one_fetch(clock):
+    cache = OfferCache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return [OFFER]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get(KEY, slow_fetch))) for _ in range(4)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    for _ in range(500):
+        if cache.stats()['coalesced'] == 3:
+            break
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == [[OFFER]] * 4
+    assert len(calls) == 1
+
+
+def test_invalidate_drops_only_overlapping_stays(clock):
+    cache = OfferCache()
+    before = OfferCache.key(['HLCLT123'], '2026-12-18', '2026-12-20', 2, 1)
+    after = OfferCache.key(['HLCLT123'], '2026-12-22', '2026-12-24', 2, 1)
+    for key in (before, KEY, after):
+        cache.get(key, Fetcher([OFFER]))
+
+    assert cache.invalidate('2026-12-21', '2026-12-22') == 1
+    assert cache.peek(KEY) is None
+    assert cache.peek(before) == cache.peek(after) == [OFFER]
+    assert cache.invalidate() == 2
+    assert len(cache) == 0
+
+
+def test_fetch_started_before_an_invalidation_is_not_stored(clock):
+    cache = OfferCache()
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_fetch():
+        started.set()
+        release.wait(5)
+        return [OFFER]
+
+    thread = threading.Thread(target=cache.get, args=(KEY, slow_fetch))
+    thread.start()
+    started.wait(5)
+    cache.invalidate('2026-12-20', '2026-12-22')
+    release.set()
+    thread.join(5)
+
+    assert cache.peek(KEY) is None
+
+
+def test_local_booking_invalidates_overlapping_offers(app_module, monkeypatch):
+    cache = OfferCache()
+    cache.get(OfferCache.key(['HLCLT123'], '2027-03-01', '2027-03-04', 2, 1), Fetcher([OFFER]))
+    cache.get(OfferCache.key(['HLCLT123'], '2027-03-10', '2027-03-12', 2, 1), Fetcher([OFFER]))
+    amadeus = SimpleNamespace(is_configured=lambda: True, offers=cache)
+    monkeypatch.setattr(app_module, 'get_amadeus_api', lambda: amadeus)
+
+    result = app_module.handle_vapi_function_call('create_booking', {
+        'guest_name': 'Jane Doe', 'room_type': 'king', 'check_in': '2027-03-02', 'check_out': '2027-03-03',
+    })
+    assert result['success']
+    assert len(cache) == 1
+
+    cache.get(OfferCache.key(['HLCLT123'], '2027-03-01', '2027-03-04', 2, 1), Fetcher([OFFER]))
+    app_module.agent.cancel_booking(result['booking_id'])
+    assert len(cache) == 1
+    assert cache.stats()['invalidations'] == 2
+
+
+def test_local_booking_leaves_unconfigured_amadeus_alone(app_module, monkeypatch):
+    cache = OfferCache()
+    cache.get(KEY, Fetcher([OFFER]))
+    amadeus = SimpleNamespace(is_configured=lambda: False, offers=cache)
+    monkeypatch.setattr(app_module, 'get_amadeus_api', lambda: amadeus)
+
+    booking = {'booking_id': 'BK9999', 'room_id': 'TBD', 'check_in': '2026-12-20', 'check_out': '2026-12-22'}
+    app_module.invalidate_amadeus_offers(booking)
+    assert cache.peek(KEY) == [OFFER]
@@ -0,0 +1,94 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from http_client import ApiSession
+from quota_governor import QuotaExceeded, QuotaGovernor
+
+
+@pytest.fixture
+def make_governor(tmp_path):
+    governors = []
+
+    def make(**options):
+        options = {'monthly_budget': 5, 'reserve': 2, 'conserve_below': 2, **options}
+        governor = QuotaGovernor(str(tmp_path / 'quota.db'), **options)
+        governors.append(governor)
+        return governor
+
+    yield make
+    for governor in governors:
+        governor.close()
+
+
+def test_calls_stop_at_the_reserve(make_governor):
+    governor = make_governor()
+    governor.acquire('offers')
+    assert governor.remaining() == 2
+    assert not governor.conserving()
+    governor.acquire('hotels')
+    assert governor.conserving()
+    governor.acquire('offers')
+    assert governor.remaining() == 0
+
+    with pytest.raises(QuotaExceeded):
+        governor.acquire('offers')
+    assert governor.usage() == {'offers': 2, 'hotels': 1}
+    assert governor.stats()['denied'] == {'offers': 1}
+    # The reserve is still there for exempt calls
+    governor.acquire('token')
+    assert governor.usage()['token'] == 1
+
+
+def test_denied_call_keeps_its_rate_token(make_governor):
+    governor = make_governor(monthly_budget=1, reserve=0, rate=0.001, burst=2, max_wait=0)
+    governor.acquire('offers')
+    with pytest.raises(QuotaExceeded, match='budget'):
+        governor.acquire('offers')
+
+    governor.acquire('token')
+    with pytest.raises(QuotaExceeded, match='rate limit'):
+        governor.acquire('token')
+    assert governor.stats()['rate_limited'] == 1
+
+
+def test_new_month_starts_a_new_budget(make_governor, monkeypatch):
+    governor = make_governor(monthly_budget=1, reserve=0)
+    monkeypatch.setattr(QuotaGovernor, 'current_month', staticmethod(lambda: '2026-10'))
+    governor.acquire('offers')
+    with pytest.raises(QuotaExceeded):
+        governor.acquire('offers')
+
+    monkeypatch.setattr(QuotaGovernor, 'current_month', staticmethod(lambda: '2026-11'))
+    assert governor.remaining() == 1
+    governor.acquire('offers')
+    assert governor.usage('2026-10') == {'offers': 1}
+    assert governor.usage('2026-11') == {'offers': 1}
+
+
+def test_http_retries_are_counted(make_governor):
+    governor = make_governor(monthly_budget=100)
+    statuses = [503, 503, 200]
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(statuses.pop(0))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        http = ApiSession('QUOTA_TEST', {}, retries=2, backoff=0, on_retry=governor.record)
+        governor.acquire('offers')
+        response = http.get(f'http://127.0.0.1:{server.server_port}/offers', 'offers')
+    finally:
+        server.shutdown()
+
+    assert response.status_code == 200
+    assert http.stats()['retries'] == 2
+    assert governor.usage() == {'offers': 3}
@@ -0,0 +1,47 @@
+from hotel_agent import HotelAgent
+from semantic_cache import SemanticIntentCache
+
+
+def test_paraphrase_hits():
+    cache = SemanticIntentCache()
+    key = HotelAgent._semantic_key('is there a pool')
+    cache.add('is there a pool', ('amenities', {'amenity': 'pool'}), key)
+
+    hit = cache.lookup('do you guys have a swimming pool', HotelAgent._semantic_key('do you guys have a swimming pool'))
+
+    assert hit is not None
+    assert hit[1] == ('amenities', {'amenity': 'pool'})
+
+
+def test_similar_wording_with_other_keyword_misses():
+    cache = SemanticIntentCache()
+    cache.add('what time is check in', ('policies', {'policy': 'check_in'}),
+              HotelAgent._semantic_key('what time is check in'))
+
+    assert HotelAgent._semantic_key('what time is check in') != HotelAgent._semantic_key('what time is check out')
+    assert cache.lookup('what time is check out', HotelAgent._semantic_key('what time is check out')) is None
+    assert cache.lookup('what time is check in please', HotelAgent._semantic_key('what time is check in please'))
+
+
+def test_columns_are_allocated_in_chunks():
+    cache = SemanticIntentCache(capacity=10, chunk=4, dim=64)
+    assert cache.stats()['matrix_bytes'] == 0
+
+    cache.add('is there a pool', 'pool')
+    assert cache.stats()['matrix_bytes'] == 64 * 4 * 4
+    for word in ('gym', 'parking', 'breakfast', 'wifi'):
+        cache.add(f'is there {word}', word)
+    assert cache.stats()['matrix_bytes'] == 64 * 8 * 4
+    assert cache.lookup('is there a pool')[1] == 'pool'
+
+
+def test_full_cache_overwrites_oldest():
+    cache = SemanticIntentCache(capacity=2, chunk=4)
+    cache.add('is there a pool', 'pool')
+    cache.add('is there a gym', 'gym')
+    cache.add('is there parking', 'parking')
+
+    assert len(cache) == 2
+    assert cache.stats()['matrix_bytes'] == cache.dim * 2 * 4
+    assert cache.lookup('is there a pool') is None
+    assert cache.lookup('is there parking')[1] == 'parking'
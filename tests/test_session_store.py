@@ -0,0 +1,137 @@
+import json
+
+import pytest
+
+import session_store
+from session_store import MemorySessionStore, SessionArchive, SQLiteSessionStore
+
+
+class Clock:
+    """Stands in for the time module: both clocks read the same settable value"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(session_store, 'time', clock)
+    return clock
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_store(request, tmp_path, clock):
+    stores = []
+
+    def make(**options):
+        if request.param == 'memory':
+            store = MemorySessionStore(**options)
+        else:
+            store = SQLiteSessionStore(str(tmp_path / 'sessions.db'), **options)
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        if isinstance(store, SQLiteSessionStore):
+            store.close()
+
+
+def test_least_recently_used_is_evicted_first(make_store, clock):
+    store = make_store(max_entries=2)
+    store.save('a', {'n': 1})
+    clock.now += 1
+    store.save('b', {'n': 2})
+    clock.now += 1
+    assert store.get('a') == {'n': 1}
+    clock.now += 1
+    store.save('c', {'n': 3})
+    store.sweep()
+
+    assert [session_id for session_id, _ in store.items()] == ['a', 'c']
+    assert store.stats()['evicted'] == 1
+
+
+def test_idle_sessions_expire(make_store, clock):
+    store = make_store(idle_ttl=10)
+    store.save('a', {'n': 1})
+    store.save('b', {'n': 2})
+    clock.now += 5
+    store.get('b')
+    clock.now += 6
+
+    assert store.get('a') is None
+    assert store.get('b') == {'n': 2}
+    clock.now += 11
+    assert store.sweep() == 1
+    assert len(store) == 0
+
+
+def test_find_by_index_key(make_store, clock):
+    store = make_store(index_key='call_sid', idle_ttl=10)
+    store.save('a', {'call_sid': 'CA1'})
+    store.save('b', {'call_sid': 'CA2'})
+
+    assert store.find('CA2') == ('b', {'call_sid': 'CA2'})
+    store.save('b', {'call_sid': 'CA3'})
+    assert store.find('CA2') == (None, None)
+    assert store.find('CA3') == ('b', {'call_sid': 'CA3'})
+    store.pop('a')
+    assert store.find('CA1') == (None, None)
+    clock.now += 11
+    assert store.find('CA3') == (None, None)
+
+
+def test_finished_sessions_are_archived_after_retention(make_store, clock, tmp_path):
+    archive = SessionArchive(str(tmp_path / 'archive.jsonl'))
+    store = make_store(retention=5, archive=archive)
+    store.finish('a', {'step': 'done'})
+    store.save('b', {'step': 'open'})
+    clock.now += 3
+    # Finishing again doesn't restart the retention period
+    store.finish('a', {'step': 'done', 'rating': 5})
+    assert store.sweep() == 0
+    assert store.get('a') == {'step': 'done', 'rating': 5}
+
+    clock.now += 3
+    assert store.sweep() == 1
+    archive.close()
+    assert store.get('a') is None
+    assert store.get('b') == {'step': 'open'}
+    with open(tmp_path / 'archive.jsonl') as f:
+        records = [json.loads(line) for line in f]
+    assert [(record['session_id'], record['session']) for record in records] == [('a', {'step': 'done', 'rating': 5})]
+    assert store.stats()['archived'] == 1
+
+
+def test_finished_sessions_that_expire_are_archived(make_store, clock):
+    archived = []
+    store = make_store(idle_ttl=10, retention=60, archive=lambda session_id, session: archived.append(session_id))
+    store.finish('a', {'step': 'done'})
+    store.save('b', {'step': 'open'})
+    clock.now += 11
+
+    assert store.get('a') is None
+    store.sweep()
+    assert archived == ['a']
+    assert len(store) == 0
+    assert store.stats()['archived'] == 1
+
+
+def test_finished_sessions_that_are_evicted_are_archived(make_store, clock):
+    archived = []
+    store = make_store(max_entries=1, retention=60, archive=lambda session_id, session: archived.append(session_id))
+    store.finish('a', {'step': 'done'})
+    clock.now += 1
+    store.save('b', {'step': 'open'})
+    store.sweep()
+
+    assert archived == ['a']
+    assert [session_id for session_id, _ in store.items()] == ['b']
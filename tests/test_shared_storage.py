@@ -0,0 +1,69 @@
+from datetime import date, timedelta
+
+import pytest
+
+from booking_journal import write_snapshot
+from hotel_agent import HotelAgent
+from storage import SQLiteStorage
+
+CHECK_IN = (date.today() + timedelta(days=30)).isoformat()
+CHECK_OUT = (date.today() + timedelta(days=32)).isoformat()
+ROOMS = [
+    {'id': '101', 'type': 'King', 'capacity': 2, 'price_per_night': 150},
+    {'id': '102', 'type': 'King', 'capacity': 2, 'price_per_night': 150},
+]
+
+
+def booking(booking_id, room_id='101', check_in=CHECK_IN, check_out=CHECK_OUT):
+    return {'booking_id': booking_id, 'room_id': room_id, 'check_in': check_in, 'check_out': check_out}
+
+
+@pytest.fixture
+def workers(tmp_path):
+    """Two agents over one database, as two worker processes would be"""
+    data_file = str(tmp_path / 'hotel_data.json')
+    write_snapshot(data_file, {'rooms': ROOMS, 'bookings': []})
+    storages = [SQLiteStorage(str(tmp_path / 'hotel_data.db'), seed_file=data_file) for _ in range(2)]
+    yield [HotelAgent(data_file, storage=storage) for storage in storages]
+    for storage in storages:
+        storage.close()
+
+
+def test_room_booked_by_another_worker_is_refused(workers):
+    first, second = workers
+    assert first.add_booking(booking('BK0001'))
+
+    assert not second.add_booking(booking('BK0002'))
+    assert second.get_booking('BK0002') is None
+    assert second.add_booking(booking('BK0003', room_id='102'))
+    assert second.add_booking(booking('BK0004', check_in=CHECK_OUT,
+                                      check_out=(date.today() + timedelta(days=33)).isoformat()))
+
+
+def test_calendar_follows_other_workers(workers):
+    first, second = workers
+    assert [room['id'] for room in second.find_available_rooms(CHECK_IN, CHECK_OUT)] == ['101', '102']
+
+    first.add_booking(booking('BK0001'))
+    assert [room['id'] for room in second.find_available_rooms(CHECK_IN, CHECK_OUT)] == ['102']
+    assert not second.is_room_available('101', CHECK_IN, CHECK_OUT)
+
+    first.cancel_booking('BK0001')
+    assert second.is_room_available('101', CHECK_IN, CHECK_OUT)
+
+
+def test_booking_numbers_are_shared(workers):
+    first, second = workers
+    assert [first.next_booking_id(), second.next_booking_id(), first.next_booking_id()] == ['BK0001', 'BK0002', 'BK0003']
+
+
+def test_amadeus_bookings_are_not_held_per_room(workers):
+    first, second = workers
+    offer = dict(booking('BK0001', room_id='ABC123'), source='amadeus')
+    assert first.add_booking(offer)
+
+    # Another offer whose id truncates the same way, and a room we don't own
+    assert second.add_booking(dict(offer, booking_id='BK0002'))
+    assert second.add_booking(booking('BK0003', room_id='999'))
+    assert second.add_booking(booking('BK0004', room_id='999'))
+    assert [b['booking_id'] for b in first.list_bookings()] == ['BK0001', 'BK0002', 'BK0003', 'BK0004']
@@ -0,0 +1,121 @@
+import threading
+import time
+
+import pytest
+
+import amadeus_integration
+from single_flight import SingleFlight
+
+
+def wait_until(condition):
+    for _ in range(500):
+        if condition():
+            return
+        time.sleep(0.01)
+    raise AssertionError('timed out waiting')
+
+
+def run_together(flights, key, fn, count):
+    """Start `count` callers of flights.do(key, fn); the first is running fn before the rest start"""
+    results = []
+    errors = []
+
+    def call():
+        try:
+            results.append(flights.do(key, fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(count)]
+    threads[0].start()
+    wait_until(lambda: flights.stats()['in_flight'] == 1)
+    for thread in threads[1:]:
+        thread.start()
+    wait_until(lambda: flights.shared == count - 1)
+    return threads, results, errors
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return ['offer']
+
+    threads, results, errors = run_together(flights, 'offers', fetch, 5)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == [['offer']] * 5
+    assert errors == []
+    assert len(calls) == 1
+    assert flights.stats() == {'calls': 1, 'shared': 4, 'in_flight': 0}
+
+
+def test_waiters_get_the_same_exception():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def fetch():
+        release.wait(5)
+        raise RuntimeError('upstream down')
+
+    threads, results, errors = run_together(flights, 'offers', fetch, 3)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == []
+    assert [str(e) for e in errors] == ['upstream down'] * 3
+
+
+def test_nothing_is_remembered_after_a_call():
+    flights = SingleFlight()
+    assert flights.do('token', lambda: 1) == 1
+    assert flights.do('token', lambda: 2) == 2
+    with pytest.raises(ValueError):
+        flights.do('token', lambda: int('x'))
+    assert flights.stats() == {'calls': 3, 'shared': 0, 'in_flight': 0}
+
+
+def test_different_keys_run_separately():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def slow():
+        release.wait(5)
+        return 'slow'
+
+    thread = threading.Thread(target=flights.do, args=('a', slow))
+    thread.start()
+    wait_until(lambda: flights.stats()['in_flight'] == 1)
+    assert flights.do('b', lambda: 'fast') == 'fast'
+    release.set()
+    thread.join(5)
+    assert flights.shared == 0
+
+
+def test_amadeus_client_is_created_once(monkeypatch):
+    created = []
+
+    class SlowClient:
+        def __init__(self):
+            created.append(self)
+            time.sleep(0.05)
+
+    monkeypatch.setattr(amadeus_integration, 'amadeus_api', None)
+    monkeypatch.setattr(amadeus_integration, 'AmadeusHotelAPI', SlowClient)
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(amadeus_integration.get_amadeus_api()))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(created) == 1
+    assert clients == created * 8
@@ -0,0 +1,159 @@
+import pytest
+
+from booking_journal import write_snapshot
+from storage import JSONStorage, SQLiteStorage
+
+ROOMS = [
+    {'id': '101', 'type': 'King', 'capacity': 2, 'price_per_night': 150},
+    {'id': '102', 'type': 'Queen', 'capacity': 2, 'price_per_night': 130},
+]
+
+
+def booking(number, room_id='101', check_in='2026-11-01', check_out='2026-11-03', **fields):
+    return {'booking_id': f'BK{number:04d}', 'room_id': room_id,
+            'check_in': check_in, 'check_out': check_out, **fields}
+
+
+@pytest.fixture
+def seed_file(tmp_path):
+    path = str(tmp_path / 'hotel_data.json')
+    write_snapshot(path, {
+        'hotel_info': {'name': 'Test Hotel'},
+        'rooms': ROOMS,
+        'bookings': [booking(7, check_in='2026-10-01', check_out='2026-10-02')],
+        'last_booking_number': 3,
+    })
+    return path
+
+
+@pytest.fixture
+def open_storage(tmp_path, seed_file):
+    storages = []
+
+    def open_():
+        storage = SQLiteStorage(str(tmp_path / 'hotel_data.db'), seed_file=seed_file)
+        storages.append(storage)
+        return storage
+
+    yield open_
+    for storage in storages:
+        storage.close()
+
+
+def test_first_load_seeds_catalog_and_bookings(open_storage):
+    storage = open_storage()
+    data = storage.load()
+
+    assert data['hotel_info'] == {'name': 'Test Hotel'}
+    assert data['rooms'] == ROOMS
+    assert [b['booking_id'] for b in storage.list_bookings()] == ['BK0007']
+    # Numbering continues after the highest seeded booking id
+    assert storage.next_booking_number() == 8
+
+
+def test_changes_survive_reopening_and_are_not_reseeded(open_storage):
+    storage = open_storage()
+    storage.load()
+    storage.add_booking(booking(storage.next_booking_number()))
+    storage.remove_booking('BK0007')
+    storage.update_room(dict(ROOMS[0], price_per_night=175), {'price_per_night': 175})
+    storage.replace_catalog({'hotel_info': {'name': 'Renamed'}})
+    storage.close()
+
+    reopened = open_storage()
+    data = reopened.load()
+    assert data['hotel_info'] == {'name': 'Renamed'}
+    assert [room['price_per_night'] for room in data['rooms']] == [175, 130]
+    assert [b['booking_id'] for b in reopened.list_bookings()] == ['BK0008']
+    assert reopened.get_booking('BK0007') is None
+    assert reopened.next_booking_number() == 9
+
+
+def test_replaced_rooms_keep_their_new_order(open_storage):
+    storage = open_storage()
+    storage.load()
+    storage.replace_catalog({'rooms': list(reversed(ROOMS))})
+
+    assert [room['id'] for room in storage.load()['rooms']] == ['102', '101']
+
+
+def test_list_bookings_pages_from_the_most_recent(open_storage):
+    storage = open_storage()
+    storage.load()
+    for number in (8, 9, 10):
+        storage.add_booking(booking(number, room_id='102', check_in=f'2026-12-{number:02d}',
+                                    check_out=f'2026-12-{number + 1:02d}'))
+
+    assert [b['booking_id'] for b in storage.list_bookings(limit=2)] == ['BK0009', 'BK0010']
+    assert [b['booking_id'] for b in storage.list_bookings(limit=2, offset=2)] == ['BK0007', 'BK0008']
+    assert storage.booking_count() == 4
+
+
+def test_find_bookings_by_normalized_phone_or_email(open_storage):
+    storage = open_storage()
+    storage.load()
+    storage.add_booking(booking(8, guest_phone='(704) 555-0100', guest_email='Guest@Example.com'))
+    storage.add_booking(booking(9, room_id='102', guest_phone='704.555.0199', guest_email='Not provided'))
+
+    assert [b['booking_id'] for b in storage.find_bookings(phone='704-555-0100')] == ['BK0008']
+    assert [b['booking_id'] for b in storage.find_bookings(email='guest@example.COM')] == ['BK0008']
+    assert [b['booking_id'] for b in storage.find_bookings(phone='7045550199')] == ['BK0009']
+    assert storage.find_bookings(email='Not provided') == []
+
+
+def test_booking_version_counts_adds_and_removals(open_storage):
+    storage = open_storage()
+    storage.load()
+    assert storage.booking_version() == 0
+
+    storage.add_booking(booking(8))
+    assert not storage.add_booking(booking(9))
+    storage.remove_booking('BK0008')
+    storage.remove_booking('BK0008')
+    assert storage.booking_version() == 2
+
+
+@pytest.fixture
+def json_storage(seed_file):
+    storage = JSONStorage(seed_file)
+    storage.load()
+    yield storage
+    storage.close()
+
+
+def test_json_indexes_follow_adds_and_removals(json_storage):
+    json_storage.add_booking(booking(8, guest_phone='(704) 555-0100', guest_email='Guest@Example.com',
+                                     created_at='2026-10-17T10:00:00'))
+    json_storage.add_booking(booking(9, room_id='102', guest_phone='704-555-0100',
+                                     created_at='2026-10-17T09:00:00'))
+
+    # Ordered by creation time, phone and email matches merged
+    assert [b['booking_id'] for b in json_storage.find_bookings(phone='7045550100')] == ['BK0009', 'BK0008']
+    assert [b['booking_id'] for b in json_storage.find_bookings(phone='0', email='guest@example.com')] == ['BK0008']
+
+    json_storage.remove_booking('BK0008')
+    assert [b['booking_id'] for b in json_storage.find_bookings(phone='7045550100')] == ['BK0009']
+    assert json_storage.find_bookings(email='guest@example.com') == []
+    assert json_storage.get_booking('BK0008') is None
+    assert json_storage.booking_count() == 2
+
+
+def test_json_rebooking_an_id_replaces_its_index_entries(json_storage):
+    json_storage.add_booking(booking(8, guest_email='old@example.com'))
+    json_storage.add_booking(booking(8, guest_email='new@example.com'))
+
+    assert json_storage.find_bookings(email='old@example.com') == []
+    assert [b['guest_email'] for b in json_storage.find_bookings(email='new@example.com')] == ['new@example.com']
+    assert json_storage.booking_count() == 2
+
+
+def test_json_list_bookings_pages_like_sqlite(json_storage, open_storage):
+    sqlite_storage = open_storage()
+    sqlite_storage.load()
+    for storage in (json_storage, sqlite_storage):
+        for number in (8, 9, 10):
+            storage.add_booking(booking(number, room_id='102', check_in=f'2026-12-{number:02d}',
+                                        check_out=f'2026-12-{number + 1:02d}'))
+
+    for limit, offset in ((None, 0), (2, 0), (2, 2), (5, 1)):
+        assert json_storage.list_bookings(limit, offset) == sqlite_storage.list_bookings(limit, offset)
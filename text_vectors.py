@@ -0,0 +1,70 @@
+"""
+Text Vectors
+Hashed character n-gram vectors for comparing and classifying short guest messages offline
+"""
+
+import zlib
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+from faq_index import tokenize
+
+DEFAULT_DIM = 512
+
+# Conversational filler that says nothing about what the guest wants, on
+# top of the FAQ stop words
+FILLER_WORDS = frozenset("""
+    guy guys hey hi hello just know let like need tell want wondering
+""".split())
+
+
+def message_words(text: str) -> List[str]:
+    """Content words of a message: FAQ tokenization minus filler and bare numbers"""
+    return [word for word in tokenize(text) if word not in FILLER_WORDS and not word.isdigit()]
+
+
+@lru_cache(maxsize=65536)
+def _word_buckets(word: str, dim: int) -> Tuple[int, ...]:
+    padded = f' {word} '
+    buckets = [zlib.crc32(padded[i:i + 3].encode('utf-8')) % dim for i in range(len(padded) - 2)]
+    buckets.append(zlib.crc32(b'w:' + word.encode('utf-8')) % dim)
+    return tuple(buckets)
+
+
+def hashed_features(text: str, dim: int = DEFAULT_DIM) -> List[int]:
+    """
+    Bucket indices for a message's features (repeats allowed)
+
+    Features are the character trigrams of each content word (padded with
+    spaces, never spanning two words) plus the word itself. Buckets come
+    from CRC32, which is stable across processes, so vectors built by an
+    offline training run match the ones built at serving time.
+    """
+    buckets = []
+    for word in message_words(text):
+        buckets.extend(_word_buckets(word, dim))
+    return buckets
+
+
+def hashed_vector(text: str, dim: int = DEFAULT_DIM) -> np.ndarray:
+    """L2-normalized float32 feature vector (all zeros for a message with no content words)"""
+    buckets = hashed_features(text, dim)
+    if not buckets:
+        return np.zeros(dim, dtype=np.float32)
+    vector = np.bincount(buckets, minlength=dim).astype(np.float32)
+    vector /= np.sqrt(vector @ vector)
+    return vector
+
+
+def hashed_matrix(texts: Iterable[str], dim: int = DEFAULT_DIM) -> np.ndarray:
+    """Stack hashed_vector rows for many messages"""
+    texts = list(texts)
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        buckets = hashed_features(text, dim)
+        if buckets:
+            matrix[row] = np.bincount(buckets, minlength=dim)
+    norms = np.sqrt((matrix * matrix).sum(axis=1, keepdims=True))
+    return matrix / np.maximum(norms, 1e-12)
@@ -8,9 +8,19 @@ import requests
 from typing import Dict, Optional
 from dotenv import load_dotenv
 
+from http_client import ApiSession
+
 # Load environment variables
 load_dotenv()
 
+# (connect, read) timeouts per VAPI endpoint
+VAPI_TIMEOUTS = {
+    "assistant": (3.05, 30.0),
+    "call": (3.05, 30.0),
+    "call_status": (3.05, 30.0),
+    "end_call": (3.05, 30.0),
+}
+
 
 class VAPIHotelAgent:
     """
@@ -26,6 +36,8 @@ class VAPIHotelAgent:
         }
         self.assistant_id = os.getenv("VAPI_ASSISTANT_ID")
         self.phone_number_id = os.getenv("VAPI_PHONE_NUMBER_ID")
+        # Keep-alive connection pool; POSTs are only resent after a 429
+        self.http = ApiSession("VAPI", VAPI_TIMEOUTS)
         
     @property
     def client(self):
@@ -71,11 +83,11 @@ class VAPIHotelAgent:
         }
         
         try:
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/assistant",
+                "assistant",
                 headers=self.headers,
-                json=assistant_config,
-                timeout=30
+                json=assistant_config
             )
             response.raise_for_status()
             data = response.json()
@@ -261,11 +273,11 @@ HOTEL INFO:
             call_config["phoneNumberId"] = self.phone_number_id
         
         try:
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/call",
+                "call",
                 headers=self.headers,
-                json=call_config,
-                timeout=30
+                json=call_config
             )
             response.raise_for_status()
             data = response.json()
@@ -317,11 +329,11 @@ HOTEL INFO:
         }
         
         try:
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/call",
+                "call",
                 headers=self.headers,
-                json=call_config,
-                timeout=30
+                json=call_config
             )
             response.raise_for_status()
             data = response.json()
@@ -335,10 +347,10 @@ HOTEL INFO:
             raise ValueError("VAPI API key not configured")
         
         try:
-            response = requests.get(
+            response = self.http.get(
                 f"{self.base_url}/call/{call_id}",
-                headers=self.headers,
-                timeout=30
+                "call_status",
+                headers=self.headers
             )
             response.raise_for_status()
             return response.json()
@@ -352,10 +364,10 @@ HOTEL INFO:
         
         try:
             # Use VAPI's API to end the call
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/call/{call_id}/end",
-                headers=self.headers,
-                timeout=30
+                "end_call",
+                headers=self.headers
             )
             return response.ok
         except Exception as e: